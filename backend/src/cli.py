@@ -0,0 +1,290 @@
+"""
+Command Line Tools for SaveLife.com Backend
+
+Batch jobs registered on the Flask CLI (run with `flask --app src.main <command>`):
+- fraud-score: bulk fraud scoring of NDJSON campaign records
+- reverify-campaigns: re-run verification over stored campaigns after rule changes
+- index-story-quality: score stored campaign stories for the story quality index
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.models.user import db
+from src.models.campaign import Campaign, CampaignDocument, StoryQualityScore
+from src.services.batch_fraud import score_fraud_records
+from src.services.medical_knowledge import shared_knowledge_base
+from src.services.ndjson import iter_ndjson_records, dumps_line
+from src.services.reverification import ReverificationCheckpoint, init_worker, verify_chunk
+from src.services import story_quality
+
+
+@click.command('fraud-score')
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('--output', '-o', type=click.File('w'), default='-', help='NDJSON output file (default stdout)')
+@click.option('--batch-size', default=1000, show_default=True, help='Campaigns scored per vectorized batch')
+def fraud_score_command(input_file, output, batch_size):
+    """Score NDJSON campaign records for fraud and stream NDJSON results"""
+    from src.routes.ai_services import verification_ai
+
+    for result in score_fraud_records(verification_ai, iter_ndjson_records(input_file), batch_size=batch_size):
+        if 'summary' in result:
+            summary = result['summary']
+            click.echo(
+                f"Scored {summary['processed']} campaigns ({summary['errors']} errors) "
+                f"in {summary['elapsed_seconds']}s: {summary['campaigns_per_second']} campaigns/s",
+                err=True
+            )
+        else:
+            output.write(dumps_line(result))
+
+
+@click.command('reverify-campaigns')
+@click.option('--status', default='open', show_default=True, help='Status of the campaigns to re-verify')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count)')
+@click.option('--batch-size', default=500, show_default=True, help='Campaigns per database transaction')
+@click.option('--checkpoint', 'checkpoint_path', default=None,
+              help='Checkpoint file (default: reverify_checkpoint.json in the database directory)')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint and start from the beginning')
+@with_appcontext
+def reverify_campaigns_command(status, workers, batch_size, checkpoint_path, restart):
+    """
+    Re-verify stored campaigns with the current rules, resuming from the last checkpoint.
+
+    Documents are checked read-only against the shared document fingerprint index,
+    and every new status is added to the decision log once it is saved.
+    """
+    from src.routes.ai_services import DATA_DIR, verification_ai
+
+    workers = workers or os.cpu_count() or 1
+    checkpoint = ReverificationCheckpoint(checkpoint_path or os.path.join(DATA_DIR, 'reverify_checkpoint.json'))
+    ruleset_version = verification_ai.ruleset_version
+
+    progress = None if restart else checkpoint.load()
+    if progress and (progress['ruleset_version'] != ruleset_version or progress['status'] != status):
+        click.echo("Rules or status filter changed since the checkpoint; starting from the beginning", err=True)
+        progress = None
+    if progress:
+        click.echo(f"Resuming after campaign {progress['last_id']} ({progress['processed']} already done)", err=True)
+    else:
+        progress = {'ruleset_version': ruleset_version, 'status': status, 'last_id': '', 'processed': 0, 'changed': 0}
+    progress.setdefault('failed', [])
+
+    remaining = Campaign.query.filter(Campaign.status == status, Campaign.id > progress['last_id']).count()
+    started = time.perf_counter()
+    done = 0
+
+    blocklist_path = verification_ai.blocklist.path if verification_ai.blocklist is not None else None
+    fingerprint_index = verification_ai.fingerprint_index
+    fingerprint_db_path = fingerprint_index.db_path if fingerprint_index is not None else None
+    decision_log = verification_ai.decision_log
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(verification_ai.rule_engine.rules, blocklist_path,
+                                       fingerprint_db_path)) as executor:
+        page = _load_campaign_page(status, progress['last_id'], batch_size)
+        while page:
+            work, previous_statuses = page
+            chunk_size = max(1, len(work) // (workers * 4))
+            pending = executor.map(verify_chunk, [work[i:i + chunk_size] for i in range(0, len(work), chunk_size)])
+
+            # Read the next page while the workers verify this one
+            last_id = work[-1][0]['id']
+            page = _load_campaign_page(status, last_id, batch_size)
+
+            results = [result for chunk in pending for result in chunk]
+            failures = [result for result in results if 'error' in result]
+            results = [result for result in results if 'error' not in result]
+            verified_at = datetime.now(timezone.utc)
+            if results:
+                db.session.execute(update(Campaign), [
+                    {
+                        'id': result['id'],
+                        'verification_status': result['verification_status'],
+                        'trust_score': result['trust_score'],
+                        'verified_at': verified_at
+                    }
+                    for result in results
+                ])
+                db.session.commit()
+
+            # Only saved statuses are logged, so the log never records a decision that did not take effect
+            if decision_log is not None:
+                for result in results:
+                    decision_log.append('verification', result['id'], {
+                        **result['decision'], 'previous_status': previous_statuses[result['id']]
+                    })
+
+            # Failed campaigns keep their previous status and are listed for a follow-up run
+            for failure in failures:
+                click.echo(f"Campaign {failure['id']}: {failure['error']}", err=True)
+            progress['last_id'] = last_id
+            progress['processed'] += len(results)
+            progress['changed'] += sum(
+                1 for result in results if previous_statuses[result['id']] != result['verification_status']
+            )
+            progress['failed'].extend(failure['id'] for failure in failures)
+            checkpoint.save(progress)
+
+            done += len(results) + len(failures)
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            click.echo(
+                f"{progress['processed']} campaigns re-verified, {len(progress['failed'])} failed "
+                f"({rate:.0f}/s, ETA {max(remaining - done, 0) / rate:.0f}s)",
+                err=True
+            )
+
+    if decision_log is not None:
+        decision_log.flush()
+    checkpoint.clear()
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Re-verified {progress['processed']} campaigns ({progress['changed']} status changes) with "
+        f"ruleset {ruleset_version}; this run: {done} in {elapsed:.1f}s, "
+        f"{done / max(elapsed, 1e-9):.0f} campaigns/s",
+        err=True
+    )
+    if progress['failed']:
+        click.echo(
+            f"{len(progress['failed'])} campaigns failed to verify and kept their status: "
+            f"{', '.join(progress['failed'])}",
+            err=True
+        )
+
+
+def _load_campaign_page(status, after_id, limit):
+    """
+    Next page of campaigns by id (keyset pagination) with their documents.
+
+    Returns ([(campaign data, documents)], {campaign id: previous status}),
+    or None when no campaigns remain.
+    """
+    campaigns = (
+        Campaign.query
+        .filter(Campaign.status == status, Campaign.id > after_id)
+        .order_by(Campaign.id)
+        .limit(limit)
+        .all()
+    )
+    if not campaigns:
+        return None
+
+    documents = {campaign.id: [] for campaign in campaigns}
+    for document in (CampaignDocument.query
+                     .filter(CampaignDocument.campaign_id.in_(list(documents)))
+                     .order_by(CampaignDocument.id)):
+        documents[document.campaign_id].append(document.to_dict())
+
+    work = [(campaign.to_dict(), documents[campaign.id]) for campaign in campaigns]
+    previous_statuses = {campaign.id: campaign.verification_status for campaign in campaigns}
+
+    # Plain dicts are all that is needed from here on, so keep the session small
+    db.session.expunge_all()
+    return work, previous_statuses
+
+
+@click.command('index-story-quality')
+@click.option('--status', default='open', show_default=True, help='Status of the campaigns to index')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count)')
+@click.option('--batch-size', default=1000, show_default=True, help='Campaigns per database transaction')
+@click.option('--force', is_flag=True, help='Re-score stories even if their stored scores are up to date')
+@with_appcontext
+def index_story_quality_command(status, workers, batch_size, force):
+    """
+    Score campaign stories in parallel, skipping unchanged stories already scored by the current scorer.
+
+    Campaigns are the ones saved by the verify-campaign and campaign document routes.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    scored = skipped = 0
+
+    upsert = sqlite_insert(StoryQualityScore)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[StoryQualityScore.campaign_id],
+        set_={
+            column: upsert.excluded[column]
+            for column in ('text_sha256', 'scorer_version', 'readability_score', 'emotional_impact_score',
+                           'clarity_score', 'quality_score', 'scored_at')
+        }
+    )
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=story_quality.init_worker) as executor:
+        page = _load_story_page(status, '', batch_size, force)
+        while page is not None:
+            last_id, stories, unchanged = page
+            skipped += unchanged
+            chunk_size = max(1, len(stories) // (workers * 4))
+            pending = executor.map(
+                story_quality.score_stories, [stories[i:i + chunk_size] for i in range(0, len(stories), chunk_size)]
+            )
+
+            # Read the next page while the workers score this one
+            page = _load_story_page(status, last_id, batch_size, force)
+
+            scored_at = datetime.now(timezone.utc)
+            results = [dict(result, scored_at=scored_at) for chunk in pending for result in chunk]
+            if results:
+                db.session.execute(upsert, results)
+                db.session.commit()
+            scored += len(results)
+
+            rate = (scored + skipped) / max(time.perf_counter() - started, 1e-9)
+            click.echo(f"{scored} stories scored, {skipped} unchanged ({rate:.0f} campaigns/s)", err=True)
+
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Indexed story quality for {scored + skipped} campaigns in {elapsed:.1f}s: "
+        f"{scored} scored ({scored / max(elapsed, 1e-9):.0f}/s), {skipped} unchanged and skipped",
+        err=True
+    )
+
+
+def _load_story_page(status, after_id, limit, force):
+    """
+    Next page of campaign stories by id, as (last id, [(id, story, hash)] to score,
+    number skipped as unchanged and scored by the current scorer), or None when no
+    campaigns remain
+    """
+    rows = (
+        db.session.query(Campaign.id, Campaign.description)
+        .filter(Campaign.status == status, Campaign.id > after_id)
+        .order_by(Campaign.id)
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return None
+
+    known_scores = {}
+    if not force:
+        known_scores = {
+            campaign_id: (text_sha256, scorer_version)
+            for campaign_id, text_sha256, scorer_version in (
+                db.session.query(StoryQualityScore.campaign_id, StoryQualityScore.text_sha256,
+                                 StoryQualityScore.scorer_version)
+                .filter(StoryQualityScore.campaign_id.in_([campaign_id for campaign_id, _ in rows]))
+            )
+        }
+
+    # Scores also depend on the scorer and the knowledge base, so a change to either re-scores every story
+    current_version = story_quality.scorer_version(shared_knowledge_base())
+    stories = []
+    for campaign_id, story in rows:
+        text_sha256 = story_quality.story_hash(story)
+        if known_scores.get(campaign_id) != (text_sha256, current_version):
+            stories.append((campaign_id, story, text_sha256))
+    return rows[-1][0], stories, len(rows) - len(stories)
+
+
+def register_commands(app):
+    """Attach the batch commands to the Flask CLI"""
+    app.cli.add_command(fraud_score_command)
+    app.cli.add_command(reverify_campaigns_command)
+    app.cli.add_command(index_story_quality_command)
@@ -5,13 +5,22 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from src.models.user import db
+from src.models import campaign  # noqa: F401  (registers campaign tables)
 from src.routes.user import user_bp
-from src.routes.ai_services import ai_bp
+from src.routes.ai_services import ai_bp, DATA_DIR
+from src.cli import register_commands
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
+# Behind the load balancer, take the client address from the X-Forwarded-For entry
+# added by each trusted proxy hop, so per-IP velocity limits see real clients
+trusted_proxy_hops = int(os.environ.get('TRUSTED_PROXY_HOPS', '1'))
+if trusted_proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxy_hops, x_proto=trusted_proxy_hops)
+
 # Enable CORS for all routes
 CORS(app, origins="*")
 
@@ -20,12 +29,15 @@ app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(ai_bp, url_prefix='/api/ai')
 
 # uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(DATA_DIR, 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 with app.app_context():
     db.create_all()
 
+# Register batch CLI commands
+register_commands(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from src.models.user import db
+
+
+class Campaign(db.Model):
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.String(64), index=True)
+    email = db.Column(db.String(120))
+    beneficiary_name = db.Column(db.String(120))
+    phone = db.Column(db.String(32))
+    address = db.Column(db.String(255))
+    goal_amount = db.Column(db.Float, nullable=False, default=0.0)
+    description = db.Column(db.Text, nullable=False, default='')
+    status = db.Column(db.String(20), nullable=False, default='open', index=True)
+    verification_status = db.Column(db.String(20), nullable=False, default='pending')
+    trust_score = db.Column(db.Float)
+    verified_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    documents = db.relationship('CampaignDocument', backref='campaign', lazy='select',
+                                cascade='all, delete-orphan', order_by='CampaignDocument.id')
+
+    def __repr__(self):
+        return f'<Campaign {self.id}>'
+
+    def to_dict(self):
+        """Campaign data in the shape the AI services expect"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'email': self.email,
+            'beneficiary_name': self.beneficiary_name,
+            'phone': self.phone,
+            'address': self.address,
+            'goal_amount': self.goal_amount,
+            'description': self.description,
+            'status': self.status,
+            'verification_status': self.verification_status,
+            'trust_score': self.trust_score,
+            'verified_at': self.verified_at.isoformat() if self.verified_at else None
+        }
+
+
+class CampaignDocument(db.Model):
+    __table_args__ = (db.UniqueConstraint('campaign_id', 'document_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.String(64), db.ForeignKey('campaign.id'), nullable=False, index=True)
+    # Id the document was saved under through the campaign document API
+    document_key = db.Column(db.String(64))
+    document_type = db.Column(db.String(40), nullable=False, default='medical_record')
+    text = db.Column(db.Text, nullable=False, default='')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CampaignDocument {self.id}>'
+
+    @property
+    def key(self):
+        return self.document_key or str(self.id)
+
+    def to_dict(self):
+        return {
+            'id': self.key,
+            'type': self.document_type,
+            'text': self.text
+        }
+
+
+class StoryQualityScore(db.Model):
+    campaign_id = db.Column(db.String(64), db.ForeignKey('campaign.id'), primary_key=True)
+    text_sha256 = db.Column(db.String(64), nullable=False)
+    scorer_version = db.Column(db.String(64), nullable=False, default='')
+    readability_score = db.Column(db.Float, nullable=False)
+    emotional_impact_score = db.Column(db.Float, nullable=False)
+    clarity_score = db.Column(db.Float, nullable=False)
+    quality_score = db.Column(db.Float, nullable=False, index=True)
+    scored_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoryQualityScore {self.campaign_id}>'
+
+    def to_dict(self):
+        return {
+            'campaign_id': self.campaign_id,
+            'readability_score': self.readability_score,
+            'emotional_impact_score': self.emotional_impact_score,
+            'clarity_score': self.clarity_score,
+            'quality_score': self.quality_score,
+            'scored_at': self.scored_at.isoformat()
+        }
@@ -8,25 +8,172 @@ This module provides REST API endpoints for all AI-powered features including:
 - Content optimization
 """
 
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, Response, request, session, jsonify, make_response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+from datetime import datetime, timezone
+import functools
+import os
+import time
+import tempfile
 import json
 import traceback
 
+from src.models.user import db
+from src.models.campaign import Campaign, CampaignDocument
 from src.services.campaign_ai import CampaignAI
-from src.services.verification_ai import VerificationAI, DocumentType, VerificationStatus
+from src.services.goal_outcomes import GoalOutcomeStore
+from src.services.verification_ai import (
+    VerificationAI, DocumentType, VerificationStatus, normalize_document_text, document_text_hash
+)
 from src.services.donor_matching_ai import DonorMatchingAI, MatchingStrategy
+from src.services.analysis_cache import DocumentAnalysisCache
+from src.services.near_duplicate import NearDuplicateIndex
+from src.services.document_fingerprints import DocumentFingerprintIndex
+from src.services.fraud_features import FraudFeatureStore
+from src.services.velocity import VelocityLimiter
+from src.services.fraud_rings import FraudRingGraph
+from src.services.blocklist import FraudBlocklist, BLOCKLIST_KINDS
+from src.services.name_matching import NameMatcher
+from src.services.verification_rules import VerificationRuleEngine
+from src.services.medical_knowledge import shared_knowledge_base
+from src.services.scoring_config import ScoringConfigStore
+from src.services.response_cache import ResponseCache
+from src.services.document_extraction import (
+    DocumentExtractionPipeline, DocumentTooLargeError, UnsupportedDocumentError
+)
+from src.services.decision_log import DecisionLog
+from src.services.writing_sessions import WritingSessionStore, EditRejected, SYNC_SECONDS
+from src.services.batch_fraud import score_fraud_records
+from src.services.batch_suggestions import suggest_campaign_records
+from src.services.ndjson import NDJSON_MIMETYPES, iter_ndjson_records, iter_json_array_records, dumps_line
 
 # Create blueprint for AI services
 ai_bp = Blueprint('ai_services', __name__)
 
+# Local storage for service caches and indexes, read when this module is first imported
+DATA_DIR = os.environ.get('SAVELIFE_DATA_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
+
+# How long cross-campaign fraud indexes remember a campaign
+INDEX_RETENTION_SECONDS = 365 * 86400
+
+# Largest document upload accepted, checked before the body is read
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# Campaign details saved from verify-campaign payloads
+CAMPAIGN_FIELDS = ('email', 'beneficiary_name', 'phone', 'address', 'goal_amount', 'description')
+
 # Initialize AI services
-campaign_ai = CampaignAI()
-verification_ai = VerificationAI()
-donor_matching_ai = DonorMatchingAI()
+medical_knowledge = shared_knowledge_base()
+scoring_config = ScoringConfigStore(os.path.join(DATA_DIR, 'scoring_config.json'))
+campaign_ai = CampaignAI(
+    goal_outcomes=GoalOutcomeStore(os.path.join(DATA_DIR, 'goal_outcomes.db')),
+    knowledge_base=medical_knowledge,
+    scoring_config=scoring_config
+)
+verification_ai = VerificationAI(
+    analysis_cache=DocumentAnalysisCache(os.path.join(DATA_DIR, 'analysis_cache.db')),
+    duplicate_index=NearDuplicateIndex(
+        os.path.join(DATA_DIR, 'near_duplicates.db'), retention_seconds=INDEX_RETENTION_SECONDS
+    ),
+    fingerprint_index=DocumentFingerprintIndex(
+        os.path.join(DATA_DIR, 'document_fingerprints.db'), retention_seconds=INDEX_RETENTION_SECONDS
+    ),
+    feature_store=FraudFeatureStore(os.path.join(DATA_DIR, 'fraud_features.db')),
+    velocity_limiter=VelocityLimiter(os.path.join(DATA_DIR, 'velocity.db')),
+    fraud_ring_graph=FraudRingGraph(
+        os.path.join(DATA_DIR, 'fraud_rings.db'), retention_seconds=INDEX_RETENTION_SECONDS
+    ),
+    blocklist=FraudBlocklist(os.path.join(DATA_DIR, 'fraud_blocklist.txt')),
+    name_matcher=NameMatcher(),
+    rule_engine=VerificationRuleEngine(rules_path=os.path.join(DATA_DIR, 'verification_rules.json')),
+    decision_log=DecisionLog(os.path.join(DATA_DIR, 'decision_log')),
+    knowledge_base=medical_knowledge,
+    scoring_config=scoring_config
+)
+document_pipeline = DocumentExtractionPipeline(verification_ai)
+donor_matching_ai = DonorMatchingAI(knowledge_base=medical_knowledge, scoring_config=scoring_config)
+writing_sessions = WritingSessionStore(os.path.join(DATA_DIR, 'writing_sessions.db'))
+# Responses are a few kilobytes, so about 10 MB of memory per worker and 250 MB on disk
+response_cache = ResponseCache(
+    max_entries=2000, ttl_seconds=300,
+    db_path=os.path.join(DATA_DIR, 'response_cache.db'), max_disk_entries=50000
+)
+
+
+@ai_bp.before_request
+def pin_scoring_config():
+    # A configuration reload during the request does not affect it
+    scoring_config.pin()
+
+
+@ai_bp.teardown_request
+def unpin_scoring_config(error=None):
+    scoring_config.unpin()
+
+
+def cached_response(*version_sources, disk=True):
+    """
+    Serve repeated identical JSON payloads from the response cache.
+
+    Only for endpoints whose response is a function of the payload and of the
+    versions returned by version_sources; only responses with status 200 are
+    cached. Endpoints whose responses carry personal data pass disk=False to
+    keep them out of the shared disk tier.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            payload = request.get_json(silent=True)
+            if not payload:
+                return view(*args, **kwargs)
+            
+            key = response_cache.key(request.path, payload, [source() for source in version_sources])
+            cached = response_cache.get(request.path, key, disk=disk)
+            if cached is not None:
+                status, body = cached
+                return Response(_refresh_timestamp(body), status=status, mimetype='application/json',
+                                headers={'X-Cache': 'HIT'})
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.put(key, response.status_code, response.get_data(), disk=disk)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _refresh_timestamp(body):
+    """A cached response body with its timestamp set to the time it is served"""
+    data = json.loads(body)
+    if not isinstance(data, dict) or 'timestamp' not in data:
+        return body
+    data['timestamp'] = datetime.now().isoformat()
+    return json.dumps(data)
+
+
+def _knowledge_version():
+    return medical_knowledge.version
+
+
+def _scoring_version():
+    return scoring_config.current().version
+
+
+def _goal_outcomes_generation():
+    return campaign_ai.goal_outcomes.generation
+
+
+def _ruleset_version():
+    return verification_ai.ruleset_version
+
+
+def _blocklist_generation():
+    return verification_ai.blocklist.generation
 
 
 @ai_bp.route('/campaign/suggestions', methods=['POST'])
+@cached_response(_knowledge_version, _scoring_version, _goal_outcomes_generation)
 def get_campaign_suggestions():
     """
     Generate AI-powered campaign suggestions
@@ -70,7 +217,37 @@ def get_campaign_suggestions():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/campaign/suggestions/batch', methods=['POST'])
+def get_campaign_suggestions_batch():
+    """
+    Generate suggestions for many campaigns in one streamed request
+    
+    Accepts a JSON array or NDJSON (Content-Type: application/x-ndjson) of
+    /campaign/suggestions payloads, each optionally with an "id". Streams NDJSON
+    results in input order, each with the title suggestions, goal recommendation
+    and condition analysis, followed by a {"summary": {...}} line.
+    """
+    try:
+        if request.mimetype in NDJSON_MIMETYPES:
+            records = iter_ndjson_records(iter(request.stream.readline, b''))
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({'error': 'Expected a JSON array or NDJSON body of campaign records'}), 400
+            records = iter_json_array_records(data)
+        
+        results = suggest_campaign_records(campaign_ai, records)
+        return Response(
+            stream_with_context(dumps_line(result) for result in results),
+            mimetype='application/x-ndjson'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @ai_bp.route('/campaign/title-suggestions', methods=['POST'])
+@cached_response()
 def get_title_suggestions():
     """
     Generate title suggestions for campaigns
@@ -107,6 +284,7 @@ def get_title_suggestions():
 
 
 @ai_bp.route('/campaign/goal-recommendation', methods=['POST'])
+@cached_response(_knowledge_version, _scoring_version, _goal_outcomes_generation)
 def get_goal_recommendation():
     """
     Get AI-powered funding goal recommendation
@@ -155,7 +333,59 @@ def get_goal_recommendation():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/campaign/outcomes', methods=['POST'])
+def record_campaign_outcomes():
+    """
+    Record closed campaigns for data-driven goal recommendations
+    
+    Expected JSON payload:
+    {
+        "outcomes": [
+            {
+                "medical_condition": "Description of condition",
+                "treatment_details": "Treatment plan details",
+                "insurance_coverage": "Insurance status",
+                "goal_amount": 50000,
+                "raised_amount": 42000
+            }
+        ]
+    }
+    
+    Recommendations pick up new outcomes when the statistics snapshot next refreshes.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        outcomes = data.get('outcomes', [])
+        if not outcomes or not isinstance(outcomes, list):
+            return jsonify({'error': 'Campaign outcomes are required'}), 400
+        
+        # Validate every outcome before recording any of them
+        for outcome in outcomes:
+            if not isinstance(outcome, dict) or not outcome.get('medical_condition'):
+                return jsonify({'error': 'Each outcome needs a medical_condition'}), 400
+            for field in ('goal_amount', 'raised_amount'):
+                amount = outcome.get(field)
+                if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount < 0:
+                    return jsonify({'error': f'Each outcome needs a non-negative {field}'}), 400
+        
+        cells = campaign_ai.record_campaign_outcomes(outcomes)
+        
+        return jsonify({
+            'recorded': len(cells),
+            'cells': [dict(zip(('condition', 'complexity', 'insurance'), cell)) for cell in cells],
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @ai_bp.route('/campaign/story-optimization', methods=['POST'])
+@cached_response(_knowledge_version)
 def optimize_story():
     """
     Analyze and optimize campaign story content
@@ -200,6 +430,7 @@ def optimize_story():
 
 
 @ai_bp.route('/campaign/writing-assistance', methods=['POST'])
+@cached_response()
 def get_writing_assistance():
     """
     Get real-time writing assistance
@@ -232,7 +463,179 @@ def get_writing_assistance():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/campaign/writing-sessions', methods=['POST'])
+def create_writing_session():
+    """
+    Start a live editing session for incremental writing assistance
+    
+    Expected JSON payload:
+    {
+        "text": "Initial text (optional)",
+        "section": "title|story|description",
+        "medical_condition": "Medical condition for story feedback context (optional)"
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        text = data.get('text', '')
+        medical_condition = data.get('medical_condition', '')
+        if not isinstance(text, str) or not isinstance(medical_condition, str):
+            return jsonify({'error': 'text and medical_condition must be strings'}), 400
+        
+        session_id, session = writing_sessions.create(data.get('section', 'story'), text, medical_condition)
+        
+        with session.lock:
+            response = _writing_session_feedback(session_id, session)
+        
+        return jsonify(response), 201
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/campaign/writing-sessions/<session_id>/edits', methods=['POST'])
+def edit_writing_session(session_id):
+    """
+    Apply text deltas to a writing session and get updated assistance
+    
+    Expected JSON payload (edits are applied in order, offsets refer to the
+    text as left by the previous edit):
+    {
+        "edits": [
+            {"start": 10, "end": 14, "text": "replacement"}
+        ],
+        "feedback": true
+    }
+    
+    Clients subscribed to the session's event stream send "feedback": false and
+    receive only the new version; assistance then arrives on the stream.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        edits = data.get('edits', [data] if 'start' in data else [])
+        if not edits:
+            return jsonify({'error': 'Edits are required'}), 400
+        
+        try:
+            session = writing_sessions.apply_edits(session_id, edits)
+        except EditRejected as e:
+            # Earlier edits stay applied; the version tells the client where it stopped
+            return jsonify({'error': str(e), 'version': e.version}), 400
+        if session is None:
+            return jsonify({'error': 'Writing session not found'}), 404
+        
+        with session.lock:
+            if data.get('feedback', True):
+                response = _writing_session_feedback(session_id, session)
+            else:
+                response = {'session_id': session_id, 'version': session.version}
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/campaign/writing-sessions/<session_id>/events', methods=['GET'])
+def stream_writing_session(session_id):
+    """
+    Server-sent events with writing assistance for a session as it is edited
+    
+    Sends a "feedback" event with the current assistance right away, then one
+    per burst of edits: edits are debounced and intermediate versions are
+    coalesced so only the latest text is evaluated. Story sessions also get
+    the story optimization analysis. Edits sent to another worker process
+    reach the stream through the shared session store within a second.
+    Each open stream occupies a worker thread until the client disconnects.
+    
+    Query parameters:
+    - debounce_ms: quiet period after the last edit before evaluating (default 300)
+    - max_delay_ms: longest wait while edits keep arriving (default 1000)
+    """
+    session = writing_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Writing session not found'}), 404
+    
+    debounce = request.args.get('debounce_ms', 300, type=int) / 1000
+    max_delay = request.args.get('max_delay_ms', 1000, type=int) / 1000
+    if debounce < 0 or max_delay < debounce:
+        return jsonify({'error': 'debounce_ms must be non-negative and at most max_delay_ms'}), 400
+    
+    def events():
+        yield 'retry: 3000\n\n'
+        current = session
+        version = None
+        kept_alive_at = time.monotonic()
+        while True:
+            if version is not None:
+                next_version = current.wait_for_edits(version, debounce, max_delay, timeout=SYNC_SECONDS)
+                if next_version is None:
+                    # Pick up edits saved by other processes, which the next wait then debounces,
+                    # and keep the session alive while a client is listening
+                    keep_alive = time.monotonic() - kept_alive_at >= 15
+                    current = writing_sessions.get(session_id, touch=keep_alive)
+                    if current is None:
+                        yield 'event: closed\ndata: {}\n\n'
+                        return
+                    if keep_alive:
+                        kept_alive_at = time.monotonic()
+                        yield ': keep-alive\n\n'
+                    continue
+            
+            with current.lock:
+                payload = _writing_session_feedback(session_id, current)
+                story = current.text if current.section == 'story' else None
+            version = payload['version']
+            
+            if story is not None:
+                analysis = campaign_ai.optimize_campaign_story(
+                    story, campaign_ai.analyze_medical_condition(current.medical_condition)
+                )
+                payload['story_analysis'] = {
+                    'readability_score': analysis.readability_score,
+                    'emotional_impact_score': analysis.emotional_impact_score,
+                    'clarity_score': analysis.clarity_score,
+                    'suggestions': analysis.suggestions
+                }
+            
+            yield f"id: {version}\nevent: feedback\ndata: {json.dumps(payload)}\n\n"
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@ai_bp.route('/campaign/writing-sessions/<session_id>', methods=['DELETE'])
+def close_writing_session(session_id):
+    """End a writing session"""
+    if not writing_sessions.close(session_id):
+        return jsonify({'error': 'Writing session not found'}), 404
+    
+    return jsonify({'closed': session_id, 'timestamp': datetime.now().isoformat()}), 200
+
+
+def _writing_session_feedback(session_id, session):
+    """Writing assistance for a session's current text; the caller holds the session lock"""
+    return {
+        'session_id': session_id,
+        'version': session.version,
+        'assistance': campaign_ai.writing_feedback(session.section, **session.feedback_counts()),
+        'word_count': session.word_count,
+        'sentence_count': session.sentence_count,
+        'length': session.length,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
 @ai_bp.route('/verification/analyze-document', methods=['POST'])
+@cached_response(_ruleset_version, _blocklist_generation, disk=False)
 def analyze_document():
     """
     Analyze document for verification
@@ -264,23 +667,102 @@ def analyze_document():
         # Analyze document
         analysis = verification_ai.analyze_document_text(document_text, document_type)
         
-        response = {
-            'document_type': analysis.document_type.value,
-            'authenticity_score': analysis.authenticity_score,
-            'extracted_data': analysis.extracted_data,
-            'confidence_score': analysis.confidence_score,
-            'verification_status': analysis.verification_status.value,
-            'flags': analysis.flags,
-            'processing_notes': analysis.processing_notes,
-            'timestamp': datetime.now().isoformat()
-        }
+        return jsonify(_serialize_document_analysis(analysis)), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/analyze-document/stream', methods=['POST'])
+def analyze_document_stream():
+    """
+    Analyze a large document sent as the raw request body, reading it in chunks
+    
+    Query parameters:
+        document_type: medical_record|insurance_document|identity_document|medical_bill|treatment_plan
+    
+    Body: UTF-8 document text (any content type other than form data)
+    """
+    try:
+        document_type_str = request.args.get('document_type', 'medical_record')
+        try:
+            document_type = DocumentType(document_type_str)
+        except ValueError:
+            return jsonify({'error': f'Invalid document type: {document_type_str}'}), 400
+        
+        analysis, text_hash = verification_ai.analyze_document_stream(request.stream, document_type)
+        
+        response = _serialize_document_analysis(analysis)
+        response['text_sha256'] = text_hash
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/analyze-document/upload', methods=['POST'])
+def analyze_document_upload():
+    """
+    Extract text from an uploaded PDF or plain-text file and analyze it page by page
+    
+    Multipart form fields:
+        document: the PDF or plain-text file (form feeds separate plain-text pages)
+        document_type: medical_record|insurance_document|identity_document|medical_bill|treatment_plan
+    
+    Uploads over MAX_UPLOAD_BYTES or with more pages than the pipeline's
+    max_pages are rejected with 413.
+    """
+    received_at = time.perf_counter()
+    try:
+        request.max_content_length = MAX_UPLOAD_BYTES
+        upload = request.files.get('document')
+        if upload is None or not upload.filename:
+            return jsonify({'error': 'Document file is required'}), 400
+        
+        document_type_str = request.form.get('document_type', 'medical_record')
+        try:
+            document_type = DocumentType(document_type_str)
+        except ValueError:
+            return jsonify({'error': f'Invalid document type: {document_type_str}'}), 400
         
+        handle, path = tempfile.mkstemp(prefix='upload-')
+        try:
+            with os.fdopen(handle, 'wb') as upload_file:
+                upload.save(upload_file)
+            analysis, text_hash, pages = document_pipeline.analyze_file(path, document_type, received_at)
+        except UnsupportedDocumentError as e:
+            return jsonify({'error': str(e)}), 415
+        except DocumentTooLargeError as e:
+            return jsonify({'error': str(e)}), 413
+        finally:
+            os.remove(path)
+        
+        response = _serialize_document_analysis(analysis)
+        response['text_sha256'] = text_hash
+        response['pages'] = pages
+        response['total_ms'] = round((time.perf_counter() - received_at) * 1000, 3)
         return jsonify(response), 200
         
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Uploads may be at most {MAX_UPLOAD_BYTES} bytes'}), 413
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+def _serialize_document_analysis(analysis):
+    """Convert a DocumentAnalysis to a JSON-serializable response"""
+    return {
+        'document_type': analysis.document_type.value,
+        'authenticity_score': analysis.authenticity_score,
+        'extracted_data': analysis.extracted_data,
+        'confidence_score': analysis.confidence_score,
+        'verification_status': analysis.verification_status.value,
+        'flags': analysis.flags,
+        'processing_notes': analysis.processing_notes,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
 @ai_bp.route('/verification/verify-campaign', methods=['POST'])
 def verify_campaign():
     """
@@ -291,7 +773,8 @@ def verify_campaign():
         "campaign_data": {
             "id": "campaign_id",
             "goal_amount": 50000,
-            "description": "Campaign description"
+            "description": "Campaign description",
+            "beneficiary_name": "Name of the patient"
         },
         "documents": [
             {
@@ -300,6 +783,11 @@ def verify_campaign():
             }
         ]
     }
+    
+    The campaign is counted for its stored owner, else the signed-in user; a
+    user_id in campaign_data naming anyone else is rejected. A campaign with an
+    id is saved along with its documents and verification result, so the
+    document routes and the batch commands see it.
     """
     try:
         data = request.get_json()
@@ -313,35 +801,249 @@ def verify_campaign():
         if not campaign_data:
             return jsonify({'error': 'Campaign data is required'}), 400
         
+        campaign_data = _with_campaign_owner(campaign_data)
+        if campaign_data is None:
+            return _owner_mismatch()
+        
+        # Defer bursts before running any document analysis
+        admitted, retry_after = verification_ai.admit_verification(campaign_data, request.remote_addr)
+        if not admitted:
+            return _too_many_requests(retry_after)
+        
+        # Campaigns with an id are saved with exactly these documents, which are then verified
+        campaign = None
+        if campaign_data.get('id') is not None:
+            campaign = _save_campaign(campaign_data, documents)
+            documents = [document.to_dict() for document in campaign.documents]
+        
         # Verify campaign
         verification_result = verification_ai.verify_campaign(campaign_data, documents)
         
-        response = {
-            'campaign_id': verification_result.campaign_id,
-            'overall_status': verification_result.overall_status.value,
-            'trust_score': verification_result.trust_score,
-            'document_analyses': [
-                {
-                    'document_type': doc.document_type.value,
-                    'authenticity_score': doc.authenticity_score,
-                    'verification_status': doc.verification_status.value,
-                    'flags': doc.flags,
-                    'extracted_data': doc.extracted_data
-                }
-                for doc in verification_result.document_analyses
-            ],
-            'verification_timestamp': verification_result.verification_timestamp.isoformat(),
-            'reviewer_notes': verification_result.reviewer_notes,
-            'next_steps': verification_result.next_steps,
-            'timestamp': datetime.now().isoformat()
-        }
+        if campaign is not None:
+            _save_verification(campaign, verification_result)
+            db.session.commit()
         
-        return jsonify(response), 200
+        return jsonify(_serialize_verification_result(verification_result)), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/campaigns/<campaign_id>/documents/<document_id>', methods=['PUT'])
+def upsert_campaign_document(campaign_id, document_id):
+    """
+    Add or replace one campaign document and re-verify incrementally
+    
+    The document is saved with the campaign, which is created if it is not
+    stored yet. The beneficiary, owner and saved documents of the campaign are
+    read from the database, so this checks the same things as verify-campaign
+    and every worker process counts the same documents.
+    
+    Expected JSON payload:
+    {
+        "type": "medical_record",
+        "text": "Document text content"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        try:
+            DocumentType(data.get('type', 'medical_record'))
+        except ValueError:
+            return jsonify({'error': f"Invalid document type: {data.get('type')}"}), 400
+        
+        campaign = Campaign.query.get(campaign_id)
+        campaign_data = campaign.to_dict() if campaign else {'id': campaign_id, 'user_id': session.get('user_id')}
+        
+        admitted, retry_after = verification_ai.admit_verification(campaign_data, request.remote_addr)
+        if not admitted:
+            return _too_many_requests(retry_after)
+        
+        if campaign is None:
+            campaign = Campaign(id=campaign_id, user_id=session.get('user_id'))
+            db.session.add(campaign)
+        stored_document = _find_stored_document(campaign, document_id)
+        if stored_document is None:
+            stored_document = CampaignDocument(document_key=document_id)
+            campaign.documents.append(stored_document)
+        stored_document.document_type = data.get('type', 'medical_record')
+        stored_document.text = data.get('text', '')
+        
+        verification_result = verification_ai.upsert_campaign_document(
+            campaign_data, document_id, data, _stored_documents_loader(campaign)
+        )
+        _save_verification(campaign, verification_result)
+        db.session.commit()
+        
+        return jsonify(_serialize_verification_result(verification_result)), 200
         
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/verification/campaigns/<campaign_id>/documents/<document_id>', methods=['DELETE'])
+def remove_campaign_document(campaign_id, document_id):
+    """Remove one saved campaign document and re-verify incrementally"""
+    try:
+        campaign = Campaign.query.get(campaign_id)
+        stored_document = _find_stored_document(campaign, document_id) if campaign else None
+        
+        if stored_document is None:
+            return jsonify({'error': 'Campaign document not found'}), 404
+        
+        campaign.documents.remove(stored_document)
+        verification_result = verification_ai.remove_campaign_document(
+            campaign.to_dict(), document_id, _stored_documents_loader(campaign)
+        )
+        _save_verification(campaign, verification_result)
+        db.session.commit()
+        
+        return jsonify(_serialize_verification_result(verification_result)), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/campaigns/<campaign_id>', methods=['DELETE'])
+def forget_campaign(campaign_id):
+    """Remove a deleted campaign from the near-duplicate, document fingerprint and fraud ring indexes"""
+    try:
+        removed = verification_ai.forget_campaign(campaign_id)
+        
+        return jsonify({
+            'campaign_id': campaign_id,
+            'removed': removed,
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+def _save_campaign(campaign_data, documents):
+    """
+    Store a campaign's details and make its saved documents exactly these; returns
+    the campaign. Documents without an id are matched to saved ones by content.
+    """
+    campaign_id = str(campaign_data['id'])
+    campaign = Campaign.query.get(campaign_id)
+    if campaign is None:
+        campaign = Campaign(id=campaign_id)
+        db.session.add(campaign)
+    if not campaign.user_id:
+        campaign.user_id = campaign_data.get('user_id')
+    for field in CAMPAIGN_FIELDS:
+        if campaign_data.get(field) is not None:
+            setattr(campaign, field, campaign_data[field])
+    
+    saved = {document.key: document for document in campaign.documents}
+    for document in documents:
+        document_type = document.get('type', 'medical_record')
+        text = document.get('text', '')
+        if document.get('id') is not None:
+            stored = saved.pop(str(document['id']), None) or CampaignDocument(document_key=str(document['id']))
+        else:
+            key = next((key for key, stored in saved.items()
+                        if stored.document_type == document_type and stored.text == text), None)
+            stored = saved.pop(key) if key is not None else CampaignDocument()
+        stored.document_type = document_type
+        stored.text = text
+        if stored.campaign is None:
+            campaign.documents.append(stored)
+    for stale in saved.values():
+        campaign.documents.remove(stale)
+    
+    # Documents saved without an id are keyed by their row id
+    db.session.flush()
+    return campaign
+
+
+def _save_verification(campaign, verification_result):
+    campaign.verification_status = verification_result.overall_status.value
+    campaign.trust_score = verification_result.trust_score
+    campaign.verified_at = datetime.now(timezone.utc)
+
+
+def _stored_documents_loader(campaign):
+    """Loader of a stored campaign's saved documents, which its verification state is rebuilt from"""
+    if campaign is None:
+        return None
+    return lambda: [document.to_dict() for document in campaign.documents]
+
+
+def _find_stored_document(campaign, document_id):
+    """Saved document of a campaign by the id it is addressed with in the document routes"""
+    for document in campaign.documents:
+        if document.key == document_id:
+            return document
+    return None
+
+
+def _with_campaign_owner(campaign_data):
+    """
+    Campaign data with user_id set to the owner known to the server: the stored
+    campaign's owner, else the signed-in user. A user_id in the payload is only
+    checked against that owner, never trusted on its own; returns None if it
+    names someone else.
+    """
+    campaign_id = campaign_data.get('id')
+    campaign = Campaign.query.get(str(campaign_id)) if campaign_id else None
+    owner = campaign.user_id if campaign is not None and campaign.user_id else session.get('user_id')
+    
+    claimed = campaign_data.get('user_id')
+    if claimed is not None and owner is not None and str(claimed) != str(owner):
+        return None
+    
+    campaign_data = {key: value for key, value in campaign_data.items() if key != 'user_id'}
+    if owner is not None:
+        campaign_data['user_id'] = owner
+    return campaign_data
+
+
+def _owner_mismatch():
+    return jsonify({'error': 'user_id does not match the campaign owner'}), 403
+
+
+def _too_many_requests(retry_after):
+    """Response asking the client to retry a deferred verification later"""
+    response = jsonify({
+        'error': 'Too many verification requests. Please retry later.',
+        'retry_after': retry_after
+    })
+    response.headers['Retry-After'] = str(int(retry_after))
+    return response, 429
+
+
+def _serialize_verification_result(verification_result):
+    """Convert a VerificationResult to a JSON-serializable response"""
+    return {
+        'campaign_id': verification_result.campaign_id,
+        'overall_status': verification_result.overall_status.value,
+        'trust_score': verification_result.trust_score,
+        'document_analyses': [
+            {
+                'document_type': doc.document_type.value,
+                'authenticity_score': doc.authenticity_score,
+                'verification_status': doc.verification_status.value,
+                'flags': doc.flags,
+                'extracted_data': doc.extracted_data
+            }
+            for doc in verification_result.document_analyses
+        ],
+        'verification_timestamp': verification_result.verification_timestamp.isoformat(),
+        'reviewer_notes': verification_result.reviewer_notes,
+        'next_steps': verification_result.next_steps,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+# Not cached: the score reads the near-duplicate index, fraud ring graph and owner features,
+# which any worker may change between identical requests, and each call indexes the
+# description and records the owner and a decision log entry, which a cache hit would skip
 @ai_bp.route('/verification/fraud-detection', methods=['POST'])
 def detect_fraud():
     """
@@ -350,13 +1052,19 @@ def detect_fraud():
     Expected JSON payload:
     {
         "campaign_data": {
+            "id": "campaign_id",
+            "user_id": "user_id",
             "goal_amount": 50000,
-            "description": "Campaign description"
-        },
-        "user_history": {
-            "previous_campaigns": 2
+            "description": "Campaign description",
+            "phone": "Optional contact phone",
+            "address": "Optional mailing address",
+            "bank_account": "Optional payout account"
         }
     }
+    
+    User history is read from the server-side fraud feature store for the
+    campaign owner: the stored campaign's owner, else the signed-in user. A
+    user_id naming anyone else is rejected.
     """
     try:
         data = request.get_json()
@@ -365,18 +1073,23 @@ def detect_fraud():
             return jsonify({'error': 'No data provided'}), 400
         
         campaign_data = data.get('campaign_data', {})
-        user_history = data.get('user_history', {})
         
         if not campaign_data:
             return jsonify({'error': 'Campaign data is required'}), 400
         
+        campaign_data = _with_campaign_owner(campaign_data)
+        if campaign_data is None:
+            return _owner_mismatch()
+        
         # Detect fraud indicators
-        fraud_analysis = verification_ai.detect_fraud_indicators(campaign_data, user_history)
+        fraud_analysis = verification_ai.detect_fraud_indicators(campaign_data)
         
         response = {
             'fraud_score': fraud_analysis['fraud_score'],
             'risk_level': fraud_analysis['risk_level'],
             'detected_indicators': fraud_analysis['detected_indicators'],
+            'duplicate_matches': fraud_analysis['duplicate_matches'],
+            'fraud_ring': fraud_analysis['fraud_ring'],
             'recommendation': fraud_analysis['recommendation'],
             'timestamp': datetime.now().isoformat()
         }
@@ -387,6 +1100,161 @@ def detect_fraud():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/verification/fraud-detection/batch', methods=['POST'])
+def detect_fraud_batch():
+    """
+    Score many campaigns for fraud in one streamed request
+    
+    Accepts a JSON array or NDJSON (Content-Type: application/x-ndjson) where each
+    record is either {"campaign_data": {...}, "user_history": {...}} or a bare
+    campaign_data object. Streams NDJSON results in input order, followed by a
+    {"summary": {...}} line reporting throughput in campaigns per second.
+    """
+    try:
+        if request.mimetype in NDJSON_MIMETYPES:
+            records = iter_ndjson_records(iter(request.stream.readline, b''))
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({'error': 'Expected a JSON array or NDJSON body of campaign records'}), 400
+            records = iter_json_array_records(data)
+        
+        batch_size = request.args.get('batch_size', 1000, type=int)
+        if batch_size < 1:
+            return jsonify({'error': 'batch_size must be positive'}), 400
+        
+        results = score_fraud_records(verification_ai, records, batch_size=batch_size)
+        return Response(
+            stream_with_context(dumps_line(result) for result in results),
+            mimetype='application/x-ndjson'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/blocklist', methods=['POST'])
+def add_blocklist_entries():
+    """
+    Add confirmed-fraud identifiers to the verification blocklist
+    
+    Expected JSON payload:
+    {
+        "entries": [
+            {"kind": "id_number|policy_number|document_sha256", "value": "..."},
+            {"kind": "document_text", "value": "Full text of a fraudulent document"}
+        ]
+    }
+    
+    Entries take effect in every worker process on their next lookup, and cached
+    document analyses from before them are no longer served.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        entries = data.get('entries', [])
+        if not entries:
+            return jsonify({'error': 'Blocklist entries are required'}), 400
+        
+        # Validate every entry before blocking any of them
+        resolved_entries = []
+        for entry in entries:
+            kind = entry.get('kind')
+            value = entry.get('value')
+            if not value:
+                return jsonify({'error': 'Each blocklist entry needs a value'}), 400
+            if kind == 'document_text':
+                kind, value = 'document_sha256', document_text_hash(normalize_document_text(value))
+            if kind not in BLOCKLIST_KINDS:
+                return jsonify({'error': f'Invalid blocklist kind: {kind}'}), 400
+            resolved_entries.append((kind, value))
+        
+        for kind, value in resolved_entries:
+            verification_ai.blocklist.add(kind, value)
+        
+        return jsonify({
+            'added': len(entries),
+            'blocklist_size': len(verification_ai.blocklist),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/decisions/<campaign_id>', methods=['GET'])
+def get_verification_decisions(campaign_id):
+    """
+    Get the logged verification and fraud decisions for a campaign, oldest first
+    
+    Query parameters:
+    - limit: only return the most recent decisions
+    """
+    try:
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+        
+        decisions = verification_ai.decision_log.lookup(campaign_id, limit=limit)
+        
+        return jsonify({
+            'campaign_id': campaign_id,
+            'decisions': decisions,
+            'total_decisions': len(decisions),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/rules/stats', methods=['GET'])
+def get_verification_rule_stats():
+    """Get per-rule hit counts and cumulative evaluation time for the active rules"""
+    try:
+        return jsonify(verification_ai.rule_engine.stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/verification/rules/reload', methods=['POST'])
+def reload_verification_rules():
+    """
+    Swap in new verification rules without a restart
+    
+    Expected JSON payload (optional; without it the rules file is re-read):
+    {
+        "rules": {
+            "medical_record": [{"id": "...", "type": "regex|regex_all|keyword|keyword_count|word_count", ...}],
+            "generic": [...]
+        }
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            if data.get('rules') is not None:
+                verification_ai.rule_engine.load(data['rules'], persist=True)
+            else:
+                verification_ai.rule_engine.reload()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'ruleset_version': verification_ai.ruleset_version,
+            'document_types': sorted(verification_ai.rule_engine.rules),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @ai_bp.route('/donor/profile', methods=['POST'])
 def create_donor_profile():
     """
@@ -503,6 +1371,54 @@ def find_matching_campaigns():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@ai_bp.route('/knowledge', methods=['GET'])
+def get_medical_knowledge():
+    """Get the version and contents summary of the shared medical knowledge base"""
+    try:
+        return jsonify(medical_knowledge.stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/knowledge/reload', methods=['POST'])
+def reload_medical_knowledge():
+    """Re-read the medical knowledge data file and swap it in for all AI services without a restart"""
+    try:
+        try:
+            medical_knowledge.reload()
+        except (OSError, ValueError) as e:
+            return jsonify({'error': f'Medical knowledge not reloaded: {str(e)}'}), 400
+        
+        return jsonify({
+            'knowledge_version': medical_knowledge.version,
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/cache/stats', methods=['GET'])
+def get_response_cache_stats():
+    """Get response cache hit rates for this worker, overall and per endpoint"""
+    try:
+        return jsonify(response_cache.stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@ai_bp.route('/scoring-config', methods=['GET'])
+def get_scoring_config():
+    """Get the active scoring weights and thresholds, reloaded automatically when the configuration file changes"""
+    try:
+        return jsonify(scoring_config.stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @ai_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for AI services"""
@@ -516,8 +1432,8 @@ def health_check():
         # Test campaign AI
         campaign_ai.analyze_medical_condition('test condition')
         
-        # Test verification AI
-        verification_ai.analyze_document_text('test document', DocumentType.MEDICAL_RECORD)
+        # Test verification AI; the rules are evaluated directly so no cache, index or rule statistic changes
+        verification_ai.rule_engine.evaluate(DocumentType.MEDICAL_RECORD.value, 'test document', record_stats=False)
         
         # Test donor matching AI
         test_donor_data = {'id': 'test', 'giving_history': []}
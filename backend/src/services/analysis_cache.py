@@ -0,0 +1,159 @@
+"""
+Document Analysis Cache for SaveLife.com
+
+This module provides a persistent, size-bounded cache for document analysis results:
+- Results keyed by document type, SHA-256 of the normalized text and ruleset version
+- SQLite storage shared by every worker process on the host
+- Access times recorded in memory and written back in batches, so cache hits
+  stay read-only transactions
+- Entries of every ruleset version kept side by side, so workers running
+  different versions during a deploy or rules reload never delete each
+  other's results; versions no longer in use age out instead
+- Least-recently-used eviction once the configured size bound is exceeded
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Any, Tuple
+
+
+class DocumentAnalysisCache:
+    """Persistent cache of serialized DocumentAnalysis results"""
+
+    def __init__(self, db_path: str, max_entries: int = 50000, evict_interval: int = 64,
+                 retention_seconds: float = 7 * 86400, touch_batch: int = 256, touch_interval: float = 30.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self.retention_seconds = retention_seconds
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        # (document_type, text_sha256, ruleset_version) -> access time not yet written back
+        self._pending_touches: Dict[Tuple[str, str, str], float] = {}
+        self._last_touch_flush = time.time()
+        self._hits = 0
+        self._misses = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS document_analyses (
+                document_type TEXT NOT NULL,
+                text_sha256 TEXT NOT NULL,
+                ruleset_version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (document_type, text_sha256, ruleset_version)
+            );
+            CREATE INDEX IF NOT EXISTS idx_document_analyses_last_access
+                ON document_analyses (last_access);
+        """)
+        self._conn.commit()
+
+    def get(self, document_type: str, text_sha256: str, ruleset_version: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis payload, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM document_analyses '
+                'WHERE document_type = ? AND text_sha256 = ? AND ruleset_version = ?',
+                (document_type, text_sha256, ruleset_version)
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            now = time.time()
+            self._pending_touches[(document_type, text_sha256, ruleset_version)] = now
+            if len(self._pending_touches) >= self.touch_batch or now - self._last_touch_flush >= self.touch_interval:
+                self._flush_touches(now)
+                self._conn.commit()
+            self._hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, document_type: str, text_sha256: str, ruleset_version: str, payload: Dict[str, Any]):
+        """Store an analysis payload, evicting least-recently-used entries when over capacity"""
+        serialized = json.dumps(payload, separators=(',', ':'))
+
+        with self._lock:
+            now = time.time()
+            self._pending_touches.pop((document_type, text_sha256, ruleset_version), None)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO document_analyses '
+                '(document_type, text_sha256, ruleset_version, payload, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (document_type, text_sha256, ruleset_version, serialized, now)
+            )
+
+            # Counting rows is a full scan, so only check the bound periodically
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.evict_interval:
+                self._puts_since_evict = 0
+                # Eviction orders by access time, so write back the pending ones first
+                self._flush_touches(now)
+                self._evict(now)
+
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._pending_touches.clear()
+            self._conn.execute('DELETE FROM document_analyses')
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / total if total else 0.0,
+                'max_entries': self.max_entries,
+                'retention_seconds': self.retention_seconds
+            }
+
+    def flush(self):
+        """Write back the access times of recent hits"""
+        with self._lock:
+            self._flush_touches(time.time())
+            self._conn.commit()
+
+    def _flush_touches(self, now: float):
+        if self._pending_touches:
+            # Never move an access time backwards past a more recent touch by another worker
+            self._conn.executemany(
+                'UPDATE document_analyses SET last_access = MAX(last_access, ?) '
+                'WHERE document_type = ? AND text_sha256 = ? AND ruleset_version = ?',
+                [(accessed_at, *key) for key, accessed_at in self._pending_touches.items()]
+            )
+            self._pending_touches.clear()
+        self._last_touch_flush = now
+
+    def _evict(self, now: float):
+        """Delete entries unused for the retention period, then the least recently used beyond max_entries"""
+        # Results of a ruleset version no worker runs any more stop being read and age out here
+        self._conn.execute(
+            'DELETE FROM document_analyses WHERE last_access < ?', (now - self.retention_seconds,)
+        )
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM document_analyses').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM document_analyses WHERE rowid IN ('
+                'SELECT rowid FROM document_analyses ORDER BY last_access LIMIT ?)',
+                (excess,)
+            )
@@ -0,0 +1,71 @@
+"""
+Batch Campaign Suggestions for SaveLife.com
+
+This module prepares suggestions for bulk campaign imports:
+- Condition analysis, title suggestions, goal recommendation and overall
+  suggestion computed together per campaign from one classification
+- Results yielded in input order as each campaign is processed
+- Per-record errors reported inline without aborting the batch
+- Throughput summary in campaigns per second
+"""
+
+import time
+from typing import Any, Dict, Iterable, Iterator
+
+from src.services.ndjson import ParsedRecord
+
+REQUIRED_FIELDS = ('name', 'medical_condition')
+
+
+def suggest_campaign_records(campaign_ai, records: Iterable[ParsedRecord]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one result per input record, followed by a final {"summary": {...}} entry.
+
+    Each record has the fields of a single /campaign/suggestions request, plus an
+    optional "id" echoed back as campaign_id.
+    """
+    start_time = time.perf_counter()
+    processed = 0
+    errors = 0
+
+    for index, record, error in records:
+        if error is None:
+            missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+            if missing:
+                error = f'Missing required field: {missing[0]}'
+
+        if error is None:
+            try:
+                plan = campaign_ai.generate_campaign_plan(record)
+            except Exception as e:
+                error = f'Suggestion failed: {str(e)}'
+
+        if error is not None:
+            errors += 1
+            yield {'index': index, 'error': error}
+            continue
+
+        processed += 1
+        suggestion = plan['suggestion']
+        yield {
+            'index': index,
+            'campaign_id': record.get('id'),
+            'title': suggestion.title,
+            'title_suggestions': plan['title_suggestions'],
+            'goal_amount': suggestion.goal_amount,
+            'goal_recommendation': plan['goal_recommendation'],
+            'story_framework': suggestion.story_framework,
+            'keywords': suggestion.keywords,
+            'confidence_score': suggestion.confidence_score,
+            'condition_analysis': plan['condition_analysis']
+        }
+
+    elapsed = time.perf_counter() - start_time
+    yield {
+        'summary': {
+            'processed': processed,
+            'errors': errors,
+            'elapsed_seconds': round(elapsed, 3),
+            'campaigns_per_second': round(processed / elapsed, 1) if elapsed > 0 else None
+        }
+    }
@@ -0,0 +1,163 @@
+"""
+Fraud Blocklist Service for SaveLife.com
+
+This module keeps confirmed-fraud identifiers in a memory-compact Bloom filter:
+- ID numbers, insurance policy numbers and document hashes
+- Loaded from a local "kind:value" file, one entry per line, shared by every
+  worker process on the host
+- Updated on the fly, with new entries appended to the same file; each lookup
+  first reads any entries other processes appended, so an addition takes
+  effect everywhere at once
+- Constant-time membership checks with a configurable false positive rate
+"""
+
+import os
+import math
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+BLOCKLIST_KINDS = ('id_number', 'policy_number', 'document_sha256')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing"""
+
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+
+class FraudBlocklist:
+    """Bloom-filter blocklist of confirmed-fraud identifiers and document hashes"""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1000000, error_rate: float = 1e-6):
+        self.path = path
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+        # Identity of the blocklist file read into the filter, and how many of its bytes
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        # Additions to a blocklist without a file
+        self._local_generation = 0
+        self._sync()
+
+    def __len__(self) -> int:
+        self._sync()
+        return self._filter.count
+
+    @property
+    def generation(self) -> str:
+        """Changes whenever any process adds an entry, so it can version cached results"""
+        self._sync()
+        if not self.path:
+            return str(self._local_generation)
+        return f"{self._file_id[1] if self._file_id else 0}:{self._offset}"
+
+    def add(self, kind: str, value: str):
+        """Block a value immediately, in every process sharing the blocklist file"""
+        if kind not in BLOCKLIST_KINDS:
+            raise ValueError(f"Unknown blocklist kind: {kind}")
+
+        entry = f"{kind}:{_normalize(kind, value)}"
+        with self._lock:
+            if not self.path:
+                self._filter.add(entry)
+                self._local_generation += 1
+                return
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One short append is atomic, so concurrent writers never interleave entries
+            with open(self.path, 'a', encoding='utf-8') as blocklist_file:
+                blocklist_file.write(entry + '\n')
+        # Read back through the file like any other process, so every process sees the same entries
+        self._sync()
+
+    def contains(self, kind: str, value: str) -> bool:
+        self._sync()
+        return f"{kind}:{_normalize(kind, value)}" in self._filter
+
+    def blocked_identifiers(self, extracted_data: Dict[str, Any]) -> List[str]:
+        """Identifier kinds in extracted document data that are on the blocklist"""
+        return [
+            kind for kind in ('id_number', 'policy_number')
+            if extracted_data.get(kind) and self.contains(kind, extracted_data[kind])
+        ]
+
+    def _sync(self):
+        """Read entries other processes appended to the file since the last check"""
+        if not self.path:
+            return
+        # One stat per lookup while the file is unchanged
+        if self._file_state() == (self._file_id, self._offset):
+            return
+
+        with self._lock:
+            # Checked again, since another thread may have read the new entries meanwhile
+            file_id, size = self._file_state()
+            if file_id != self._file_id or size < self._offset:
+                # Replaced or truncated rather than appended to, so start over
+                self._filter = BloomFilter(self._filter.capacity, self.error_rate)
+                self._file_id, self._offset = file_id, 0
+            if file_id is None:
+                return
+
+            with open(self.path, 'rb') as blocklist_file:
+                blocklist_file.seek(self._offset)
+                data = blocklist_file.read()
+            # A line without its newline is still being written; it is read on a later check
+            complete = data[:data.rfind(b'\n') + 1]
+            self._add_lines(self._filter, complete)
+            self._offset += len(complete)
+
+            # Past capacity the false positive rate climbs, so rebuild a larger filter
+            if self._filter.count > self._filter.capacity:
+                with open(self.path, 'rb') as blocklist_file:
+                    data = blocklist_file.read(self._offset)
+                bloom = BloomFilter(self._filter.capacity * 2, self.error_rate)
+                self._add_lines(bloom, data)
+                self._filter = bloom
+
+    def _file_state(self) -> Tuple[Optional[Tuple[int, int]], int]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return (stat.st_dev, stat.st_ino), stat.st_size
+
+    @staticmethod
+    def _add_lines(bloom: BloomFilter, data: bytes):
+        for line in data.decode('utf-8', errors='replace').splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                kind, _, value = line.partition(':')
+                bloom.add(f"{kind}:{_normalize(kind, value)}")
+
+
+def _normalize(kind: str, value: Any) -> str:
+    value = str(value).strip().lower()
+    if kind == 'document_sha256':
+        return value
+    return ''.join(char for char in value if char.isalnum())
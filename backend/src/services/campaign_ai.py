@@ -11,10 +11,51 @@ This service provides AI-powered assistance for campaign creation including:
 import re
 import json
 import random
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from src.services.text_stats import TextStats
+from src.services.medical_knowledge import MedicalKnowledgeBase, shared_knowledge_base
+from src.services.scoring_config import DEFAULT_SCORING_CONFIG, current_config
+
+# Words whose presence (as substrings of the lowercased text) drives writing feedback
+WRITING_KEYWORDS = ('help', 'support', 'fund', 'thank', 'grateful', 'appreciate')
+
+# Whole words counted towards a story's emotional impact
+EMOTIONAL_KEYWORDS = ('help', 'hope', 'family', 'love', 'support', 'grateful', 'thank', 'appreciate')
+
+# Insurance categories in precedence order: (category, phrases, goal multiplier)
+INSURANCE_CATEGORIES = (
+    ('uninsured', ('no insurance', 'uninsured'), 1.5),
+    ('limited', ('limited coverage', 'high deductible'), 1.3),
+    ('denied', ('denied',), 1.4)
+)
+
+
+def treatment_complexity(treatment_details: Optional[str],
+                         complexity_factors: Optional[Mapping[str, float]] = None) -> Tuple[str, float]:
+    """Most demanding treatment factor mentioned and its multiplier, or ('standard', 1.0)"""
+    if complexity_factors is None:
+        complexity_factors = DEFAULT_SCORING_CONFIG.complexity_factors
+    treatment_lower = treatment_details.lower() if treatment_details else ""
+    complexity, multiplier = 'standard', 1.0
+    for factor, value in complexity_factors.items():
+        if value > multiplier and factor in treatment_lower:
+            complexity, multiplier = factor, value
+    return complexity, multiplier
+
+
+def insurance_category(insurance_coverage: Optional[str]) -> Tuple[str, float]:
+    """Insurance situation category and its multiplier"""
+    insurance_lower = insurance_coverage.lower() if insurance_coverage else ""
+    for category, phrases, multiplier in INSURANCE_CATEGORIES:
+        if any(phrase in insurance_lower for phrase in phrases):
+            return category, multiplier
+    return ('other' if insurance_lower.strip() else 'unknown'), 1.0
+
 
 @dataclass
 class CampaignSuggestion:
@@ -39,40 +80,12 @@ class ContentAnalysis:
 class CampaignAI:
     """AI service for campaign creation assistance"""
     
-    def __init__(self):
-        self.medical_conditions = {
-            'cancer': {
-                'keywords': ['treatment', 'chemotherapy', 'radiation', 'surgery', 'oncology'],
-                'avg_goal': 75000,
-                'success_rate': 0.65,
-                'story_framework': 'Medical Journey with Treatment Plan'
-            },
-            'emergency': {
-                'keywords': ['urgent', 'immediate', 'emergency', 'critical', 'life-saving'],
-                'avg_goal': 50000,
-                'success_rate': 0.72,
-                'story_framework': 'Emergency Medical Crisis'
-            },
-            'pediatric': {
-                'keywords': ['child', 'children', 'pediatric', 'kids', 'family'],
-                'avg_goal': 85000,
-                'success_rate': 0.78,
-                'story_framework': 'Family Support for Child\'s Medical Needs'
-            },
-            'chronic': {
-                'keywords': ['chronic', 'ongoing', 'long-term', 'management', 'quality of life'],
-                'avg_goal': 45000,
-                'success_rate': 0.58,
-                'story_framework': 'Living with Chronic Condition'
-            },
-            'mental_health': {
-                'keywords': ['mental health', 'therapy', 'counseling', 'psychiatric', 'wellness'],
-                'avg_goal': 25000,
-                'success_rate': 0.62,
-                'story_framework': 'Mental Health Recovery Journey'
-            }
-        }
-        
+    def __init__(self, goal_outcomes=None, knowledge_base: Optional[MedicalKnowledgeBase] = None,
+                 scoring_config=None, max_condition_memo: int = 10000):
+        self.goal_outcomes = goal_outcomes
+        self.knowledge_base = knowledge_base or shared_knowledge_base()
+        self.scoring_config = scoring_config
+
         self.title_templates = [
             "Help {name} Fight {condition}",
             "Support {name}'s {treatment} Journey",
@@ -122,24 +135,48 @@ class CampaignAI:
                 'tone': 'caring, protective, hopeful'
             }
         }
+        
+        # Condition analyses by knowledge base version and normalized description,
+        # least recently used first
+        self._condition_memo: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self._condition_memo_lock = threading.Lock()
+        self.max_condition_memo = max_condition_memo
+
+    @property
+    def medical_conditions(self):
+        return self.knowledge_base.snapshot.conditions
 
     def analyze_medical_condition(self, description: str) -> Dict[str, any]:
         """Analyze medical condition description to categorize and provide insights"""
-        description_lower = description.lower()
-        
-        # Simple keyword-based classification
-        condition_scores = {}
-        for condition, data in self.medical_conditions.items():
-            score = sum(1 for keyword in data['keywords'] if keyword in description_lower)
-            if score > 0:
-                condition_scores[condition] = score
+        normalized = ' '.join((description or '').lower().split())
+        knowledge = self.knowledge_base.snapshot
+        memo_key = (knowledge.version, normalized)
+        
+        with self._condition_memo_lock:
+            analysis = self._condition_memo.get(memo_key)
+            if analysis is not None:
+                self._condition_memo.move_to_end(memo_key)
+        
+        if analysis is None:
+            analysis = self._classify_medical_condition(normalized, knowledge)
+            with self._condition_memo_lock:
+                self._condition_memo[memo_key] = analysis
+                if len(self._condition_memo) > self.max_condition_memo:
+                    self._condition_memo.popitem(last=False)
+        
+        # Callers may modify the result, so never hand out the memoized one
+        return {**analysis, 'relevant_keywords': list(analysis['relevant_keywords'])}
+
+    def _classify_medical_condition(self, normalized_description: str, knowledge) -> Dict[str, any]:
+        """Keyword-based classification of a lowercased, whitespace-normalized description"""
+        condition_scores = knowledge.condition_classifier.scores(normalized_description)
         
         if not condition_scores:
-            primary_condition = 'chronic'  # Default fallback
+            primary_condition = knowledge.default_condition
         else:
             primary_condition = max(condition_scores.keys(), key=lambda k: condition_scores[k])
         
-        condition_data = self.medical_conditions[primary_condition]
+        condition_data = knowledge.conditions[primary_condition]
         
         return {
             'primary_condition': primary_condition,
@@ -190,54 +227,64 @@ class CampaignAI:
     def calculate_goal_recommendation(self, condition_analysis: Dict, treatment_details: str, 
                                     insurance_coverage: str = None) -> Dict[str, any]:
         """Calculate recommended funding goal based on condition and treatment"""
-        base_amount = condition_analysis['suggested_goal']
-        
-        # Adjust based on treatment complexity
-        treatment_lower = treatment_details.lower() if treatment_details else ""
-        
-        # Treatment complexity multipliers
-        complexity_factors = {
-            'surgery': 1.3,
-            'chemotherapy': 1.4,
-            'radiation': 1.2,
-            'transplant': 2.0,
-            'experimental': 1.8,
-            'clinical trial': 1.5,
-            'specialist': 1.2,
-            'emergency': 1.4,
-            'icu': 1.6,
-            'rehabilitation': 1.3
-        }
-        
-        multiplier = 1.0
-        for factor, value in complexity_factors.items():
-            if factor in treatment_lower:
-                multiplier = max(multiplier, value)
-        
-        # Insurance adjustment
-        insurance_lower = insurance_coverage.lower() if insurance_coverage else ""
-        if 'no insurance' in insurance_lower or 'uninsured' in insurance_lower:
-            multiplier *= 1.5
-        elif 'limited coverage' in insurance_lower or 'high deductible' in insurance_lower:
-            multiplier *= 1.3
-        elif 'denied' in insurance_lower:
-            multiplier *= 1.4
-        
-        recommended_amount = int(base_amount * multiplier)
+        complexity_factors = current_config(self.scoring_config).complexity_factors
+        complexity, complexity_multiplier = treatment_complexity(treatment_details, complexity_factors)
+        insurance, insurance_multiplier = insurance_category(insurance_coverage)
+        multiplier = complexity_multiplier * insurance_multiplier
+        
+        # Prefer what comparable closed campaigns actually raised once there is enough history
+        outcomes = None
+        if self.goal_outcomes is not None:
+            outcomes = self.goal_outcomes.lookup((condition_analysis['primary_condition'], complexity, insurance))
+        
+        if outcomes is not None:
+            base_amount = outcomes['goal_quantiles']['p50']
+            recommended_amount = outcomes['raised_quantiles']['p50']
+            reasoning = (
+                f"Based on amounts raised by {outcomes['sample_size']} closed "
+                f"{condition_analysis['primary_condition']} campaigns with similar treatment and insurance"
+            )
+        else:
+            base_amount = condition_analysis['suggested_goal']
+            recommended_amount = int(base_amount * multiplier)
+            reasoning = f"Based on {condition_analysis['primary_condition']} treatment complexity and insurance situation"
         
         # Round to nearest 5000 for cleaner goals
         recommended_amount = round(recommended_amount / 5000) * 5000
         
-        return {
+        recommendation = {
             'recommended_amount': recommended_amount,
             'base_amount': base_amount,
             'complexity_multiplier': multiplier,
-            'reasoning': f"Based on {condition_analysis['primary_condition']} treatment complexity and insurance situation",
+            'reasoning': reasoning,
             'confidence': condition_analysis['confidence'] * 0.8  # Slightly lower confidence for goal prediction
         }
+        if outcomes is not None:
+            recommendation['historical_outcomes'] = outcomes
+        return recommendation
+
+    def record_campaign_outcomes(self, outcomes: List[Dict]) -> List[Tuple[str, str, str]]:
+        """
+        Add closed campaigns (medical_condition, treatment_details, insurance_coverage,
+        goal_amount, raised_amount) to the goal outcome statistics; returns their cells
+        """
+        complexity_factors = current_config(self.scoring_config).complexity_factors
+        keys = [
+            (
+                self.analyze_medical_condition(outcome.get('medical_condition', ''))['primary_condition'],
+                treatment_complexity(outcome.get('treatment_details'), complexity_factors)[0],
+                insurance_category(outcome.get('insurance_coverage'))[0]
+            )
+            for outcome in outcomes
+        ]
+        self.goal_outcomes.record_many([
+            (key, outcome['goal_amount'], outcome['raised_amount']) for key, outcome in zip(keys, outcomes)
+        ])
+        return keys
 
-    def optimize_campaign_story(self, story: str, condition_analysis: Dict) -> ContentAnalysis:
-        """Analyze and optimize campaign story content"""
+    def optimize_campaign_story(self, story: str, condition_analysis: Dict,
+                                stats: Optional[TextStats] = None) -> ContentAnalysis:
+        """Analyze and optimize campaign story content; stats may be precomputed for the story"""
         if not story or len(story.strip()) < 50:
             return ContentAnalysis(
                 readability_score=0.3,
@@ -252,22 +299,22 @@ class CampaignAI:
                 optimized_content=story
             )
         
+        stats = stats or TextStats(story)
+        
         # Simple content analysis
-        word_count = len(story.split())
-        sentence_count = len([s for s in story.split('.') if s.strip()])
-        avg_sentence_length = word_count / max(sentence_count, 1)
+        word_count = stats.word_count
+        avg_sentence_length = word_count / max(stats.sentence_count, 1)
         
         # Readability score (simplified)
         readability_score = min(1.0, max(0.0, 1.0 - (avg_sentence_length - 15) / 20))
         
         # Emotional impact analysis (keyword-based)
-        emotional_keywords = ['help', 'hope', 'family', 'love', 'support', 'grateful', 'thank', 'appreciate']
-        emotional_count = sum(1 for word in story.lower().split() if word in emotional_keywords)
+        emotional_count = stats.count_tokens(EMOTIONAL_KEYWORDS)
         emotional_impact_score = min(1.0, emotional_count / 10)
         
         # Clarity analysis
         medical_terms = condition_analysis.get('relevant_keywords', [])
-        medical_clarity = sum(1 for term in medical_terms if term in story.lower())
+        medical_clarity = len(stats.keyword_hits(medical_terms))
         clarity_score = min(1.0, medical_clarity / max(len(medical_terms), 1))
         
         # Generate suggestions
@@ -280,7 +327,7 @@ class CampaignAI:
             suggestions.append("Include more specific medical details about the condition.")
         if word_count < 200:
             suggestions.append("Expand your story to 200-300 words for better engagement.")
-        if 'thank' not in story.lower() and 'grateful' not in story.lower():
+        if not stats.keyword_hits(('thank', 'grateful')):
             suggestions.append("Express gratitude to potential donors.")
         
         # Simple content optimization
@@ -298,6 +345,13 @@ class CampaignAI:
 
     def generate_campaign_suggestions(self, campaign_data: Dict) -> CampaignSuggestion:
         """Generate comprehensive campaign suggestions"""
+        return self.generate_campaign_plan(campaign_data)['suggestion']
+
+    def generate_campaign_plan(self, campaign_data: Dict) -> Dict[str, any]:
+        """
+        Condition analysis, title suggestions, goal recommendation and overall
+        suggestion for a campaign, classifying its condition once
+        """
         name = campaign_data.get('name', 'Patient')
         condition_description = campaign_data.get('medical_condition', '')
         treatment_details = campaign_data.get('treatment_plan', '')
@@ -315,22 +369,36 @@ class CampaignAI:
             condition_analysis, treatment_details, campaign_data.get('insurance_status')
         )
         
-        # Get story framework
-        framework = self.story_frameworks.get(
-            condition_analysis['story_framework'], 
-            self.story_frameworks['Medical Journey with Treatment Plan']
-        )
-        
-        return CampaignSuggestion(
+        suggestion = CampaignSuggestion(
             title=title_suggestions[0] if title_suggestions else f"Help {name} with Medical Treatment",
             goal_amount=goal_recommendation['recommended_amount'],
             story_framework=condition_analysis['story_framework'],
             keywords=condition_analysis['relevant_keywords'],
             confidence_score=min(condition_analysis['confidence'], goal_recommendation['confidence'])
         )
+        
+        return {
+            'condition_analysis': condition_analysis,
+            'title_suggestions': title_suggestions,
+            'goal_recommendation': goal_recommendation,
+            'suggestion': suggestion
+        }
+
+    def get_writing_assistance(self, current_text: str, section: str,
+                               stats: Optional[TextStats] = None) -> Dict[str, any]:
+        """Provide real-time writing assistance; stats may be precomputed for the text"""
+        stats = stats or TextStats(current_text)
+        
+        return self.writing_feedback(
+            section,
+            word_count=stats.word_count,
+            first_person_count=stats.pronoun_counts['i'],
+            keywords=stats.keyword_hits(WRITING_KEYWORDS)
+        )
 
-    def get_writing_assistance(self, current_text: str, section: str) -> Dict[str, any]:
-        """Provide real-time writing assistance"""
+    def writing_feedback(self, section: str, word_count: int, first_person_count: int,
+                         keywords: Set[str]) -> Dict[str, any]:
+        """Writing assistance from text counts; keywords are the WRITING_KEYWORDS present"""
         assistance = {
             'suggestions': [],
             'improvements': [],
@@ -338,12 +406,10 @@ class CampaignAI:
             'length_feedback': ''
         }
         
-        word_count = len(current_text.split()) if current_text else 0
-        
         if section == 'title':
             if word_count > 10:
                 assistance['suggestions'].append("Keep titles concise - aim for 5-8 words")
-            if not any(word in current_text.lower() for word in ['help', 'support', 'fund']):
+            if not keywords & {'help', 'support', 'fund'}:
                 assistance['suggestions'].append("Include action words like 'Help' or 'Support'")
                 
         elif section == 'story':
@@ -354,10 +420,10 @@ class CampaignAI:
             else:
                 assistance['length_feedback'] = f"Good length ({word_count} words). Target range is 200-300 words."
             
-            if 'I' in current_text and current_text.count('I') > word_count * 0.1:
+            if first_person_count > word_count * 0.1:
                 assistance['tone_feedback'] = "Consider focusing more on the patient's needs rather than using 'I' frequently."
             
-            if not any(word in current_text.lower() for word in ['thank', 'grateful', 'appreciate']):
+            if not keywords & {'thank', 'grateful', 'appreciate'}:
                 assistance['suggestions'].append("Express gratitude to potential donors")
         
         return assistance
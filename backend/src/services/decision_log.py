@@ -0,0 +1,289 @@
+"""
+Decision Log for SaveLife.com
+
+This module keeps an append-only audit trail of verification and fraud decisions:
+- One NDJSON record per decision with input hashes, scores, flags and ruleset version
+- Group commit: a background writer batches queued records into one write and
+  fsync, so logging a decision never waits on the disk
+- Segment files rotated by size; sealed segments are never modified again
+- Safe to share between worker processes: each write takes an exclusive file
+  lock and goes to the first segment that is not yet full
+- A compact in-memory index from campaign id to record offsets, built by
+  tailing the segments so it includes every process's records, and saved
+  next to each sealed segment so startup only rescans the active one
+"""
+
+import os
+import json
+import time
+import fcntl
+import atexit
+import hashlib
+import threading
+import traceback
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.ndjson import dumps_line
+
+SEGMENT_PREFIX = 'decisions-'
+SEGMENT_SUFFIX = '.log'
+INDEX_SUFFIX = '.idx'
+
+# Index entries pack the segment number above the byte offset into one integer
+OFFSET_BITS = 40
+
+
+def input_hash(payload: Any) -> str:
+    """SHA-256 of a canonical JSON encoding of a decision input"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class DecisionLog:
+    """Append-only, segment-rotated log of decisions, indexed by campaign id"""
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 max_batch: int = 1024, commit_interval: float = 0.005):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_batch = max_batch
+        self.commit_interval = commit_interval
+
+        self._index: Dict[str, array] = {}
+        self._index_lock = threading.Lock()
+        # Position up to which the segments have been indexed, and the offsets by
+        # campaign id of the segment being tailed, saved when it is sealed
+        self._scan_segment = 1
+        self._scan_position = 0
+        self._segment_offsets: Dict[str, List[int]] = {}
+
+        # Records waiting for the writer, and how many have been queued and committed
+        self._queue: List[Tuple[str, str]] = []
+        self._queued = 0
+        self._committed = 0
+        self._failed = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        os.makedirs(directory, exist_ok=True)
+        self._segment = self._load_segments()
+        self._file = open(self._segment_path(self._segment), 'a+b')
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._catch_up()
+
+        self._writer = threading.Thread(target=self._run_writer, name='decision-log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def append(self, kind: str, campaign_id: Optional[str], decision: Dict[str, Any]):
+        """Queue a decision record; it is durable once the writer's next group commit finishes"""
+        record = {'ts': time.time(), 'kind': kind, 'campaign_id': campaign_id, **decision}
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Decision log is closed')
+            self._queue.append((str(campaign_id) if campaign_id is not None else '', dumps_line(record)))
+            self._queued += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every record queued so far is committed; returns False on timeout"""
+        with self._cond:
+            target = self._queued
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def lookup(self, campaign_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Committed decisions for a campaign, oldest first (the latest `limit` if given)"""
+        self.flush()
+        with self._index_lock:
+            self._catch_up()
+            entries = self._index.get(str(campaign_id))
+            entries = list(entries[-limit:] if limit else entries) if entries else []
+
+        records = []
+        mask = (1 << OFFSET_BITS) - 1
+        open_segment, segment_file = None, None
+        try:
+            for entry in entries:
+                segment = entry >> OFFSET_BITS
+                if segment != open_segment:
+                    if segment_file is not None:
+                        segment_file.close()
+                    segment_file = open(self._segment_path(segment), 'rb')
+                    open_segment = segment
+                segment_file.seek(entry & mask)
+                records.append(json.loads(segment_file.readline()))
+        finally:
+            if segment_file is not None:
+                segment_file.close()
+        return records
+
+    def stats(self) -> Dict[str, Any]:
+        with self._index_lock:
+            self._catch_up()
+            campaigns = len(self._index)
+            indexed = sum(len(entries) for entries in self._index.values())
+        with self._cond:
+            pending = len(self._queue)
+        return {
+            'active_segment': self._segment,
+            'active_segment_bytes': self._size,
+            'campaigns': campaigns,
+            'indexed_decisions': indexed,
+            'pending': pending,
+            'failed_writes': self._failed
+        }
+
+    def close(self):
+        """Commit queued records and stop the writer"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue and self._closed:
+                    return
+            # Let concurrent requests join this commit
+            if not self._closed and self.commit_interval:
+                time.sleep(self.commit_interval)
+            with self._cond:
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+
+            try:
+                self._commit(batch)
+            except OSError:
+                # Waiters must not hang on a failed disk; the loss is reported in stats
+                traceback.print_exc()
+                self._failed += len(batch)
+
+            with self._cond:
+                self._committed += len(batch)
+                self._cond.notify_all()
+
+    def _commit(self, batch: List[Tuple[str, str]]):
+        """Append a batch with a single write and fsync, under an exclusive lock shared with other processes"""
+        data = b''.join(line.encode('utf-8') for _, line in batch)
+
+        fd = self._lock_writable_segment()
+        try:
+            size = self._repair_tail(fd)
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(fd)
+            self._size = size + len(data)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _lock_writable_segment(self) -> int:
+        """Lock the first segment that is not full, moving on from full ones; returns its descriptor"""
+        while True:
+            fd = self._file.fileno()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            # Every process rotates at the same size, so all of them write to the same segment
+            if os.fstat(fd).st_size < self.segment_bytes:
+                return fd
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            self._file.close()
+            self._segment += 1
+            self._file = open(self._segment_path(self._segment), 'a+b')
+
+    @staticmethod
+    def _repair_tail(fd: int) -> int:
+        """Drop a torn trailing line left by a crashed writer; returns the resulting size"""
+        size = os.fstat(fd).st_size
+        if not size or os.pread(fd, 1, size - 1) == b'\n':
+            return size
+        end = size
+        while end > 0:
+            start = max(end - 65536, 0)
+            newline = os.pread(fd, end - start, start).rfind(b'\n')
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        os.ftruncate(fd, end)
+        return end
+
+    def _catch_up(self):
+        """Index records appended since the last call, by any process; the index lock must be held"""
+        while True:
+            # Checked before reading: once the next segment exists nothing more is written to this one
+            sealed = os.path.exists(self._segment_path(self._scan_segment + 1))
+            self._scan_from(self._scan_segment, self._scan_position)
+            if not sealed:
+                return
+            self._write_segment_index(self._scan_segment)
+            self._scan_segment += 1
+            self._scan_position = 0
+
+    def _scan_from(self, segment: int, position: int):
+        try:
+            segment_file = open(self._segment_path(segment), 'rb')
+        except FileNotFoundError:
+            return
+        with segment_file:
+            segment_file.seek(position)
+            for line in segment_file:
+                if not line.endswith(b'\n'):
+                    # Still being written, or torn by a crash; a complete line replaces it later
+                    break
+                campaign_id = json.loads(line).get('campaign_id')
+                if campaign_id:
+                    self._add_to_index(str(campaign_id), (segment << OFFSET_BITS) | position)
+                position += len(line)
+        self._scan_position = position
+
+    def _add_to_index(self, campaign_id: str, entry: int):
+        self._index.setdefault(campaign_id, array('Q')).append(entry)
+        self._segment_offsets.setdefault(campaign_id, []).append(entry & ((1 << OFFSET_BITS) - 1))
+
+    def _write_segment_index(self, segment: int):
+        offsets = self._segment_offsets
+        self._segment_offsets = {}
+
+        index_path = self._index_path(segment)
+        if os.path.exists(index_path):
+            return
+        # Another process may be saving the same index; each writes its own temporary file
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(offsets, index_file, separators=(',', ':'))
+        os.replace(temp_path, index_path)
+
+    def _load_segments(self) -> int:
+        """Load the saved indexes of sealed segments; returns the last segment number"""
+        segments = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        if not segments:
+            return 1
+
+        # Segments from the first one without a saved index onwards are scanned by _catch_up
+        self._scan_segment = segments[0]
+        for segment in segments[:-1]:
+            index_path = self._index_path(segment)
+            if not os.path.exists(index_path):
+                break
+            with open(index_path, encoding='utf-8') as index_file:
+                for campaign_id, offsets in json.load(index_file).items():
+                    self._index.setdefault(campaign_id, array('Q')).extend(
+                        (segment << OFFSET_BITS) | offset for offset in offsets
+                    )
+            self._scan_segment = segment + 1
+        return segments[-1]
+
+    def _index_path(self, segment: int) -> str:
+        return self._segment_path(segment)[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}")
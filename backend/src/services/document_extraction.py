@@ -0,0 +1,187 @@
+"""
+Document Extraction Service for SaveLife.com
+
+This module turns uploaded PDF and plain-text files into document analyses:
+- Local, pure-Python text extraction page by page (pypdf for PDFs,
+  form feeds as page breaks for plain text)
+- Pages extracted and scanned by the verification rules in parallel worker processes,
+  started from a fork server since the web workers that own the pool are threaded
+- Page count limited before any page is sent to the pool
+- Page results merged in page order into a single DocumentAnalysis
+- Upload-to-result latency reported per page
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.verification_ai import DocumentAnalysis, DocumentType, StreamingTextNormalizer
+from src.services.verification_rules import VerificationRuleEngine
+
+PDF_MAGIC = b'%PDF-'
+
+# Forking a multi-threaded process can copy locks held by other threads into the child
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Rule engines built inside worker processes, by ruleset version
+_worker_engines: Dict[str, VerificationRuleEngine] = {}
+
+# The PDF most recently opened by this process, as ((path, mtime_ns, size), reader). The file
+# identity is part of the key because upload paths are temporary names that get reused.
+_worker_reader: Tuple[Optional[Tuple[str, int, int]], Any] = (None, None)
+
+
+class UnsupportedDocumentError(ValueError):
+    """Raised for uploads that are neither PDF nor plain text"""
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised for documents with more pages than the pipeline accepts"""
+
+
+class DocumentExtractionPipeline:
+    """Extract and analyze uploaded documents page by page in parallel"""
+
+    def __init__(self, verification_ai, max_workers: Optional[int] = None, max_pages: int = 200):
+        self.verification_ai = verification_ai
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pages = max_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def analyze_file(self, path: str, document_type: DocumentType,
+                     received_at: Optional[float] = None) -> Tuple[DocumentAnalysis, str, List[Dict[str, Any]]]:
+        """
+        Analyze a PDF or plain-text file.
+
+        received_at is the perf_counter() time the upload arrived, from which page
+        latencies are measured. Returns the analysis, the normalized text hash and
+        per-page timings.
+        """
+        received_at = received_at if received_at is not None else time.perf_counter()
+        engine = self.verification_ai.rule_engine
+        rules = (engine.version, engine.rules)
+
+        with open(path, 'rb') as upload:
+            is_pdf = upload.read(len(PDF_MAGIC)) == PDF_MAGIC
+
+        if is_pdf:
+            stat = os.stat(path)
+            file_key = (path, stat.st_mtime_ns, stat.st_size)
+            page_count = len(_open_pdf(path).pages)
+            self._check_page_count(page_count)
+            tasks = [(_extract_pdf_page, (file_key, number, page_count)) for number in range(page_count)]
+        else:
+            pages = _read_text_pages(path)
+            self._check_page_count(len(pages))
+            tasks = [(_text_page, (page,)) for page in pages]
+
+        if len(tasks) > 1 and self.max_workers > 1:
+            executor = self._get_executor()
+            futures = {
+                executor.submit(_analyze_page, extract, args, document_type.value, rules): number
+                for number, (extract, args) in enumerate(tasks)
+            }
+            completed = ((futures[future], future.result()) for future in as_completed(futures))
+        else:
+            completed = ((number, _analyze_page(extract, args, document_type.value, rules))
+                         for number, (extract, args) in enumerate(tasks))
+
+        # Pages finish out of order but are merged in order, holding only those not yet merged
+        scan = engine.scan(document_type.value)
+        normalizer = StreamingTextNormalizer()
+        waiting: Dict[int, Dict[str, Any]] = {}
+        timings: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        next_page = 0
+
+        for number, result in completed:
+            waiting[number] = result
+            timings[number] = {
+                'page': number + 1,
+                'characters': len(result['text']),
+                'extract_ms': round(result['extract_seconds'] * 1000, 3),
+                'analyze_ms': round(result['analyze_seconds'] * 1000, 3),
+                'latency_ms': round((time.perf_counter() - received_at) * 1000, 3)
+            }
+
+            while next_page in waiting:
+                page = waiting.pop(next_page)
+                if next_page:
+                    normalizer.feed('\n')
+                normalizer.feed(page['text'])
+                scan.merge(page['scan'])
+                next_page += 1
+
+        analysis, text_hash = self.verification_ai.finish_streamed_analysis(document_type, scan, normalizer)
+        return analysis, text_hash, timings
+
+    def _check_page_count(self, page_count: int):
+        if page_count > self.max_pages:
+            raise DocumentTooLargeError(f"Documents may have at most {self.max_pages} pages, got {page_count}")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(POOL_START_METHOD)
+            )
+        return self._executor
+
+
+def _analyze_page(extract, args: tuple, document_type: str, rules: Tuple[str, Dict]) -> Dict[str, Any]:
+    """Worker task: extract one page and scan it with the verification rules"""
+    started = time.perf_counter()
+    text = extract(*args).replace('\r\n', '\n').replace('\r', '\n')
+    extracted = time.perf_counter()
+
+    version, rule_set = rules
+    engine = _worker_engines.get(version)
+    if engine is None:
+        engine = VerificationRuleEngine(rules=rule_set)
+        _worker_engines.clear()
+        _worker_engines[version] = engine
+
+    scan = engine.scan(document_type)
+    scan.feed(text, final=True)
+
+    return {
+        'text': text,
+        'scan': scan.snapshot(),
+        'extract_seconds': extracted - started,
+        'analyze_seconds': time.perf_counter() - extracted
+    }
+
+
+def _extract_pdf_page(file_key: Tuple[str, int, int], number: int, page_count: int) -> str:
+    """Extract one page, reusing the reader of the previous page of the same file in this process"""
+    global _worker_reader
+    reader = _worker_reader[1] if _worker_reader[0] == file_key else _open_pdf(file_key[0])
+    # Pages are submitted in order, so after the last one the file is done with; other
+    # processes holding a reader for it drop theirs when their next document arrives
+    _worker_reader = (file_key, reader) if number < page_count - 1 else (None, None)
+    return reader.pages[number].extract_text() or ''
+
+
+def _text_page(text: str) -> str:
+    return text
+
+
+def _open_pdf(path: str):
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError as exc:
+        raise UnsupportedDocumentError("PDF extraction requires the pypdf package") from exc
+
+    try:
+        return PdfReader(path)
+    except PdfReadError as exc:
+        raise UnsupportedDocumentError(f"Could not read PDF: {exc}") from exc
+
+
+def _read_text_pages(path: str) -> List[str]:
+    with open(path, 'rb') as upload:
+        data = upload.read()
+    if b'\x00' in data[:8192]:
+        raise UnsupportedDocumentError("Only PDF and plain-text documents are supported")
+    return data.decode('utf-8', errors='replace').split('\f')
@@ -0,0 +1,222 @@
+"""
+Document Fingerprint Index for SaveLife.com
+
+This module remembers documents across campaigns so that re-uploaded medical
+bills, records and identity documents can be caught:
+- Exact content hashes of normalized document text
+- MinHash/LSH shingle signatures for near-identical text
+- Extracted ID numbers and insurance policy numbers
+- Billing amount sets from medical bills
+All lookups are keyed and take logarithmic time per fingerprint. Fingerprints
+are kept in SQLite, shared by every worker process on the host, and pruned
+after a retention period. Registered documents can be re-checked read-only,
+against the documents that other campaigns had submitted before them.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set, Tuple, Any
+
+from src.services.near_duplicate import NearDuplicateIndex
+
+
+class DocumentFingerprintIndex:
+    """Cross-campaign index of document fingerprints, kept in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, text_index: Optional[NearDuplicateIndex] = None,
+                 min_words: int = 20, retention_seconds: Optional[float] = None, prune_interval: int = 256):
+        # The text signatures share the database file, in their own tables
+        self.text_index = text_index or NearDuplicateIndex(
+            db_path, min_similarity=0.8, retention_seconds=retention_seconds, prune_interval=prune_interval
+        )
+        self.db_path = db_path
+        self.min_words = min_words
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self._registrations_since_prune = 0
+        self._lock = threading.Lock()
+
+        # Without db_path the index only lives in this process
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS document_fingerprints (
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                campaign_id TEXT NOT NULL,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (kind, value, campaign_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_document_fingerprints_campaign_id
+                ON document_fingerprints (campaign_id);
+            CREATE INDEX IF NOT EXISTS idx_document_fingerprints_added_at
+                ON document_fingerprints (added_at);
+        """)
+        self._conn.commit()
+
+    def check_and_register(self, campaign_id: str, content_hash: str, document_text: str,
+                           extracted_data: Dict[str, Any]) -> List[str]:
+        """Return reuse flags for a campaign document and remember its fingerprints"""
+        fingerprints = self._extract_fingerprints(content_hash, extracted_data)
+        signature = self._text_signature(document_text)
+
+        now = time.time()
+        with self._lock:
+            reused = self._find_reuse(campaign_id, fingerprints, signature, registered=False)
+
+            # Registering a fingerprint again restarts its retention period
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO document_fingerprints (kind, value, campaign_id, added_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(kind, value, campaign_id, now) for kind, value in fingerprints]
+            )
+            self._registrations_since_prune += 1
+            if self.retention_seconds is not None and self._registrations_since_prune >= self.prune_interval:
+                self._registrations_since_prune = 0
+                self._conn.execute(
+                    'DELETE FROM document_fingerprints WHERE added_at < ?', (now - self.retention_seconds,)
+                )
+            self._conn.commit()
+
+            if signature is not None:
+                self.text_index.add(_text_item_id(campaign_id, content_hash), signature)
+
+        return self._reuse_flags(reused)
+
+    def check(self, campaign_id: str, content_hash: str, document_text: str,
+              extracted_data: Dict[str, Any]) -> List[str]:
+        """
+        Return reuse flags for a campaign document without registering it.
+
+        Only documents other campaigns submitted before this campaign registered
+        its own copy count, as they did when it was registered, so re-checking
+        the first campaign to submit a document does not flag it for later copies.
+        """
+        fingerprints = self._extract_fingerprints(content_hash, extracted_data)
+        signature = self._text_signature(document_text)
+
+        with self._lock:
+            return self._reuse_flags(self._find_reuse(campaign_id, fingerprints, signature, registered=True))
+
+    def remove_campaign(self, campaign_id: str) -> int:
+        """Forget every document of a campaign; returns how many fingerprints were removed"""
+        with self._lock:
+            content_hashes = [
+                content_hash for (content_hash,) in self._conn.execute(
+                    "SELECT value FROM document_fingerprints WHERE kind = 'content' AND campaign_id = ?",
+                    (campaign_id,)
+                )
+            ]
+            removed = self._conn.execute(
+                'DELETE FROM document_fingerprints WHERE campaign_id = ?', (campaign_id,)
+            ).rowcount
+            self._conn.commit()
+
+            for content_hash in content_hashes:
+                self.text_index.remove(_text_item_id(campaign_id, content_hash))
+        return removed
+
+    def _text_signature(self, document_text: str):
+        if len(document_text.split()) < self.min_words:
+            return None
+        return self.text_index.signature(document_text)
+
+    def _find_reuse(self, campaign_id: str, fingerprints: List[Tuple[str, str]], signature,
+                    registered: bool) -> Dict[str, Set[str]]:
+        """
+        Other campaigns holding each fingerprint, by kind; with registered=True only
+        those that held it before this campaign did. The caller holds the lock.
+        """
+        reused: Dict[str, Set[str]] = {}
+        for kind, value in fingerprints:
+            registered_at = self._registered_at(campaign_id, kind, value) if registered else None
+            others = {
+                owner for (owner,) in self._conn.execute(
+                    'SELECT campaign_id FROM document_fingerprints '
+                    'WHERE kind = ? AND value = ? AND campaign_id != ? AND added_at < ?',
+                    (kind, value, campaign_id, registered_at if registered_at is not None else float('inf'))
+                )
+            }
+            if others:
+                reused.setdefault(kind, set()).update(others)
+
+        if signature is not None and 'content' not in reused:
+            registered_at = self._registered_at(campaign_id, *fingerprints[0]) if registered else None
+            similar = {
+                _text_item_campaign(item_id)
+                for item_id, _ in self.text_index.query(signature, added_before=registered_at)
+                if _text_item_campaign(item_id) != campaign_id
+            }
+            if similar:
+                reused['content'] = similar
+        return reused
+
+    def _registered_at(self, campaign_id: str, kind: str, value: str) -> Optional[float]:
+        row = self._conn.execute(
+            'SELECT added_at FROM document_fingerprints WHERE kind = ? AND value = ? AND campaign_id = ?',
+            (kind, value, campaign_id)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _extract_fingerprints(self, content_hash: str, extracted_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Build the (kind, value) fingerprints identifying a document"""
+        fingerprints = [('content', content_hash)]
+
+        # A value without a digit is a word misread as an identifier, which would link unrelated campaigns
+        for kind in ('id_number', 'policy_number'):
+            identifier = _normalize_identifier(extracted_data.get(kind) or '')
+            if any(char.isdigit() for char in identifier):
+                fingerprints.append((kind, identifier))
+
+        # A single amount is too common to identify a bill; a set of line items is not
+        amounts = extracted_data.get('amounts') or []
+        if len(amounts) >= 2:
+            normalized_amounts = sorted({_normalize_amount(amount) for amount in amounts})
+            billing_key = ','.join(normalized_amounts)
+            if extracted_data.get('service_date'):
+                billing_key += f"@{extracted_data['service_date']}"
+            fingerprints.append(('billing_amounts', billing_key))
+
+        return fingerprints
+
+    def _reuse_flags(self, reused: Dict[str, Set[str]]) -> List[str]:
+        descriptions = {
+            'id_number': ('identity mismatch', 'ID number'),
+            'policy_number': ('identity mismatch', 'insurance policy number'),
+            'content': ('fake documents', 'document text'),
+            'billing_amounts': ('fake documents', 'billing amounts')
+        }
+
+        flags = []
+        for kind, (indicator, label) in descriptions.items():
+            if kind in reused:
+                campaigns = ', '.join(sorted(reused[kind]))
+                flags.append(f"Possible {indicator}: {label} already submitted by campaign(s) {campaigns}")
+        return flags
+
+
+def _text_item_id(campaign_id: str, content_hash: str) -> str:
+    return f"{campaign_id}:{content_hash}"
+
+
+def _text_item_campaign(item_id: str) -> str:
+    # Content hashes never contain a colon, campaign ids might
+    return item_id.rpartition(':')[0]
+
+
+def _normalize_identifier(value: str) -> str:
+    return ''.join(char for char in str(value).lower() if char.isalnum())
+
+
+def _normalize_amount(amount: str) -> str:
+    try:
+        return f"{float(str(amount).replace(',', '')):.2f}"
+    except ValueError:
+        return str(amount)
@@ -16,6 +16,9 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 
+from src.services.medical_knowledge import MedicalKnowledgeBase, shared_knowledge_base
+from src.services.scoring_config import current_config
+
 
 class DonorSegment(Enum):
     """Donor segment enumeration"""
@@ -76,34 +79,9 @@ class MatchingResult:
 class DonorMatchingAI:
     """AI service for donor-campaign matching"""
     
-    def __init__(self):
-        self.medical_categories = {
-            'cancer': {
-                'keywords': ['cancer', 'oncology', 'chemotherapy', 'radiation', 'tumor'],
-                'avg_donation': 150,
-                'donor_segments': ['frequent_giver', 'large_donor', 'cause_specific']
-            },
-            'pediatric': {
-                'keywords': ['child', 'children', 'pediatric', 'kids', 'baby'],
-                'avg_donation': 200,
-                'donor_segments': ['frequent_giver', 'occasional_giver', 'local_supporter']
-            },
-            'emergency': {
-                'keywords': ['emergency', 'urgent', 'critical', 'immediate'],
-                'avg_donation': 100,
-                'donor_segments': ['frequent_giver', 'micro_donor', 'first_time_giver']
-            },
-            'mental_health': {
-                'keywords': ['mental health', 'depression', 'anxiety', 'therapy'],
-                'avg_donation': 75,
-                'donor_segments': ['cause_specific', 'occasional_giver']
-            },
-            'chronic_illness': {
-                'keywords': ['chronic', 'diabetes', 'arthritis', 'autoimmune'],
-                'avg_donation': 125,
-                'donor_segments': ['frequent_giver', 'cause_specific']
-            }
-        }
+    def __init__(self, knowledge_base: Optional[MedicalKnowledgeBase] = None, scoring_config=None):
+        self.knowledge_base = knowledge_base or shared_knowledge_base()
+        self.scoring_config = scoring_config
         
         self.demographic_factors = {
             'age': {
@@ -128,6 +106,10 @@ class DonorMatchingAI:
             'weekend': {'days': [5, 6], 'engagement_multiplier': 1.3}
         }
 
+    @property
+    def medical_categories(self):
+        return self.knowledge_base.snapshot.donor_categories
+
     def create_donor_profile(self, donor_data: Dict) -> DonorProfile:
         """Create comprehensive donor profile from available data"""
         
@@ -509,12 +491,7 @@ class DonorMatchingAI:
         all_matches = {}
         
         # Weight different strategies
-        strategy_weights = {
-            'content': 0.4,
-            'collaborative': 0.3,
-            'geographic': 0.2,
-            'demographic': 0.1
-        }
+        strategy_weights = current_config(self.scoring_config).strategy_weights
         
         # Process content-based matches
         for match in content_matches:
@@ -0,0 +1,160 @@
+"""
+Fraud Feature Store for SaveLife.com
+
+This module maintains server-side fraud features per user in SQLite so fraud
+scoring no longer depends on history supplied by the client:
+- Campaigns created, verification rejections and reused documents per user
+- Campaign creation velocity over fixed time windows
+- Incremental, idempotent updates as campaign events happen
+- A single primary-key lookup to read all features for a user
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Any
+
+# Velocity window name -> length in seconds
+VELOCITY_WINDOWS = {
+    '1h': 3600,
+    '24h': 86400,
+    '7d': 604800
+}
+
+
+class FraudFeatureStore:
+    """SQLite-backed per-user fraud counters"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        window_columns = ''.join(
+            f'window_{name}_start REAL NOT NULL DEFAULT 0,\n'
+            f'window_{name}_count INTEGER NOT NULL DEFAULT 0,\n'
+            for name in VELOCITY_WINDOWS
+        )
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS user_fraud_features (
+                user_id TEXT PRIMARY KEY,
+                campaigns_created INTEGER NOT NULL DEFAULT 0,
+                rejections INTEGER NOT NULL DEFAULT 0,
+                documents_reused INTEGER NOT NULL DEFAULT 0,
+                {window_columns}
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS campaign_owners (
+                campaign_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                rejected INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS reused_documents (
+                campaign_id TEXT NOT NULL,
+                document_key TEXT NOT NULL,
+                PRIMARY KEY (campaign_id, document_key)
+            );
+        """)
+        self._conn.commit()
+
+    def record_campaign(self, campaign_id: str, user_id: str, created_at: Optional[float] = None) -> bool:
+        """Count a campaign for its owner once; returns True the first time it is seen"""
+        now = created_at if created_at is not None else time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO campaign_owners (campaign_id, user_id) VALUES (?, ?)',
+                (campaign_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            # Fixed windows restart once expired, otherwise keep counting
+            window_updates = ', '.join(
+                f"window_{name}_count = CASE WHEN :now - window_{name}_start >= {length} "
+                f"THEN 1 ELSE window_{name}_count + 1 END, "
+                f"window_{name}_start = CASE WHEN :now - window_{name}_start >= {length} "
+                f"THEN :now ELSE window_{name}_start END"
+                for name, length in VELOCITY_WINDOWS.items()
+            )
+            self._ensure_user(user_id, now)
+            self._conn.execute(
+                f'UPDATE user_fraud_features SET campaigns_created = campaigns_created + 1, '
+                f'{window_updates}, updated_at = :now WHERE user_id = :user_id',
+                {'now': now, 'user_id': user_id}
+            )
+            self._conn.commit()
+            return True
+
+    def record_rejection(self, campaign_id: str):
+        """Count a verification rejection against the campaign owner once per campaign"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT user_id FROM campaign_owners WHERE campaign_id = ? AND rejected = 0',
+                (campaign_id,)
+            ).fetchone()
+            if row is None:
+                return
+
+            self._conn.execute('UPDATE campaign_owners SET rejected = 1 WHERE campaign_id = ?', (campaign_id,))
+            self._conn.execute(
+                'UPDATE user_fraud_features SET rejections = rejections + 1, updated_at = ? WHERE user_id = ?',
+                (time.time(), row['user_id'])
+            )
+            self._conn.commit()
+
+    def record_document_reuse(self, campaign_id: str, document_key: str):
+        """Count a document reused from another campaign against the campaign owner once per document"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO reused_documents (campaign_id, document_key) VALUES (?, ?)',
+                (campaign_id, document_key)
+            )
+            if cursor.rowcount == 0:
+                return
+
+            self._conn.execute(
+                'UPDATE user_fraud_features SET documents_reused = documents_reused + 1, updated_at = ? '
+                'WHERE user_id = (SELECT user_id FROM campaign_owners WHERE campaign_id = ?)',
+                (time.time(), campaign_id)
+            )
+            self._conn.commit()
+
+    def get_features(self, user_id: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Read all fraud features for a user with one primary-key lookup"""
+        now = now if now is not None else time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM user_fraud_features WHERE user_id = ?', (user_id,)
+            ).fetchone()
+
+        if row is None:
+            features = {'campaigns_created': 0, 'rejections': 0, 'documents_reused': 0}
+            features.update({f'campaigns_last_{name}': 0 for name in VELOCITY_WINDOWS})
+            return features
+
+        features = {
+            'campaigns_created': row['campaigns_created'],
+            'rejections': row['rejections'],
+            'documents_reused': row['documents_reused']
+        }
+        for name, length in VELOCITY_WINDOWS.items():
+            in_window = now - row[f'window_{name}_start'] < length
+            features[f'campaigns_last_{name}'] = row[f'window_{name}_count'] if in_window else 0
+        return features
+
+    def _ensure_user(self, user_id: str, now: float):
+        self._conn.execute(
+            'INSERT OR IGNORE INTO user_fraud_features (user_id, updated_at) VALUES (?, ?)',
+            (user_id, now)
+        )
@@ -0,0 +1,220 @@
+"""
+Fraud Ring Detection Service for SaveLife.com
+
+This module links campaigns that share identifying details into clusters:
+- Phone numbers, addresses and bank accounts from campaign data
+- ID numbers and addresses extracted from identity documents
+- Incremental union-find with union by size and path halving
+- Near-constant time cluster size and member lookups
+- Links kept in SQLite and replayed into each process's union-find, so every
+  worker process on the host sees the same clusters; removing a campaign makes
+  the processes rebuild from the remaining links
+- Expired links aged out when each process rebuilds on a fixed schedule, so
+  expiry never forces every worker to replay the whole table at once
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Identifier = Tuple[str, str]
+
+
+class FraudRingGraph:
+    """Incremental union-find over campaigns sharing identifiers, replayed from SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, max_members_reported: int = 50,
+                 retention_seconds: Optional[float] = None, rebuild_seconds: float = 86400):
+        self.max_members_reported = max_members_reported
+        self.retention_seconds = retention_seconds
+        # With a retention period, clusters may keep expired links for up to this long
+        self.rebuild_seconds = rebuild_seconds
+
+        self._parent: Dict[str, str] = {}
+        # Maintained for cluster roots only
+        self._members: Dict[str, List[str]] = {}
+        self._linked_by: Dict[str, Set[str]] = {}
+        # Identifier -> first campaign seen with it
+        self._identifier_owner: Dict[Identifier, str] = {}
+        # Generation of the link table the structures above were built from, and the last link replayed
+        self._generation = None
+        self._last_seq = 0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+        # Without db_path the graph only lives in this process
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fraud_ring_links (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                campaign_id TEXT NOT NULL,
+                added_at REAL NOT NULL,
+                UNIQUE (kind, value, campaign_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_fraud_ring_links_campaign_id
+                ON fraud_ring_links (campaign_id);
+            CREATE INDEX IF NOT EXISTS idx_fraud_ring_links_added_at
+                ON fraud_ring_links (added_at);
+            -- Bumped whenever campaigns are removed, which union-find cannot undo incrementally
+            CREATE TABLE IF NOT EXISTS fraud_ring_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                generation INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO fraud_ring_generation (id, generation) VALUES (0, 0);
+        """)
+        self._conn.commit()
+
+    def add_identifiers(self, campaign_id: str, identifiers: Iterable[Identifier]):
+        """Register a campaign's identifiers, merging clusters that share any of them"""
+        now = time.time()
+        with self._lock:
+            # Registering a link again restarts its retention period but keeps its place in the replay order
+            self._conn.executemany(
+                'INSERT INTO fraud_ring_links (kind, value, campaign_id, added_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (kind, value, campaign_id) DO UPDATE SET added_at = excluded.added_at',
+                [(kind, value, campaign_id, now) for kind, value in identifiers]
+            )
+            self._conn.commit()
+
+    def remove_campaign(self, campaign_id: str) -> int:
+        """Forget a campaign's identifiers, splitting the clusters it held together"""
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM fraud_ring_links WHERE campaign_id = ?', (campaign_id,)
+            ).rowcount
+            if removed:
+                self._conn.execute('UPDATE fraud_ring_generation SET generation = generation + 1')
+            self._conn.commit()
+            return removed
+
+    def cluster(self, campaign_id: str) -> Dict[str, Any]:
+        """Cluster size, members and linking identifier kinds for a campaign"""
+        with self._lock:
+            self._catch_up()
+            if campaign_id not in self._parent:
+                return {'cluster_size': 1, 'members': [campaign_id], 'linked_by': []}
+
+            root = self._find(campaign_id)
+            members = self._members[root]
+            return {
+                'cluster_size': len(members),
+                'members': members[:self.max_members_reported],
+                'linked_by': sorted(self._linked_by[root])
+            }
+
+    def _catch_up(self):
+        """Replay links added by any process since the last call, rebuilding after removals and on schedule"""
+        now = time.time()
+        rebuild_due = self.retention_seconds is not None and now - self._built_at >= self.rebuild_seconds
+        if rebuild_due:
+            # No new generation: other processes drop expired links at their own scheduled rebuild
+            self._conn.execute('DELETE FROM fraud_ring_links WHERE added_at < ?', (now - self.retention_seconds,))
+            self._conn.commit()
+            self._built_at = now
+
+        # One read transaction, so the generation and the links come from the same snapshot
+        self._conn.execute('BEGIN')
+        try:
+            (generation,) = self._conn.execute('SELECT generation FROM fraud_ring_generation').fetchone()
+            if generation != self._generation or rebuild_due:
+                self._parent.clear()
+                self._members.clear()
+                self._linked_by.clear()
+                self._identifier_owner.clear()
+                self._generation = generation
+                self._last_seq = 0
+
+            for seq, kind, value, campaign_id in self._conn.execute(
+                'SELECT seq, kind, value, campaign_id FROM fraud_ring_links WHERE seq > ? ORDER BY seq',
+                (self._last_seq,)
+            ):
+                self._ensure_node(campaign_id)
+                owner = self._identifier_owner.setdefault((kind, value), campaign_id)
+                if owner != campaign_id:
+                    self._union(owner, campaign_id, kind)
+                self._last_seq = seq
+        finally:
+            self._conn.commit()
+
+    def _ensure_node(self, campaign_id: str):
+        if campaign_id not in self._parent:
+            self._parent[campaign_id] = campaign_id
+            self._members[campaign_id] = [campaign_id]
+            self._linked_by[campaign_id] = set()
+
+    def _find(self, node: str) -> str:
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a: str, b: str, kind: str):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            self._linked_by[root_a].add(kind)
+            return
+
+        # Union by size: attach the smaller cluster under the larger one
+        if len(self._members[root_a]) < len(self._members[root_b]):
+            root_a, root_b = root_b, root_a
+
+        self._parent[root_b] = root_a
+        self._members[root_a].extend(self._members.pop(root_b))
+        self._linked_by[root_a].update(self._linked_by.pop(root_b))
+        self._linked_by[root_a].add(kind)
+
+
+def campaign_identifiers(campaign_data: Dict[str, Any]) -> List[Identifier]:
+    """Normalized identifiers supplied with the campaign itself"""
+    identifiers = []
+
+    phone = re.sub(r'\D', '', str(campaign_data.get('phone') or ''))
+    if len(phone) >= 7:
+        identifiers.append(('phone', phone[-10:]))
+
+    address = _normalize_address(campaign_data.get('address'))
+    if address:
+        identifiers.append(('address', address))
+
+    bank_account = _normalize_token(campaign_data.get('bank_account'))
+    if bank_account:
+        identifiers.append(('bank_account', bank_account))
+
+    return identifiers
+
+
+def document_identifiers(extracted_data: Dict[str, Any]) -> List[Identifier]:
+    """Normalized identifiers extracted from an analyzed document"""
+    identifiers = []
+
+    id_number = _normalize_token(extracted_data.get('id_number'))
+    if id_number:
+        identifiers.append(('id_number', id_number))
+
+    address = _normalize_address(extracted_data.get('address'))
+    if address:
+        identifiers.append(('address', address))
+
+    return identifiers
+
+
+def _normalize_token(value: Any) -> str:
+    return re.sub(r'[^a-z0-9]', '', str(value or '').lower())
+
+
+def _normalize_address(value: Any) -> str:
+    # Very short strings are too ambiguous to link unrelated campaigns
+    address = ' '.join(re.findall(r'[a-z0-9]+', str(value or '').lower()))
+    return address if len(address) >= 8 else ''
@@ -0,0 +1,172 @@
+"""
+Goal Outcome Statistics for SaveLife.com
+
+This module aggregates the goals and amounts raised by closed campaigns for
+data-driven goal recommendations:
+- Log-scale histograms per condition x treatment complexity x insurance
+  status cell in SQLite, plus coarser cells that ignore insurance or both
+- Incremental, constant-size updates as each campaign closes
+- An in-memory snapshot of per-cell quantiles, rebuilt periodically from
+  the histograms, so lookups are a dictionary access however many
+  campaigns are behind them
+"""
+
+import os
+import math
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+ANY = '*'
+METRICS = ('goal', 'raised')
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Histogram buckets grow by 5% from MIN_AMOUNT, which bounds quantile error to 5%
+MIN_AMOUNT = 100.0
+BUCKET_GROWTH = 1.05
+MAX_BUCKET = 300  # about $225M
+
+# (condition, complexity, insurance)
+CellKey = Tuple[str, str, str]
+
+
+def amount_bucket(amount: float) -> int:
+    if amount <= MIN_AMOUNT:
+        return 0
+    return min(int(math.log(amount / MIN_AMOUNT) / math.log(BUCKET_GROWTH)) + 1, MAX_BUCKET)
+
+
+def bucket_amount(bucket: int) -> float:
+    """Geometric midpoint of a bucket's amount range"""
+    if bucket == 0:
+        return MIN_AMOUNT
+    return MIN_AMOUNT * BUCKET_GROWTH ** (bucket - 0.5)
+
+
+class GoalOutcomeStore:
+    """SQLite-backed goal and raised-amount histograms with a quantile snapshot"""
+
+    def __init__(self, db_path: str, refresh_seconds: float = 60.0, min_samples: int = 20):
+        self.db_path = db_path
+        self.refresh_seconds = refresh_seconds
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Dict[CellKey, Dict[str, Any]] = {}
+        self._snapshot_at = float('-inf')
+        self._generation = 0
+        self._changed = True
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS goal_outcome_histograms (
+                condition TEXT NOT NULL,
+                complexity TEXT NOT NULL,
+                insurance TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (condition, complexity, insurance, metric, bucket)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def record(self, key: CellKey, goal_amount: float, raised_amount: float):
+        """Add one closed campaign to its cell and the coarser cells containing it"""
+        self.record_many([(key, goal_amount, raised_amount)])
+
+    def record_many(self, outcomes: List[Tuple[CellKey, float, float]]):
+        rows = []
+        for (condition, complexity, insurance), goal_amount, raised_amount in outcomes:
+            for cell in ((condition, complexity, insurance), (condition, complexity, ANY), (condition, ANY, ANY)):
+                rows.append((*cell, 'goal', amount_bucket(goal_amount)))
+                rows.append((*cell, 'raised', amount_bucket(raised_amount)))
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO goal_outcome_histograms (condition, complexity, insurance, metric, bucket, count) '
+                'VALUES (?, ?, ?, ?, ?, 1) '
+                'ON CONFLICT (condition, complexity, insurance, metric, bucket) DO UPDATE SET count = count + 1',
+                rows
+            )
+            self._conn.commit()
+            self._changed = True
+
+    def lookup(self, key: CellKey) -> Optional[Dict[str, Any]]:
+        """
+        Quantiles for the most specific cell with at least min_samples campaigns,
+        falling back to ignoring insurance and then complexity; None without enough data
+        """
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        condition, complexity, insurance = key
+        for cell in ((condition, complexity, insurance), (condition, complexity, ANY), (condition, ANY, ANY)):
+            stats = snapshot.get(cell)
+            if stats is not None and stats['sample_size'] >= self.min_samples:
+                return {'cell': dict(zip(('condition', 'complexity', 'insurance'), cell)), **stats}
+        return None
+
+    @property
+    def generation(self) -> int:
+        """Number of snapshots built, after a refresh if one is due; lookups only change with it"""
+        self._maybe_refresh()
+        return self._generation
+
+    def refresh(self):
+        """Rebuild the quantile snapshot from the histograms"""
+        with self._lock:
+            self._changed = False
+            rows = self._conn.execute(
+                'SELECT condition, complexity, insurance, metric, bucket, count FROM goal_outcome_histograms '
+                'ORDER BY condition, complexity, insurance, metric, bucket'
+            ).fetchall()
+
+        histograms: Dict[CellKey, Dict[str, List[Tuple[int, int]]]] = {}
+        for condition, complexity, insurance, metric, bucket, count in rows:
+            cell = histograms.setdefault((condition, complexity, insurance), {name: [] for name in METRICS})
+            cell[metric].append((bucket, count))
+
+        snapshot = {}
+        for cell, metrics in histograms.items():
+            snapshot[cell] = {
+                'sample_size': sum(count for _, count in metrics['goal']),
+                **{f'{metric}_quantiles': _quantiles(metrics[metric]) for metric in METRICS}
+            }
+
+        # Readers keep using the previous snapshot until this assignment
+        self._snapshot = snapshot
+        self._snapshot_at = time.monotonic()
+        self._generation += 1
+
+    def _maybe_refresh(self):
+        if not self._changed or time.monotonic() - self._snapshot_at < self.refresh_seconds:
+            return
+        # One caller rebuilds while the others carry on with the current snapshot
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+
+def _quantiles(histogram: List[Tuple[int, int]]) -> Dict[str, float]:
+    """Quantiles of a histogram given as (bucket, count) pairs in bucket order"""
+    total = sum(count for _, count in histogram)
+    quantiles = {}
+    seen = 0
+    targets = iter(QUANTILES)
+    target = next(targets)
+    for bucket, count in histogram:
+        seen += count
+        while target is not None and seen >= target * total:
+            quantiles[f'p{int(target * 100)}'] = round(bucket_amount(bucket), 2)
+            target = next(targets, None)
+    return quantiles
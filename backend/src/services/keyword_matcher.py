@@ -0,0 +1,60 @@
+"""
+Keyword Matcher for SaveLife.com AI Services
+
+This module compiles a keyword set into a single regular expression so that every
+occurrence of every keyword is found in one pass over the text, with the same
+substring semantics as `keyword in text`.
+"""
+
+import re
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+
+class KeywordMatcher:
+    """Find all keyword occurrences in one regex pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # Declaration order is kept for first-match precedence
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self.max_length = max((len(keyword) for keyword in self.keywords), default=0)
+
+        # Longest alternatives first so a zero-width lookahead reports the longest keyword
+        # starting at each position; shorter keywords starting there are prefixes of it
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        self._pattern = (
+            re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in ordered) + '))')
+            if ordered else None
+        )
+        self._prefixes = {
+            keyword: tuple(other for other in self.keywords if keyword.startswith(other))
+            for keyword in self.keywords
+        }
+
+    def finditer(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (start, keyword) for every keyword occurrence, including overlapping ones"""
+        if self._pattern is None:
+            return
+        if endpos is None:
+            endpos = len(text)
+
+        for match in self._pattern.finditer(text, pos, endpos):
+            start = match.start()
+            for keyword in self._prefixes[match.group(1)]:
+                yield start, keyword
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords present in the text"""
+        found = set()
+        for _, keyword in self.finditer(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def first(self, text: str) -> Optional[str]:
+        """Return the first keyword in declaration order that is present in the text"""
+        found = self.find(text)
+        for keyword in self.keywords:
+            if keyword in found:
+                return keyword
+        return None
@@ -0,0 +1,158 @@
+"""
+Medical Knowledge Base for SaveLife.com
+
+This module holds the medical domain data shared by the AI services:
+- Condition categories with their classification keywords, goal statistics and
+  story frameworks (campaign assistance) and donation statistics and donor
+  segments (donor matching)
+- Medical mention keywords used in fraud scoring
+- Loaded once per process from a versioned data file into read-only mappings
+  and tuples of interned strings, with the keyword matchers compiled at load
+- Hot reloads that swap the whole snapshot by reference, so a caller holding
+  a snapshot never sees a mix of two versions
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.services.keyword_matcher import KeywordMatcher
+
+DEFAULT_KNOWLEDGE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'medical_knowledge.json')
+
+CONDITION_FIELDS = ('keywords', 'avg_goal', 'success_rate', 'story_framework')
+DONOR_FIELDS = ('donor_keywords', 'avg_donation', 'donor_segments')
+
+
+class ConditionClassifier:
+    """Score medical conditions by weighted keyword presence, compiled once from the condition table"""
+
+    def __init__(self, conditions: Mapping[str, Mapping]):
+        # Declaration order breaks ties between equally scored conditions
+        self.conditions = tuple(conditions)
+        self._keyword_conditions: Dict[str, List[Tuple[str, float]]] = {}
+        for condition, data in conditions.items():
+            for keyword in data['keywords']:
+                self._keyword_conditions.setdefault(keyword, []).append((condition, data.get('weight', 1.0)))
+        self._keywords = tuple(self._keyword_conditions)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Weighted count of distinct keywords present per condition, for conditions with any"""
+        totals: Dict[str, float] = {}
+        # A handful of short keywords: one C-level substring search each beats a regex
+        # automaton that has to be tried at every position of the text
+        for keyword in [keyword for keyword in self._keywords if keyword in text]:
+            for condition, weight in self._keyword_conditions[keyword]:
+                totals[condition] = totals.get(condition, 0) + weight
+        return {condition: totals[condition] for condition in self.conditions if condition in totals}
+
+
+class MedicalKnowledge:
+    """One immutable version of the knowledge base with its compiled matchers"""
+
+    __slots__ = ('version', 'default_condition', 'conditions', 'donor_categories',
+                 'medical_mentions', 'condition_classifier', 'medical_mention_matcher')
+
+    def __init__(self, data: Dict[str, Any]):
+        if not isinstance(data, dict) or not isinstance(data.get('conditions'), dict) or not data['conditions']:
+            raise ValueError("Medical knowledge must be an object with a non-empty 'conditions' object")
+
+        conditions = {}
+        donor_categories = {}
+        for name, spec in data['conditions'].items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"Condition '{name}' must be an object")
+            missing = [field for field in CONDITION_FIELDS + DONOR_FIELDS if field not in spec]
+            if missing:
+                raise ValueError(f"Condition '{name}' is missing '{missing[0]}'")
+            name = sys.intern(name)
+            conditions[name] = MappingProxyType({
+                'keywords': _interned(spec['keywords']),
+                'avg_goal': spec['avg_goal'],
+                'success_rate': spec['success_rate'],
+                'story_framework': spec['story_framework'],
+                'weight': float(spec.get('weight', 1.0))
+            })
+            donor_categories[sys.intern(spec.get('donor_category') or name)] = MappingProxyType({
+                'keywords': _interned(spec['donor_keywords']),
+                'avg_donation': spec['avg_donation'],
+                'donor_segments': _interned(spec['donor_segments'])
+            })
+
+        default_condition = data.get('default_condition') or next(iter(conditions))
+        if default_condition not in conditions:
+            raise ValueError(f"Default condition '{default_condition}' is not a known condition")
+
+        serialized = json.dumps(data, sort_keys=True)
+        digest = hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:12]
+
+        self.version = f"{data.get('version', '0')}-{digest}"
+        self.default_condition = sys.intern(default_condition)
+        self.conditions: Mapping[str, Mapping[str, Any]] = MappingProxyType(conditions)
+        self.donor_categories: Mapping[str, Mapping[str, Any]] = MappingProxyType(donor_categories)
+        self.medical_mentions = _interned(data.get('medical_mentions', ()))
+        self.condition_classifier = ConditionClassifier(self.conditions)
+        self.medical_mention_matcher = KeywordMatcher(self.medical_mentions)
+
+
+class MedicalKnowledgeBase:
+    """The current MedicalKnowledge snapshot, reloadable from its data file"""
+
+    def __init__(self, path: str = DEFAULT_KNOWLEDGE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def snapshot(self) -> MedicalKnowledge:
+        # Callers take this reference once per operation, so a reload never splits one
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.version
+
+    def load(self, data: Dict[str, Any]):
+        """Build a snapshot and swap it in; the running snapshot stays active if the data is invalid"""
+        snapshot = MedicalKnowledge(data)
+        with self._lock:
+            self._snapshot = snapshot
+            self.loaded_at = time.time()
+
+    def reload(self):
+        """Re-read the data file"""
+        with open(self.path, encoding='utf-8') as knowledge_file:
+            self.load(json.load(knowledge_file))
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'loaded_at': self.loaded_at,
+            'conditions': list(snapshot.conditions),
+            'donor_categories': list(snapshot.donor_categories),
+            'medical_mentions': len(snapshot.medical_mentions)
+        }
+
+
+_shared: Optional[MedicalKnowledgeBase] = None
+_shared_lock = threading.Lock()
+
+
+def shared_knowledge_base() -> MedicalKnowledgeBase:
+    """The process-wide knowledge base for the default data file, loaded on first use"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = MedicalKnowledgeBase()
+    return _shared
+
+
+def _interned(values) -> Tuple[str, ...]:
+    return tuple(sys.intern(str(value)) for value in values)
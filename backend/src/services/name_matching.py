@@ -0,0 +1,124 @@
+"""
+Name Matching Service for SaveLife.com
+
+This module compares person names across documents and campaign data:
+- Normalization of case, accents, punctuation and honorifics
+- Soundex phonetic keys to block obviously different names cheaply
+- Bounded Levenshtein distance with early exit for typo tolerance
+- Memoized normalization and comparisons so batch re-verification stays fast
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, Tuple
+
+HONORIFICS = frozenset({
+    'mr', 'mrs', 'ms', 'miss', 'mx', 'dr', 'prof', 'jr', 'sr', 'ii', 'iii', 'iv', 'md', 'phd'
+})
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6'
+}
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> Tuple[str, ...]:
+    """Lowercase ASCII name tokens without punctuation or honorifics"""
+    # Extracted names can run on past the end of their line, so keep only the first line
+    lines = (name or '').strip().splitlines()
+    first_line = lines[0] if lines else ''
+
+    ascii_name = unicodedata.normalize('NFKD', first_line).encode('ascii', 'ignore').decode('ascii').lower()
+    cleaned = ''.join(char if char.isalpha() else ' ' for char in ascii_name)
+    return tuple(token for token in cleaned.split() if token not in HONORIFICS)
+
+
+@lru_cache(maxsize=65536)
+def soundex(token: str) -> str:
+    """Four character Soundex code of a name token"""
+    if not token:
+        return ''
+
+    code = token[0].upper()
+    previous = _SOUNDEX_CODES.get(token[0], '')
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # 'h' and 'w' do not separate letters with the same code
+        if char not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between a and b, or max_distance + 1 once it is known to exceed the bound"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class NameMatcher:
+    """Decide whether two person names plausibly refer to the same person"""
+
+    def matches(self, name_a: str, name_b: str) -> bool:
+        tokens_a = normalize_name(name_a)
+        tokens_b = normalize_name(name_b)
+        if not tokens_a or not tokens_b:
+            return True  # Nothing to compare
+        if tokens_a == tokens_b:
+            return True
+        return self._match_tokens(*sorted((tokens_a, tokens_b)))
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _match_tokens(tokens_a: Tuple[str, ...], tokens_b: Tuple[str, ...]) -> bool:
+        # Blocking: names sharing no phonetic key cannot match
+        if not (NameMatcher._keys(tokens_a) & NameMatcher._keys(tokens_b)):
+            return False
+
+        # Every token of the shorter name must match a token of the longer one,
+        # which tolerates missing middle names
+        shorter, longer = sorted((tokens_a, tokens_b), key=len)
+        return all(any(NameMatcher._tokens_match(token, other) for other in longer) for token in shorter)
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _keys(tokens: Tuple[str, ...]) -> FrozenSet[str]:
+        return frozenset(soundex(token) for token in tokens if len(token) > 1)
+
+    @staticmethod
+    def _tokens_match(token: str, other: str) -> bool:
+        if token == other:
+            return True
+        # Initials match any token starting with the same letter
+        if len(token) == 1 or len(other) == 1:
+            return token[0] == other[0]
+
+        max_distance = 1 if min(len(token), len(other)) <= 5 else 2
+        return bounded_levenshtein(token, other, max_distance) <= max_distance
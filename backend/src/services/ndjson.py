@@ -0,0 +1,51 @@
+"""
+NDJSON Helpers for SaveLife.com Batch Endpoints
+
+This module parses newline-delimited JSON input line by line and serializes
+streamed results, so batch endpoints and CLI jobs never hold a whole batch
+of raw input in memory.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+# (record index, parsed record or None, parse error or None)
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def iter_ndjson_records(lines: Iterable[Union[bytes, str]]) -> Iterator[ParsedRecord]:
+    """Parse NDJSON lines into indexed records, reporting malformed lines instead of raising"""
+    index = 0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield index, None, f'Invalid JSON: {str(e)}'
+        else:
+            if isinstance(record, dict):
+                yield index, record, None
+            else:
+                yield index, None, 'Record must be a JSON object'
+        index += 1
+
+
+def iter_json_array_records(records: Iterable[Any]) -> Iterator[ParsedRecord]:
+    """Wrap an already parsed JSON array in the same indexed form as NDJSON input"""
+    for index, record in enumerate(records):
+        if isinstance(record, dict):
+            yield index, record, None
+        else:
+            yield index, None, 'Record must be a JSON object'
+
+
+def dumps_line(payload: Dict[str, Any]) -> str:
+    """Serialize one result as an NDJSON line"""
+    return json.dumps(payload, separators=(',', ':'), default=str) + '\n'
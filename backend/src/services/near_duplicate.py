@@ -0,0 +1,199 @@
+"""
+Near-Duplicate Detection Service for SaveLife.com
+
+This module provides MinHash signatures and a banded LSH index for finding
+campaigns whose text is nearly identical to text already seen:
+- Word shingling of normalized text
+- MinHash signatures estimating Jaccard similarity
+- Banded locality-sensitive hashing for sublinear candidate lookup
+- Incremental add, update and remove of indexed items
+- Items and band buckets kept in SQLite, so every worker process on the host
+  queries the same index and it survives restarts
+- Items older than a retention period pruned as new ones are added
+"""
+
+import os
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import List, Optional, Set, Tuple
+
+# Mersenne prime used for the universal hash family
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class MinHasher:
+    """Compute MinHash signatures over word shingles"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        # Fixed seed keeps signatures comparable across processes and restarts
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hash each run of shingle_size consecutive normalized words"""
+        words = re.findall(r'[a-z0-9]+', text.lower())
+        if not words:
+            return set()
+
+        size = min(self.shingle_size, len(words))
+        return {
+            int.from_bytes(
+                hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'), digest_size=8).digest(),
+                'big'
+            )
+            for i in range(len(words) - size + 1)
+        }
+
+    def signature(self, text: str) -> Optional[array]:
+        """MinHash signature of the text, or None if it contains no words"""
+        shingle_hashes = self.shingles(text)
+        if not shingle_hashes:
+            return None
+
+        return array('Q', (
+            min((a * x + b) % _MERSENNE_PRIME for x in shingle_hashes)
+            for a, b in self._permutations
+        ))
+
+    @staticmethod
+    def estimate_similarity(sig_a: array, sig_b: array) -> float:
+        """Estimated Jaccard similarity as the fraction of agreeing MinHash values"""
+        matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return matches / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """Banded LSH index over MinHash signatures, kept in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, num_perm: int = 128, bands: int = 32,
+                 min_similarity: float = 0.5, max_matches: int = 10,
+                 retention_seconds: Optional[float] = None, prune_interval: int = 256):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_similarity = min_similarity
+        self.max_matches = max_matches
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self._adds_since_prune = 0
+        self._lock = threading.Lock()
+
+        # Without db_path the index only lives in this process
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS near_duplicate_items (
+                item_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_near_duplicate_items_added_at
+                ON near_duplicate_items (added_at);
+            CREATE TABLE IF NOT EXISTS near_duplicate_bands (
+                band_key BLOB NOT NULL,
+                item_id TEXT NOT NULL,
+                PRIMARY KEY (band_key, item_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_near_duplicate_bands_item_id
+                ON near_duplicate_bands (item_id);
+        """)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM near_duplicate_items').fetchone()[0]
+
+    def signature(self, text: str) -> Optional[array]:
+        return self.hasher.signature(text)
+
+    def add(self, item_id: str, signature: array):
+        """Index a signature, replacing any previous signature for the same item"""
+        with self._lock:
+            self._remove_locked(item_id)
+            self._conn.execute(
+                'INSERT INTO near_duplicate_items (item_id, signature, added_at) VALUES (?, ?, ?)',
+                (item_id, signature.tobytes(), time.time())
+            )
+            self._conn.executemany(
+                'INSERT INTO near_duplicate_bands (band_key, item_id) VALUES (?, ?)',
+                [(band_key, item_id) for band_key in self._band_keys(signature)]
+            )
+            # Expired items are only found by a range scan, so only look for them periodically
+            self._adds_since_prune += 1
+            if self.retention_seconds is not None and self._adds_since_prune >= self.prune_interval:
+                self._adds_since_prune = 0
+                self._prune_locked(time.time() - self.retention_seconds)
+            self._conn.commit()
+
+    def remove(self, item_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_locked(item_id)
+            self._conn.commit()
+            return removed
+
+    def prune(self, older_than: float) -> int:
+        """Remove items added before a timestamp; returns how many were removed"""
+        with self._lock:
+            removed = self._prune_locked(older_than)
+            self._conn.commit()
+            return removed
+
+    def query(self, signature: array, exclude: Optional[str] = None,
+              added_before: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Return (item_id, estimated_similarity) pairs above min_similarity, best first"""
+        band_keys = list(self._band_keys(signature))
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT item_id, signature FROM near_duplicate_items WHERE added_at < ? AND item_id IN ('
+                'SELECT item_id FROM near_duplicate_bands WHERE band_key IN '
+                f'({", ".join("?" * len(band_keys))}))',
+                [added_before if added_before is not None else float('inf')] + band_keys
+            ).fetchall()
+
+        matches = []
+        for candidate, candidate_signature in rows:
+            if candidate == exclude:
+                continue
+            similarity = MinHasher.estimate_similarity(signature, array('Q', candidate_signature))
+            if similarity >= self.min_similarity:
+                matches.append((candidate, similarity))
+
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:self.max_matches]
+
+    def _band_keys(self, signature: array):
+        # The band number is part of the key, so equal rows in different bands never collide
+        rows = self.rows
+        for band in range(self.bands):
+            yield band.to_bytes(2, 'big') + signature[band * rows:(band + 1) * rows].tobytes()
+
+    def _remove_locked(self, item_id: str) -> bool:
+        self._conn.execute('DELETE FROM near_duplicate_bands WHERE item_id = ?', (item_id,))
+        return self._conn.execute('DELETE FROM near_duplicate_items WHERE item_id = ?', (item_id,)).rowcount > 0
+
+    def _prune_locked(self, older_than: float) -> int:
+        self._conn.execute(
+            'DELETE FROM near_duplicate_bands WHERE item_id IN ('
+            'SELECT item_id FROM near_duplicate_items WHERE added_at < ?)',
+            (older_than,)
+        )
+        return self._conn.execute('DELETE FROM near_duplicate_items WHERE added_at < ?', (older_than,)).rowcount
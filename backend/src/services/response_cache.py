@@ -0,0 +1,170 @@
+"""
+Response Cache for SaveLife.com
+
+This module caches the responses of AI endpoints that are pure functions of their input:
+- Entries keyed by endpoint, a hash of the canonical JSON payload and the
+  versions of everything else the response depends on (knowledge base,
+  scoring configuration, rules, blocklist, outcome statistics)
+- A least-recently-used in-memory tier per process
+- An optional SQLite tier shared by every worker process on the host, which
+  responses holding personal data can stay out of
+- Expiry after a fixed time to live in both tiers
+- Hit and miss counts per endpoint and per tier
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.services.decision_log import input_hash
+
+# (status code, response body)
+CachedResponse = Tuple[int, bytes]
+
+
+class ResponseCache:
+    """Two-tier cache of serialized endpoint responses with a time to live"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300, db_path: Optional[str] = None,
+                 max_disk_entries: int = 100000, evict_interval: int = 256):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.evict_interval = evict_interval
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, status, body), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, int, bytes]]" = OrderedDict()
+        # endpoint -> [memory hits, disk hits, misses]
+        self._counters: Dict[str, List[int]] = {}
+        self._puts_since_evict = 0
+
+        self._conn = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cached_responses (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    body BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cached_responses_expires_at
+                    ON cached_responses (expires_at);
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def key(endpoint: str, payload: Any, versions: Sequence[Any] = ()) -> str:
+        return input_hash({'endpoint': endpoint, 'payload': payload, 'versions': list(versions)})
+
+    def get(self, endpoint: str, key: str, disk: bool = True) -> Optional[CachedResponse]:
+        """The cached response for a key, or None on a miss or once it has expired; disk=False skips the disk tier"""
+        now = time.time()
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, [0, 0, 0])
+
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    counters[0] += 1
+                    return entry[1], entry[2]
+                del self._memory[key]
+
+            if disk and self._conn is not None:
+                row = self._conn.execute(
+                    'SELECT expires_at, status, body FROM cached_responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and row[0] > now:
+                    # Promote with the remaining time to live, so both tiers expire together
+                    self._remember(key, (row[0], row[1], bytes(row[2])))
+                    counters[1] += 1
+                    return row[1], bytes(row[2])
+
+            counters[2] += 1
+            return None
+
+    def put(self, key: str, status: int, body: bytes, disk: bool = True):
+        """Cache a response; disk=False keeps it in this process's memory only"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, (expires_at, status, body))
+            if not disk or self._conn is None:
+                return
+
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cached_responses (key, status, body, expires_at) VALUES (?, ?, ?, ?)',
+                (key, status, body, expires_at)
+            )
+            # Counting rows is a full scan, so only check the bound periodically
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.evict_interval:
+                self._puts_since_evict = 0
+                self._evict_disk(time.time())
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM cached_responses')
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters for this process, overall and per endpoint"""
+        with self._lock:
+            endpoints = {
+                endpoint: _hit_stats(memory_hits, disk_hits, misses)
+                for endpoint, (memory_hits, disk_hits, misses) in sorted(self._counters.items())
+            }
+            totals = [sum(counters[i] for counters in self._counters.values()) for i in range(3)]
+            return {
+                **_hit_stats(*totals),
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'max_disk_entries': self.max_disk_entries if self._conn is not None else 0,
+                'ttl_seconds': self.ttl_seconds,
+                'disk_tier': self._conn is not None,
+                'endpoints': endpoints
+            }
+
+    def _remember(self, key: str, entry: Tuple[float, int, bytes]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float):
+        """Delete expired responses, then the ones closest to expiry beyond max_disk_entries"""
+        self._conn.execute('DELETE FROM cached_responses WHERE expires_at <= ?', (now,))
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM cached_responses').fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM cached_responses WHERE key IN ('
+                'SELECT key FROM cached_responses ORDER BY expires_at LIMIT ?)',
+                (excess,)
+            )
+
+
+def _hit_stats(memory_hits: int, disk_hits: int, misses: int) -> Dict[str, Any]:
+    hits = memory_hits + disk_hits
+    total = hits + misses
+    return {
+        'hits': hits,
+        'memory_hits': memory_hits,
+        'disk_hits': disk_hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0
+    }
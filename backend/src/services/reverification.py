@@ -0,0 +1,106 @@
+"""
+Campaign Re-verification Service for SaveLife.com
+
+This module re-runs campaign verification over stored campaigns in bulk:
+- Worker processes each build their own VerificationAI from the active rules
+  and blocklist, checking documents against the shared document fingerprint
+  index read-only, so a campaign rejected for a reused document stays rejected
+  while feature stores and indexes are left untouched
+- Each decision is handed back with its result, for the caller to add to the
+  decision log once the new status is saved
+- Campaigns are verified in chunks to amortize inter-process overhead
+- A campaign that fails to verify is reported by id without failing the rest
+  of its chunk
+- Progress checkpoints are written atomically so interrupted runs resume
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.blocklist import FraudBlocklist
+from src.services.document_fingerprints import DocumentFingerprintIndex
+from src.services.name_matching import NameMatcher
+from src.services.verification_ai import VerificationAI
+from src.services.verification_rules import VerificationRuleEngine
+
+# The verifier used by this worker process
+_worker_ai: Optional[VerificationAI] = None
+
+
+class CollectedDecisions:
+    """Stands in for the decision log in a worker, holding decisions for the parent process to log"""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def append(self, kind: str, campaign_id: Optional[str], decision: Dict[str, Any]):
+        self.records.append(decision)
+
+
+def init_worker(rules: Dict[str, List[Dict[str, Any]]], blocklist_path: Optional[str] = None,
+                fingerprint_db_path: Optional[str] = None):
+    """Process pool initializer building the worker's verifier"""
+    global _worker_ai
+    _worker_ai = VerificationAI(
+        fingerprint_index=DocumentFingerprintIndex(fingerprint_db_path) if fingerprint_db_path else None,
+        rule_engine=VerificationRuleEngine(rules=rules),
+        blocklist=FraudBlocklist(blocklist_path) if blocklist_path else None,
+        name_matcher=NameMatcher(),
+        decision_log=CollectedDecisions(),
+        max_campaign_states=1,
+        read_only=True
+    )
+
+
+def verify_chunk(campaigns: List[Tuple[Dict, List[Dict]]]) -> List[Dict[str, Any]]:
+    """
+    Verify (campaign data, documents) pairs; returns the new status, trust
+    score and decision log record of each, or the error for campaigns that
+    could not be verified
+    """
+    decisions = _worker_ai.decision_log.records
+    results = []
+    for campaign_data, documents in campaigns:
+        decisions.clear()
+        try:
+            result = _worker_ai.verify_campaign(campaign_data, documents)
+        except Exception as e:
+            results.append({'id': campaign_data['id'], 'error': f'Verification failed: {str(e)}'})
+            continue
+        results.append({
+            'id': campaign_data['id'],
+            'verification_status': result.overall_status.value,
+            'trust_score': result.trust_score,
+            'decision': dict(decisions[-1], trigger='reverify')
+        })
+    return results
+
+
+class ReverificationCheckpoint:
+    """Progress of a re-verification run, persisted after every committed batch"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save(self, progress: Dict[str, Any]):
+        """Replace the checkpoint atomically so a crash never leaves a partial file"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(progress, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,228 @@
+"""
+Scoring Configuration for SaveLife.com
+
+This module holds the tunable weights and thresholds of the AI scorers:
+- Donor matching strategy weights for hybrid matching
+- Treatment complexity multipliers for goal recommendations
+- Fraud detection thresholds and risk level cut-offs
+- Immutable snapshots loaded from a local JSON file, with any section left
+  out of the file taking its default values
+- A background watcher that reloads the file when it changes and swaps the
+  snapshot by reference, so the request path never waits on a reload
+- Snapshots pinned per request, so a request in flight during a reload is
+  scored entirely with the configuration it started with
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import traceback
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, fields
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+DEFAULT_STRATEGY_WEIGHTS = {
+    'content': 0.4,
+    'collaborative': 0.3,
+    'geographic': 0.2,
+    'demographic': 0.1
+}
+
+DEFAULT_COMPLEXITY_FACTORS = {
+    'surgery': 1.3,
+    'chemotherapy': 1.4,
+    'radiation': 1.2,
+    'transplant': 2.0,
+    'experimental': 1.8,
+    'clinical trial': 1.5,
+    'specialist': 1.2,
+    'emergency': 1.4,
+    'icu': 1.6,
+    'rehabilitation': 1.3
+}
+
+
+def _weights(values: Any, section: str) -> Dict[str, float]:
+    if not isinstance(values, dict):
+        raise ValueError(f"'{section}' must be an object")
+    weights = {}
+    for name, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"'{section}' value for '{name}' must be a non-negative number")
+        weights[str(name)] = float(value)
+    return weights
+
+
+@dataclass(frozen=True)
+class FraudThresholds:
+    """Limits beyond which a campaign signal counts towards its fraud score"""
+    high_goal: float = 500000
+    low_goal: float = 1000
+    min_medical_mentions: int = 2
+    min_description_length: int = 100
+    max_previous_campaigns: int = 3
+    max_campaigns_last_24h: int = 3
+    large_ring_links: int = 4
+    high_risk_score: float = 0.7
+    medium_risk_score: float = 0.4
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """One immutable version of the scoring configuration"""
+    strategy_weights: Mapping[str, float] = field(
+        default_factory=lambda: MappingProxyType(dict(DEFAULT_STRATEGY_WEIGHTS))
+    )
+    complexity_factors: Mapping[str, float] = field(
+        default_factory=lambda: MappingProxyType(dict(DEFAULT_COMPLEXITY_FACTORS))
+    )
+    fraud: FraudThresholds = field(default_factory=FraudThresholds)
+    version: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScoringConfig':
+        """Validate a configuration object; sections it leaves out keep their defaults"""
+        if not isinstance(data, dict):
+            raise ValueError("Scoring configuration must be an object")
+        unknown = set(data) - {'strategy_weights', 'complexity_factors', 'fraud'}
+        if unknown:
+            raise ValueError(f"Unknown scoring configuration section '{sorted(unknown)[0]}'")
+
+        strategy_weights = _weights(data.get('strategy_weights', DEFAULT_STRATEGY_WEIGHTS), 'strategy_weights')
+        unknown = set(strategy_weights) - set(DEFAULT_STRATEGY_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown matching strategy '{sorted(unknown)[0]}'")
+        complexity_factors = _weights(data.get('complexity_factors', DEFAULT_COMPLEXITY_FACTORS), 'complexity_factors')
+
+        fraud = data.get('fraud', {})
+        if not isinstance(fraud, dict):
+            raise ValueError("'fraud' must be an object")
+        threshold_names = {threshold.name for threshold in fields(FraudThresholds)}
+        unknown = set(fraud) - threshold_names
+        if unknown:
+            raise ValueError(f"Unknown fraud threshold '{sorted(unknown)[0]}'")
+        for name, value in fraud.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Fraud threshold '{name}' must be a number")
+
+        config = {
+            'strategy_weights': strategy_weights,
+            'complexity_factors': complexity_factors,
+            'fraud': asdict(FraudThresholds(**fraud))
+        }
+        serialized = json.dumps(config, sort_keys=True)
+        return cls(
+            strategy_weights=MappingProxyType(strategy_weights),
+            complexity_factors=MappingProxyType(complexity_factors),
+            fraud=FraudThresholds(**fraud),
+            version=hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'strategy_weights': dict(self.strategy_weights),
+            'complexity_factors': dict(self.complexity_factors),
+            'fraud': asdict(self.fraud)
+        }
+
+
+DEFAULT_SCORING_CONFIG = ScoringConfig.from_dict({})
+
+# The snapshot pinned by the request being handled in this context, if any
+_pinned_config: ContextVar[Optional[ScoringConfig]] = ContextVar('pinned_scoring_config', default=None)
+
+
+class ScoringConfigStore:
+    """The current ScoringConfig, reloaded by a watcher thread when its file changes"""
+
+    def __init__(self, path: str, poll_interval: float = 2.0, watch: bool = True):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._config = DEFAULT_SCORING_CONFIG
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self.check()
+
+        self._watcher = None
+        if watch:
+            self._watcher = threading.Thread(target=self._run_watcher, name='scoring-config-watcher', daemon=True)
+            self._watcher.start()
+
+    @property
+    def latest(self) -> ScoringConfig:
+        return self._config
+
+    def current(self) -> ScoringConfig:
+        """The snapshot pinned for this request, or the latest one outside a request"""
+        return _pinned_config.get() or self._config
+
+    def pin(self) -> ScoringConfig:
+        """Pin the latest snapshot for the rest of the current request"""
+        config = self._config
+        _pinned_config.set(config)
+        return config
+
+    @staticmethod
+    def unpin():
+        _pinned_config.set(None)
+
+    def check(self) -> bool:
+        """Reload the file if it changed since the last check; returns True if a new snapshot was swapped in"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            signature = None
+        else:
+            signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._file_signature:
+            return False
+        self._file_signature = signature
+
+        try:
+            if signature is None:
+                config = DEFAULT_SCORING_CONFIG
+            else:
+                with open(self.path, encoding='utf-8') as config_file:
+                    config = ScoringConfig.from_dict(json.load(config_file))
+        except (OSError, ValueError) as e:
+            # Keep scoring with the running snapshot until the file is fixed
+            self.last_error = str(e)
+            return False
+
+        self.last_error = None
+        self.loaded_at = time.time()
+        # Readers take one reference to the snapshot, so swapping it is atomic
+        self._config = config
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._config.to_dict(),
+            'path': self.path,
+            'loaded_at': self.loaded_at,
+            'last_error': self.last_error
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _run_watcher(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                traceback.print_exc()
+
+
+def current_config(store: Optional[ScoringConfigStore]) -> ScoringConfig:
+    """The snapshot a service should score with, given its optional configuration store"""
+    return store.current() if store is not None else DEFAULT_SCORING_CONFIG
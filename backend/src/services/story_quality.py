@@ -0,0 +1,61 @@
+"""
+Story Quality Indexing for SaveLife.com
+
+This module scores campaign stories in bulk for the story quality index:
+- Worker processes each hold their own CampaignAI
+- Readability, emotional impact and clarity from optimize_campaign_story,
+  with clarity judged against the condition the story itself describes
+- A SHA-256 of each story and a version of the scorer and knowledge base it
+  was scored with, so stories scored by the current ones are skipped on
+  later runs
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.campaign_ai import CampaignAI
+from src.services.medical_knowledge import MedicalKnowledgeBase
+
+# Bump whenever story scoring in CampaignAI changes so stored scores are recomputed;
+# knowledge base changes are versioned by the knowledge base
+SCORER_VERSION = "1"
+
+# The scorer used by this worker process
+_worker_ai: Optional[CampaignAI] = None
+
+
+def story_hash(story: str) -> str:
+    return hashlib.sha256((story or '').encode('utf-8')).hexdigest()
+
+
+def scorer_version(knowledge_base: MedicalKnowledgeBase) -> str:
+    return f"{SCORER_VERSION}-{knowledge_base.version}"
+
+
+def init_worker():
+    """Process pool initializer building the worker's scorer"""
+    global _worker_ai
+    # Every story is classified once, so memoizing classifications would only hold memory
+    _worker_ai = CampaignAI(max_condition_memo=0)
+
+
+def score_stories(stories: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """Score (campaign id, story, story hash) triples"""
+    ai = _worker_ai or CampaignAI(max_condition_memo=0)
+    version = scorer_version(ai.knowledge_base)
+    results = []
+    for campaign_id, story, text_sha256 in stories:
+        story = story or ''
+        analysis = ai.optimize_campaign_story(story, ai.analyze_medical_condition(story))
+        results.append({
+            'campaign_id': campaign_id,
+            'text_sha256': text_sha256,
+            'scorer_version': version,
+            'readability_score': analysis.readability_score,
+            'emotional_impact_score': analysis.emotional_impact_score,
+            'clarity_score': analysis.clarity_score,
+            'quality_score': (
+                analysis.readability_score + analysis.emotional_impact_score + analysis.clarity_score
+            ) / 3
+        })
+    return results
@@ -0,0 +1,76 @@
+"""
+Text Statistics for SaveLife.com Content Scoring
+
+This module tokenizes campaign text once into a reusable TextStats object:
+- Word and sentence counts
+- Counts of lowercased whitespace-separated tokens
+- First-person pronoun counts
+- Keyword presence checks against the lowercased text
+Story optimization, writing assistance and live writing sessions all score
+from the same statistics instead of re-splitting the text per check. Counts
+beyond the tokens themselves are derived on first use, so a scorer that
+reads only a few of them does not pay for the rest.
+"""
+
+import string
+from collections import Counter
+from typing import Iterable, List, Optional, Set
+
+# Pronoun forms, after stripping surrounding punctuation, by the pronoun they count towards
+PRONOUN_FORMS = {
+    'i': 'i', "i'm": 'i', "i've": 'i', "i'll": 'i', "i'd": 'i',
+    'me': 'me', 'my': 'my', 'mine': 'my', 'myself': 'me',
+    'we': 'we', "we're": 'we', "we've": 'we', 'us': 'us', 'our': 'our', 'ours': 'our'
+}
+
+_TOKEN_PUNCTUATION = string.punctuation.replace("'", '') + '“”'
+
+
+class TextStats:
+    """Statistics of one text, from a single tokenizer pass"""
+
+    __slots__ = ('text', 'lower', 'tokens', 'word_count', '_sentence_count', '_token_counts', '_pronoun_counts')
+
+    def __init__(self, text: str):
+        self.text = text or ''
+        self.lower = self.text.lower()
+        self.tokens: List[str] = self.lower.split()
+        self.word_count = len(self.tokens)
+
+        self._sentence_count: Optional[int] = None
+        self._token_counts: Optional[Counter] = None
+        self._pronoun_counts: Optional[Counter] = None
+
+    @property
+    def sentence_count(self) -> int:
+        """Non-blank pieces of the text between periods"""
+        if self._sentence_count is None:
+            self._sentence_count = sum(1 for sentence in self.text.split('.') if sentence.strip())
+        return self._sentence_count
+
+    @property
+    def token_counts(self) -> Counter:
+        if self._token_counts is None:
+            self._token_counts = Counter(self.tokens)
+        return self._token_counts
+
+    @property
+    def pronoun_counts(self) -> Counter:
+        """Occurrences of first-person pronouns, by PRONOUN_FORMS canonical form"""
+        if self._pronoun_counts is None:
+            counts = Counter()
+            for token, count in self.token_counts.items():
+                pronoun = PRONOUN_FORMS.get(token.replace('’', "'").strip(_TOKEN_PUNCTUATION))
+                if pronoun:
+                    counts[pronoun] += count
+            self._pronoun_counts = counts
+        return self._pronoun_counts
+
+    def count_tokens(self, words: Iterable[str]) -> int:
+        """Occurrences of any of the given lowercase words as whole tokens"""
+        token_counts = self.token_counts
+        return sum(token_counts[word] for word in words)
+
+    def keyword_hits(self, keywords: Iterable[str]) -> Set[str]:
+        """Keywords occurring anywhere in the lowercased text"""
+        return {keyword for keyword in keywords if keyword in self.lower}
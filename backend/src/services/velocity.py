@@ -0,0 +1,165 @@
+"""
+Velocity Limiting Service for SaveLife.com
+
+This module tracks bursts of campaign and verification activity:
+- Sliding-window counts kept as per-key time buckets in SQLite, shared by
+  every worker process on the host
+- Separate limits per user, email domain and client IP
+- Admission checks that defer bursts before expensive document analysis
+- Read-only counts for fraud scoring
+Buckets older than the window are pruned as new attempts are recorded.
+"""
+
+import os
+import math
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Free email providers are shared by unrelated users, so their domains are not limited
+FREE_EMAIL_DOMAINS = frozenset({
+    'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com',
+    'icloud.com', 'live.com', 'msn.com', 'protonmail.com', 'mail.com'
+})
+
+
+class VelocityLimiter:
+    """Sliding-window limits per user, email domain and client IP"""
+
+    def __init__(self, db_path: Optional[str] = None, limits: Optional[Dict[str, int]] = None,
+                 window_seconds: float = 600, buckets: int = 60, prune_interval: int = 256):
+        self.limits = limits or {
+            'user': 5,
+            'email_domain': 30,
+            'ip': 10
+        }
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.prune_interval = prune_interval
+        self._admits_since_prune = 0
+        self._lock = threading.Lock()
+
+        # Without db_path the counts only cover this process
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS velocity_buckets (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                epoch INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (kind, key, epoch)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_velocity_buckets_epoch
+                ON velocity_buckets (epoch);
+        """)
+        self._conn.commit()
+
+    def keys_for(self, campaign_data: Dict, client_ip: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Identify the user, email domain and IP responsible for a campaign"""
+        keys = []
+
+        user_id = campaign_data.get('user_id')
+        if user_id:
+            keys.append(('user', str(user_id)))
+
+        email = campaign_data.get('email') or ''
+        if '@' in email:
+            domain = email.rsplit('@', 1)[1].strip().lower()
+            if domain and domain not in FREE_EMAIL_DOMAINS:
+                keys.append(('email_domain', domain))
+
+        ip_address = client_ip or campaign_data.get('ip_address')
+        if ip_address:
+            keys.append(('ip', str(ip_address)))
+
+        return keys
+
+    def counts(self, keys: List[Tuple[str, str]], now: Optional[float] = None) -> Dict[str, int]:
+        """Current window counts per key kind, without recording an event"""
+        now = now if now is not None else time.time()
+        oldest = self._epoch(now) - self.buckets + 1
+        with self._lock:
+            return {
+                kind: self._conn.execute(
+                    'SELECT COALESCE(SUM(count), 0) FROM velocity_buckets WHERE kind = ? AND key = ? AND epoch >= ?',
+                    (kind, key, oldest)
+                ).fetchone()[0]
+                for kind, key in keys
+            }
+
+    def exceeded(self, keys: List[Tuple[str, str]], now: Optional[float] = None) -> List[str]:
+        """Key kinds whose window count has reached its limit"""
+        return [
+            kind for kind, count in self.counts(keys, now).items()
+            if kind in self.limits and count >= self.limits[kind]
+        ]
+
+    def admit(self, keys: List[Tuple[str, str]], now: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Record an attempt if every key is under its limit.
+
+        Returns (admitted, retry_after_seconds); rejected attempts are not recorded.
+        """
+        now = now if now is not None else time.time()
+        epoch = self._epoch(now)
+        oldest = epoch - self.buckets + 1
+        with self._lock:
+            # Holding the write lock from the check to the increment keeps concurrent
+            # attempts from several processes from all slipping under a limit
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                blocked = False
+                retry_after = 0.0
+                for kind, key in keys:
+                    limit = self.limits.get(kind)
+                    if limit is None:
+                        continue
+                    live = self._conn.execute(
+                        'SELECT epoch, count FROM velocity_buckets WHERE kind = ? AND key = ? AND epoch >= ? '
+                        'ORDER BY epoch',
+                        (kind, key, oldest)
+                    ).fetchall()
+                    if sum(count for _, count in live) >= limit:
+                        blocked = True
+                        retry_after = max(retry_after, self._retry_after(live, now, limit))
+
+                if not blocked:
+                    self._conn.executemany(
+                        'INSERT INTO velocity_buckets (kind, key, epoch, count) VALUES (?, ?, ?, 1) '
+                        'ON CONFLICT (kind, key, epoch) DO UPDATE SET count = count + 1',
+                        [(kind, key, epoch) for kind, key in keys]
+                    )
+                    self._admits_since_prune += 1
+                    if self._admits_since_prune >= self.prune_interval:
+                        self._admits_since_prune = 0
+                        self._conn.execute('DELETE FROM velocity_buckets WHERE epoch < ?', (oldest,))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        if blocked:
+            return False, math.ceil(retry_after)
+        return True, 0.0
+
+    def _epoch(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def _retry_after(self, live: List[Tuple[int, int]], now: float, limit: int) -> float:
+        """Seconds until enough of the live (epoch, count) buckets expire for the count to drop below limit"""
+        remaining = sum(count for _, count in live)
+        wait = 0.0
+        for epoch, count in live:
+            if remaining < limit:
+                break
+            remaining -= count
+            wait = (epoch + self.buckets) * self.bucket_seconds - now
+        return max(0.0, wait)
@@ -11,12 +11,135 @@ This service provides AI-powered verification capabilities including:
 
 import re
 import json
+import bisect
+import codecs
 import hashlib
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 
+from src.services.medical_knowledge import shared_knowledge_base
+from src.services.scoring_config import FraudThresholds, current_config
+from src.services.decision_log import input_hash
+from src.services.fraud_rings import campaign_identifiers, document_identifiers
+from src.services.name_matching import normalize_name
+from src.services.verification_rules import RuleOutcome, RuleScan, VerificationRuleEngine
+
+
+# Bump whenever the analysis logic below changes so cached results are invalidated;
+# rule changes are versioned by the rule engine
+RULESET_VERSION = "1"
+
+# Flag prefix for documents rejected by the confirmed-fraud blocklist
+BLOCKLIST_FLAG = "Matches confirmed-fraud blocklist"
+
+# Flag prefix for documents naming someone other than the campaign beneficiary
+NAME_MISMATCH_FLAG = "Mismatched names"
+
+
+def flag_code(flag: str) -> str:
+    """
+    Stable code for a rendered flag: the text before any ': ' detail, as snake case.
+    Details can name people, identifiers or campaigns, so only codes are logged.
+    """
+    return re.sub(r'[^a-z0-9]+', '_', flag.split(': ', 1)[0].lower()).strip('_')
+
+
+def normalize_document_text(document_text: str) -> str:
+    """Normalize line endings and surrounding whitespace before hashing and analysis"""
+    if not document_text:
+        return ""
+    return document_text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+def document_text_hash(normalized_text: str) -> str:
+    """SHA-256 hex digest of normalized document text"""
+    return hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()
+
+
+def iter_text_chunks(stream, chunk_size: int = 65536) -> Iterator[str]:
+    """Read text from a file-like object in chunks, decoding UTF-8 bytes incrementally"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+class StreamingTextNormalizer:
+    """
+    Incremental equivalent of normalize_document_text and document_text_hash.
+    
+    Trailing whitespace is held back until more text shows it is not trailing;
+    runs longer than max_pending are released early to keep memory bounded.
+    """
+    
+    def __init__(self, max_pending: int = 4096):
+        self.max_pending = max_pending
+        self.length = 0
+        self._hasher = hashlib.sha256()
+        self._pending = ''
+        self._pending_hasher = None
+        self._pending_released = 0
+        self._carriage_return = False
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        """Normalize the next chunk; returns text ready for analysis"""
+        if self._carriage_return:
+            chunk = '\r' + chunk
+        # A trailing CR may be the first half of a CRLF pair
+        self._carriage_return = chunk.endswith('\r')
+        if self._carriage_return:
+            chunk = chunk[:-1]
+        chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
+        
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return ''
+            self._started = True
+        
+        content = chunk.rstrip()
+        trailing = chunk[len(content):]
+        released = ''
+        
+        if content:
+            if self._pending_hasher is not None:
+                self._hasher = self._pending_hasher
+                self.length += self._pending_released + len(self._pending)
+            released = self._pending + content
+            self._hasher.update(content.encode('utf-8'))
+            self.length += len(content)
+            self._pending, self._pending_hasher, self._pending_released = '', None, 0
+        
+        if trailing:
+            if self._pending_hasher is None:
+                self._pending_hasher = self._hasher.copy()
+            self._pending_hasher.update(trailing.encode('utf-8'))
+            self._pending += trailing
+            if len(self._pending) > self.max_pending:
+                released += self._pending
+                self._pending_released += len(self._pending)
+                self._pending = ''
+        
+        return released
+    
+    def hexdigest(self) -> str:
+        """SHA-256 of the normalized text fed so far, excluding trailing whitespace"""
+        return self._hasher.hexdigest()
+
 
 class VerificationStatus(Enum):
     """Verification status enumeration"""
@@ -50,6 +173,29 @@ class DocumentAnalysis:
     flags: List[str]
     processing_notes: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'document_type': self.document_type.value,
+            'authenticity_score': self.authenticity_score,
+            'extracted_data': self.extracted_data,
+            'confidence_score': self.confidence_score,
+            'verification_status': self.verification_status.value,
+            'flags': self.flags,
+            'processing_notes': self.processing_notes
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DocumentAnalysis':
+        return cls(
+            document_type=DocumentType(data['document_type']),
+            authenticity_score=data['authenticity_score'],
+            extracted_data=data['extracted_data'],
+            confidence_score=data['confidence_score'],
+            verification_status=VerificationStatus(data['verification_status']),
+            flags=data['flags'],
+            processing_notes=data['processing_notes']
+        )
+
 
 @dataclass
 class VerificationResult:
@@ -63,27 +209,93 @@ class VerificationResult:
     next_steps: List[str]
 
 
+class CampaignVerificationState:
+    """Per-campaign document analyses with running aggregates for O(1) re-scoring"""
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._documents: Dict[str, Tuple[str, DocumentAnalysis]] = {}
+        self._type_counts: Dict[DocumentType, int] = {}
+        self.authenticity_total = 0.0
+        self.verified_docs = 0
+        self.rejected_docs = 0
+
+    @property
+    def document_count(self) -> int:
+        return len(self._documents)
+
+    def document_keys(self) -> List[str]:
+        return list(self._documents)
+
+    def document_types(self) -> Set[DocumentType]:
+        return set(self._type_counts)
+
+    def analyses(self) -> List[DocumentAnalysis]:
+        return [analysis for _, analysis in self._documents.values()]
+
+    def content_hash(self, key: str) -> Optional[str]:
+        entry = self._documents.get(key)
+        return entry[0] if entry else None
+
+    def set_document(self, key: str, content_hash: str, analysis: DocumentAnalysis):
+        """Add a document analysis, replacing any previous version under the same key"""
+        self.remove_document(key)
+        self._documents[key] = (content_hash, analysis)
+        self._apply(analysis, 1)
+
+    def remove_document(self, key: str) -> bool:
+        entry = self._documents.pop(key, None)
+        if entry is None:
+            return False
+        self._apply(entry[1], -1)
+        if not self._documents:
+            self.authenticity_total = 0.0  # Drop accumulated floating point drift
+        return True
+
+    def _apply(self, analysis: DocumentAnalysis, sign: int):
+        """Add (sign=1) or subtract (sign=-1) a document's contribution to the aggregates"""
+        self.authenticity_total += sign * analysis.authenticity_score
+        if analysis.verification_status == VerificationStatus.VERIFIED:
+            self.verified_docs += sign
+        elif analysis.verification_status == VerificationStatus.REJECTED:
+            self.rejected_docs += sign
+        
+        count = self._type_counts.get(analysis.document_type, 0) + sign
+        if count:
+            self._type_counts[analysis.document_type] = count
+        else:
+            self._type_counts.pop(analysis.document_type, None)
+
+
 class VerificationAI:
     """AI service for campaign and document verification"""
     
-    def __init__(self):
-        self.medical_institutions = {
-            'mayo clinic', 'cleveland clinic', 'johns hopkins', 'md anderson',
-            'memorial sloan kettering', 'massachusetts general', 'cedars-sinai',
-            'ucla medical center', 'stanford hospital', 'brigham and women\'s'
-        }
-        
-        self.insurance_providers = {
-            'aetna', 'anthem', 'blue cross', 'cigna', 'humana', 'kaiser',
-            'united healthcare', 'medicare', 'medicaid', 'tricare'
-        }
-        
-        self.medical_specialties = {
-            'oncology', 'cardiology', 'neurology', 'orthopedics', 'pediatrics',
-            'emergency medicine', 'internal medicine', 'surgery', 'radiology',
-            'pathology', 'anesthesiology', 'psychiatry', 'dermatology'
-        }
-        
+    def __init__(self, analysis_cache=None, duplicate_index=None, fingerprint_index=None,
+                 feature_store=None, velocity_limiter=None, fraud_ring_graph=None, blocklist=None,
+                 name_matcher=None, rule_engine=None, decision_log=None, knowledge_base=None,
+                 scoring_config=None, max_campaign_states: int = 10000, read_only: bool = False):
+        self.analysis_cache = analysis_cache
+        self.duplicate_index = duplicate_index
+        self.fingerprint_index = fingerprint_index
+        self.feature_store = feature_store
+        self.velocity_limiter = velocity_limiter
+        self.fraud_ring_graph = fraud_ring_graph
+        self.blocklist = blocklist
+        self.name_matcher = name_matcher
+        self.rule_engine = rule_engine or VerificationRuleEngine()
+        self.decision_log = decision_log
+        self.knowledge_base = knowledge_base or shared_knowledge_base()
+        self.scoring_config = scoring_config
+        # Check documents against the cross-campaign indexes without adding to them or
+        # recording fraud features, as when re-verifying stored campaigns offline
+        self.read_only = read_only
+        
+        # Per-campaign document analyses, least recently verified first. For stored campaigns
+        # this is only a cache: their aggregates are rebuilt from the saved documents on each update
+        self.campaign_states: "OrderedDict[str, CampaignVerificationState]" = OrderedDict()
+        self.max_campaign_states = max_campaign_states
+        self._states_lock = threading.Lock()
+
         self.fraud_indicators = [
             'inconsistent dates',
             'mismatched names',
@@ -95,11 +307,69 @@ class VerificationAI:
             'vague medical details'
         ]
 
+    @property
+    def ruleset_version(self) -> str:
+        """Version of the analysis code and active rules, used to invalidate cached analyses"""
+        return f"{RULESET_VERSION}-{self.rule_engine.version}"
+
     def analyze_document_text(self, document_text: str, document_type: DocumentType) -> DocumentAnalysis:
         """Analyze document text for authenticity and extract relevant information"""
         
-        # Initialize analysis result
-        analysis = DocumentAnalysis(
+        normalized_text = normalize_document_text(document_text)
+        text_hash = document_text_hash(normalized_text)
+        
+        # Known fraudulent documents are rejected without any analysis
+        if self.blocklist is not None and self.blocklist.contains('document_sha256', text_hash):
+            return self._reject_blocked(self._new_analysis(document_type), ['document hash'])
+        
+        if self.analysis_cache is None:
+            analysis = self._analyze_normalized_text(normalized_text, document_type)
+        else:
+            # Identical text re-submitted under the same rules yields an identical analysis
+            cached = self.analysis_cache.get(document_type.value, text_hash, self.ruleset_version)
+            if cached is not None:
+                analysis = DocumentAnalysis.from_dict(cached)
+            else:
+                analysis = self._analyze_normalized_text(normalized_text, document_type)
+                self.analysis_cache.put(document_type.value, text_hash, self.ruleset_version, analysis.to_dict())
+        
+        # The blocklist changes independently of the rules, so it is applied after the cache
+        return self._check_blocked_identifiers(analysis)
+
+    def analyze_document_stream(self, stream, document_type: DocumentType,
+                                chunk_size: int = 65536) -> Tuple[DocumentAnalysis, str]:
+        """
+        Analyze a document read in chunks from a file-like object or upload stream.
+        
+        Memory stays bounded by the chunk size however large the document is.
+        Streamed analyses bypass the analysis cache, whose key needs the full
+        text hash before analysis starts. Returns the analysis and the text hash.
+        """
+        normalizer = StreamingTextNormalizer()
+        scan = self.rule_engine.scan(document_type.value)
+        for chunk in iter_text_chunks(stream, chunk_size):
+            text = normalizer.feed(chunk)
+            if text:
+                scan.feed(text)
+        
+        return self.finish_streamed_analysis(document_type, scan, normalizer)
+
+    def finish_streamed_analysis(self, document_type: DocumentType, scan: RuleScan,
+                                 normalizer: StreamingTextNormalizer) -> Tuple[DocumentAnalysis, str]:
+        """Build the analysis for text fed to a rule scan and normalizer; returns it with the text hash"""
+        text_hash = normalizer.hexdigest()
+        if self.blocklist is not None and self.blocklist.contains('document_sha256', text_hash):
+            return self._reject_blocked(self._new_analysis(document_type), ['document hash']), text_hash
+        
+        analysis = self._new_analysis(document_type)
+        if normalizer.length < 20:
+            return self._mark_too_short(analysis), text_hash
+        
+        self._apply_rule_outcome(analysis, scan.finish())
+        return self._check_blocked_identifiers(self._score_analysis(analysis)), text_hash
+
+    def _new_analysis(self, document_type: DocumentType) -> DocumentAnalysis:
+        return DocumentAnalysis(
             document_type=document_type,
             authenticity_score=0.0,
             extracted_data={},
@@ -108,28 +378,50 @@ class VerificationAI:
             flags=[],
             processing_notes=""
         )
+
+    def _check_blocked_identifiers(self, analysis: DocumentAnalysis) -> DocumentAnalysis:
+        """Reject an analysis whose extracted identifiers are on the blocklist"""
+        if self.blocklist is not None:
+            blocked = self.blocklist.blocked_identifiers(analysis.extracted_data)
+            if blocked:
+                return self._reject_blocked(analysis, [kind.replace('_', ' ') for kind in blocked])
+        return analysis
+
+    def _reject_blocked(self, analysis: DocumentAnalysis, matched: List[str]) -> DocumentAnalysis:
+        """Mark an analysis rejected because it matched the confirmed-fraud blocklist"""
+        analysis.flags.append(f"{BLOCKLIST_FLAG}: {', '.join(matched)}")
+        analysis.authenticity_score = 0.0
+        analysis.verification_status = VerificationStatus.REJECTED
+        analysis.processing_notes = "Matched confirmed-fraud blocklist; further analysis skipped"
+        return analysis
+
+    def _analyze_normalized_text(self, document_text: str, document_type: DocumentType) -> DocumentAnalysis:
+        """Run the document type specific analysis on normalized text"""
+        
+        # Initialize analysis result
+        analysis = self._new_analysis(document_type)
         
         if not document_text or len(document_text.strip()) < 20:
-            analysis.flags.append("Document text too short or empty")
-            analysis.verification_status = VerificationStatus.INCOMPLETE
-            analysis.processing_notes = "Insufficient document content for analysis"
-            return analysis
+            return self._mark_too_short(analysis)
         
-        text_lower = document_text.lower()
-        
-        # Document type specific analysis
-        if document_type == DocumentType.MEDICAL_RECORD:
-            analysis = self._analyze_medical_record(document_text, analysis)
-        elif document_type == DocumentType.INSURANCE_DOCUMENT:
-            analysis = self._analyze_insurance_document(document_text, analysis)
-        elif document_type == DocumentType.IDENTITY_DOCUMENT:
-            analysis = self._analyze_identity_document(document_text, analysis)
-        elif document_type == DocumentType.MEDICAL_BILL:
-            analysis = self._analyze_medical_bill(document_text, analysis)
-        elif document_type == DocumentType.TREATMENT_PLAN:
-            analysis = self._analyze_treatment_plan(document_text, analysis)
-        else:
-            analysis = self._analyze_generic_document(document_text, analysis)
+        # Document type specific rules
+        self._apply_rule_outcome(analysis, self.rule_engine.evaluate(document_type.value, document_text))
+        
+        return self._score_analysis(analysis)
+
+    def _mark_too_short(self, analysis: DocumentAnalysis) -> DocumentAnalysis:
+        analysis.flags.append("Document text too short or empty")
+        analysis.verification_status = VerificationStatus.INCOMPLETE
+        analysis.processing_notes = "Insufficient document content for analysis"
+        return analysis
+
+    def _apply_rule_outcome(self, analysis: DocumentAnalysis, outcome: RuleOutcome):
+        analysis.extracted_data = outcome.extracted_data
+        analysis.confidence_score = outcome.confidence
+        analysis.flags.extend(outcome.flags)
+
+    def _score_analysis(self, analysis: DocumentAnalysis) -> DocumentAnalysis:
+        """Calculate the authenticity score and verification status from analysis findings"""
         
         # Calculate overall authenticity score
         analysis.authenticity_score = self._calculate_authenticity_score(analysis)
@@ -146,254 +438,6 @@ class VerificationAI:
         
         return analysis
 
-    def _analyze_medical_record(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze medical record document"""
-        text_lower = text.lower()
-        
-        # Extract medical information
-        extracted_data = {}
-        
-        # Look for patient information
-        patient_name_match = re.search(r'patient:?\s*([a-zA-Z\s]+)', text_lower)
-        if patient_name_match:
-            extracted_data['patient_name'] = patient_name_match.group(1).strip()
-        
-        # Look for dates
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'\d{4}-\d{2}-\d{2}',
-            r'[a-zA-Z]+ \d{1,2}, \d{4}'
-        ]
-        dates = []
-        for pattern in date_patterns:
-            dates.extend(re.findall(pattern, text))
-        if dates:
-            extracted_data['dates'] = dates[:5]  # Limit to first 5 dates
-        
-        # Look for medical conditions
-        condition_keywords = ['diagnosis', 'condition', 'disease', 'disorder', 'syndrome']
-        for keyword in condition_keywords:
-            pattern = rf'{keyword}:?\s*([a-zA-Z\s,]+)'
-            match = re.search(pattern, text_lower)
-            if match:
-                extracted_data['medical_condition'] = match.group(1).strip()
-                break
-        
-        # Look for medical institution
-        for institution in self.medical_institutions:
-            if institution in text_lower:
-                extracted_data['medical_institution'] = institution
-                analysis.confidence_score += 0.2
-                break
-        
-        # Look for medical specialties
-        for specialty in self.medical_specialties:
-            if specialty in text_lower:
-                extracted_data['medical_specialty'] = specialty
-                analysis.confidence_score += 0.1
-                break
-        
-        # Check for required medical record elements
-        required_elements = ['patient', 'date', 'doctor', 'physician', 'md', 'diagnosis']
-        present_elements = sum(1 for element in required_elements if element in text_lower)
-        
-        if present_elements < 3:
-            analysis.flags.append("Missing required medical record elements")
-        
-        # Check for suspicious patterns
-        if 'copy' in text_lower and 'original' not in text_lower:
-            analysis.flags.append("Document appears to be a copy without original verification")
-        
-        analysis.extracted_data = extracted_data
-        analysis.confidence_score = min(1.0, analysis.confidence_score + (present_elements / len(required_elements)))
-        
-        return analysis
-
-    def _analyze_insurance_document(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze insurance document"""
-        text_lower = text.lower()
-        extracted_data = {}
-        
-        # Look for insurance provider
-        for provider in self.insurance_providers:
-            if provider in text_lower:
-                extracted_data['insurance_provider'] = provider
-                analysis.confidence_score += 0.3
-                break
-        
-        # Look for policy information
-        policy_match = re.search(r'policy\s*(?:number|#)?:?\s*([a-zA-Z0-9\-]+)', text_lower)
-        if policy_match:
-            extracted_data['policy_number'] = policy_match.group(1)
-            analysis.confidence_score += 0.2
-        
-        # Look for coverage information
-        coverage_keywords = ['coverage', 'benefit', 'deductible', 'copay', 'coinsurance']
-        for keyword in coverage_keywords:
-            if keyword in text_lower:
-                analysis.confidence_score += 0.1
-                break
-        
-        # Look for denial or approval information
-        if 'denied' in text_lower or 'rejection' in text_lower:
-            extracted_data['claim_status'] = 'denied'
-        elif 'approved' in text_lower or 'covered' in text_lower:
-            extracted_data['claim_status'] = 'approved'
-        
-        # Check for required insurance elements
-        required_elements = ['policy', 'member', 'coverage', 'effective', 'provider']
-        present_elements = sum(1 for element in required_elements if element in text_lower)
-        
-        if present_elements < 2:
-            analysis.flags.append("Missing required insurance document elements")
-        
-        analysis.extracted_data = extracted_data
-        analysis.confidence_score = min(1.0, analysis.confidence_score)
-        
-        return analysis
-
-    def _analyze_identity_document(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze identity document"""
-        text_lower = text.lower()
-        extracted_data = {}
-        
-        # Look for name
-        name_patterns = [
-            r'name:?\s*([a-zA-Z\s]+)',
-            r'full name:?\s*([a-zA-Z\s]+)'
-        ]
-        for pattern in name_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                extracted_data['name'] = match.group(1).strip()
-                analysis.confidence_score += 0.3
-                break
-        
-        # Look for ID number
-        id_patterns = [
-            r'id\s*(?:number|#)?:?\s*([a-zA-Z0-9\-]+)',
-            r'license\s*(?:number|#)?:?\s*([a-zA-Z0-9\-]+)',
-            r'ssn:?\s*(\d{3}-?\d{2}-?\d{4})'
-        ]
-        for pattern in id_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                extracted_data['id_number'] = match.group(1)
-                analysis.confidence_score += 0.2
-                break
-        
-        # Look for address
-        address_pattern = r'address:?\s*([a-zA-Z0-9\s,]+)'
-        address_match = re.search(address_pattern, text_lower)
-        if address_match:
-            extracted_data['address'] = address_match.group(1).strip()
-            analysis.confidence_score += 0.2
-        
-        # Check for government issued ID indicators
-        gov_indicators = ['department of motor vehicles', 'dmv', 'state of', 'government', 'official']
-        for indicator in gov_indicators:
-            if indicator in text_lower:
-                analysis.confidence_score += 0.2
-                break
-        
-        analysis.extracted_data = extracted_data
-        
-        return analysis
-
-    def _analyze_medical_bill(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze medical bill document"""
-        text_lower = text.lower()
-        extracted_data = {}
-        
-        # Look for billing amounts
-        amount_patterns = [
-            r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            r'total:?\s*\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            r'amount due:?\s*\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-        ]
-        amounts = []
-        for pattern in amount_patterns:
-            amounts.extend(re.findall(pattern, text))
-        
-        if amounts:
-            extracted_data['amounts'] = amounts[:5]  # Limit to first 5 amounts
-            analysis.confidence_score += 0.3
-        
-        # Look for medical procedures
-        procedure_keywords = ['procedure', 'treatment', 'service', 'consultation', 'surgery', 'therapy']
-        for keyword in procedure_keywords:
-            if keyword in text_lower:
-                analysis.confidence_score += 0.1
-                break
-        
-        # Look for billing date
-        date_patterns = [r'date of service:?\s*(\d{1,2}/\d{1,2}/\d{4})']
-        for pattern in date_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                extracted_data['service_date'] = match.group(1)
-                analysis.confidence_score += 0.2
-                break
-        
-        # Check for medical billing elements
-        billing_elements = ['patient', 'provider', 'service', 'amount', 'insurance', 'balance']
-        present_elements = sum(1 for element in billing_elements if element in text_lower)
-        
-        if present_elements < 3:
-            analysis.flags.append("Missing required medical billing elements")
-        
-        analysis.extracted_data = extracted_data
-        
-        return analysis
-
-    def _analyze_treatment_plan(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze treatment plan document"""
-        text_lower = text.lower()
-        extracted_data = {}
-        
-        # Look for treatment details
-        treatment_keywords = ['treatment', 'therapy', 'medication', 'surgery', 'procedure', 'plan']
-        treatment_count = sum(1 for keyword in treatment_keywords if keyword in text_lower)
-        
-        if treatment_count >= 2:
-            analysis.confidence_score += 0.3
-        
-        # Look for timeline information
-        timeline_keywords = ['weeks', 'months', 'sessions', 'appointments', 'schedule']
-        for keyword in timeline_keywords:
-            if keyword in text_lower:
-                analysis.confidence_score += 0.1
-                break
-        
-        # Look for medical professional
-        professional_keywords = ['doctor', 'physician', 'md', 'specialist', 'oncologist', 'surgeon']
-        for keyword in professional_keywords:
-            if keyword in text_lower:
-                analysis.confidence_score += 0.2
-                break
-        
-        analysis.extracted_data = extracted_data
-        
-        return analysis
-
-    def _analyze_generic_document(self, text: str, analysis: DocumentAnalysis) -> DocumentAnalysis:
-        """Analyze generic document"""
-        text_lower = text.lower()
-        
-        # Basic document structure analysis
-        if len(text.split()) > 50:
-            analysis.confidence_score += 0.2
-        
-        if any(char.isdigit() for char in text):
-            analysis.confidence_score += 0.1
-        
-        if re.search(r'\d{1,2}/\d{1,2}/\d{4}', text):
-            analysis.confidence_score += 0.1
-        
-        analysis.extracted_data = {'word_count': len(text.split())}
-        
-        return analysis
-
     def _calculate_authenticity_score(self, analysis: DocumentAnalysis) -> float:
         """Calculate overall authenticity score for document"""
         base_score = analysis.confidence_score
@@ -408,31 +452,259 @@ class VerificationAI:
         
         return authenticity_score
 
+    def admit_verification(self, campaign_data: Dict, client_ip: Optional[str] = None) -> Tuple[bool, float]:
+        """Admission check run before document analysis; returns (admitted, retry_after_seconds)"""
+        if self.velocity_limiter is None:
+            return True, 0.0
+        
+        return self.velocity_limiter.admit(self.velocity_limiter.keys_for(campaign_data, client_ip))
+
     def verify_campaign(self, campaign_data: Dict, documents: List[Dict]) -> VerificationResult:
         """Perform comprehensive campaign verification"""
         
         campaign_id = campaign_data.get('id', 'unknown')
-        document_analyses = []
+        self._record_campaign_owner(campaign_data)
+        self._link_campaign_identifiers(campaign_id, campaign_identifiers(campaign_data))
+        beneficiary = self._beneficiary_name(campaign_data)
+        state = self._get_campaign_state(campaign_id)
+        
+        with state.lock:
+            self._sync_campaign_documents(campaign_id, state, documents, beneficiary)
+            result = self._record_verification_outcome(self._build_verification_result(campaign_id, state))
+            self._log_verification_decision('verify', campaign_data, state, result)
+            return result
+
+    def upsert_campaign_document(self, campaign_data: Dict, document_id: str, document: Dict,
+                                 load_documents: Optional[Callable[[], List[Dict]]] = None) -> VerificationResult:
+        """
+        Add or replace a single campaign document, re-analyzing only that document.
+        
+        load_documents returns the campaign's saved documents, including this one.
+        The campaign's aggregates are rebuilt from them, so documents saved or
+        removed through other worker processes are counted; only documents this
+        process has not analyzed in their current version are re-analyzed.
+        """
         
-        # Analyze each document
+        campaign_id = campaign_data.get('id', 'unknown')
+        self._record_campaign_owner(campaign_data)
+        beneficiary = self._beneficiary_name(campaign_data)
+        state = self._get_campaign_state(campaign_id)
+        
+        with state.lock:
+            if load_documents is not None:
+                self._sync_campaign_documents(campaign_id, state, load_documents(), beneficiary)
+            
+            content_hash = self._document_content_hash(document)
+            version = self._document_version(content_hash, beneficiary)
+            if state.content_hash(document_id) != version:
+                state.set_document(
+                    document_id, version,
+                    self._analyze_campaign_document(campaign_id, document_id, content_hash, document, beneficiary)
+                )
+            
+            result = self._record_verification_outcome(self._build_verification_result(campaign_id, state))
+            self._log_verification_decision('upsert_document', campaign_data, state, result)
+            return result
+
+    def remove_campaign_document(self, campaign_data: Dict, document_id: str,
+                                 load_documents: Optional[Callable[[], List[Dict]]] = None) -> Optional[VerificationResult]:
+        """
+        Remove a single campaign document; returns None if the document is unknown.
+        
+        load_documents returns the campaign's saved documents, without this one.
+        The campaign's aggregates are rebuilt from them, as for an upsert, and the
+        caller is responsible for reporting documents that were never saved.
+        """
+        
+        campaign_id = campaign_data.get('id', 'unknown')
+        beneficiary = self._beneficiary_name(campaign_data)
+        state = self._get_campaign_state(campaign_id)
+        
+        with state.lock:
+            removed = state.remove_document(document_id)
+            if load_documents is not None:
+                self._sync_campaign_documents(campaign_id, state, load_documents(), beneficiary)
+            elif not removed:
+                return None
+            
+            result = self._record_verification_outcome(self._build_verification_result(campaign_id, state))
+            self._log_verification_decision('remove_document', campaign_data, state, result)
+            return result
+
+    def _sync_campaign_documents(self, campaign_id: str, state: 'CampaignVerificationState',
+                                 documents: List[Dict], beneficiary: Optional[str]):
+        """Make the state hold exactly these documents; the caller holds the state lock"""
+        
+        # Only documents that are new or whose content or beneficiary changed are re-analyzed
+        current_keys = set()
+        occurrences = {}
         for doc in documents:
-            doc_type = DocumentType(doc.get('type', 'medical_record'))
-            doc_text = doc.get('text', '')
+            content_hash = self._document_content_hash(doc)
+            if doc.get('id') is not None:
+                key = str(doc['id'])
+            else:
+                occurrences[content_hash] = occurrences.get(content_hash, 0) + 1
+                key = f"{content_hash}#{occurrences[content_hash]}"
+            current_keys.add(key)
             
-            analysis = self.analyze_document_text(doc_text, doc_type)
-            document_analyses.append(analysis)
+            version = self._document_version(content_hash, beneficiary)
+            if state.content_hash(key) != version:
+                state.set_document(
+                    key, version, self._analyze_campaign_document(campaign_id, key, content_hash, doc, beneficiary)
+                )
+        
+        for key in [key for key in state.document_keys() if key not in current_keys]:
+            state.remove_document(key)
+
+    def forget_campaign(self, campaign_id: str) -> Dict[str, int]:
+        """Remove a deleted campaign from the cross-campaign indexes; returns the entries removed per index"""
+        
+        with self._states_lock:
+            self.campaign_states.pop(campaign_id, None)
+        
+        removed = {}
+        if self.duplicate_index is not None:
+            removed['near_duplicates'] = int(self.duplicate_index.remove(campaign_id))
+        if self.fingerprint_index is not None:
+            removed['document_fingerprints'] = self.fingerprint_index.remove_campaign(campaign_id)
+        if self.fraud_ring_graph is not None:
+            removed['fraud_ring_links'] = self.fraud_ring_graph.remove_campaign(campaign_id)
+        return removed
+
+    def _get_campaign_state(self, campaign_id: str) -> 'CampaignVerificationState':
+        """Fetch or create the verification state kept for a campaign"""
+        
+        # Campaigns without an id cannot be matched across calls, so keep nothing for them
+        if campaign_id == 'unknown':
+            return CampaignVerificationState()
+        
+        with self._states_lock:
+            state = self.campaign_states.get(campaign_id)
+            if state is None:
+                state = CampaignVerificationState()
+                self.campaign_states[campaign_id] = state
+                if len(self.campaign_states) > self.max_campaign_states:
+                    self.campaign_states.popitem(last=False)
+            else:
+                self.campaign_states.move_to_end(campaign_id)
+            return state
+
+    def _document_content_hash(self, document: Dict) -> str:
+        """Hash of document type and normalized text identifying a document version"""
+        doc_type = document.get('type', 'medical_record')
+        normalized_text = normalize_document_text(document.get('text', ''))
+        return document_text_hash(f"{doc_type}\n{normalized_text}")
+
+    def _document_version(self, content_hash: str, beneficiary: Optional[str]) -> str:
+        """Document content hash combined with the beneficiary it was checked against"""
+        if self.name_matcher is None or not beneficiary:
+            return content_hash
+        return f"{content_hash}:{' '.join(normalize_name(beneficiary))}"
+
+    def _beneficiary_name(self, campaign_data: Dict) -> Optional[str]:
+        """Name of the person the campaign raises funds for"""
+        patient_information = campaign_data.get('patient_information') or {}
+        return campaign_data.get('beneficiary_name') or patient_information.get('name')
+
+    def _analyze_campaign_document(self, campaign_id: str, document_key: str, content_hash: str,
+                                   document: Dict, beneficiary: Optional[str] = None) -> DocumentAnalysis:
+        """Analyze one document submitted as part of a campaign"""
+        doc_type = DocumentType(document.get('type', 'medical_record'))
+        doc_text = document.get('text', '')
+        
+        analysis = self.analyze_document_text(doc_text, doc_type)
+        if any(flag.startswith(BLOCKLIST_FLAG) for flag in analysis.flags):
+            return analysis
+        
+        self._link_campaign_identifiers(campaign_id, document_identifiers(analysis.extracted_data))
+        
+        # Check that the names on the document match the campaign beneficiary
+        name_flags = self._check_document_names(analysis.extracted_data, beneficiary)
+        if name_flags:
+            analysis.flags.extend(name_flags)
+            analysis = self._score_analysis(analysis)
+        
+        # Check for documents already submitted by other campaigns
+        if (self.fingerprint_index is not None and campaign_id != 'unknown'
+                and analysis.verification_status != VerificationStatus.INCOMPLETE):
+            check = self.fingerprint_index.check if self.read_only else self.fingerprint_index.check_and_register
+            reuse_flags = check(campaign_id, content_hash, normalize_document_text(doc_text), analysis.extracted_data)
+            if reuse_flags:
+                analysis.flags.extend(reuse_flags)
+                analysis = self._score_analysis(analysis)
+                if self.feature_store is not None and not self.read_only:
+                    self.feature_store.record_document_reuse(campaign_id, document_key)
+        
+        return analysis
+
+    def _check_document_names(self, extracted_data: Dict[str, Any], beneficiary: Optional[str]) -> List[str]:
+        """Flag patient and identity names on a document that do not match the beneficiary"""
+        if self.name_matcher is None or not beneficiary:
+            return []
+        
+        flags = []
+        for field in ('patient_name', 'name'):
+            document_name = extracted_data.get(field)
+            if document_name and not self.name_matcher.matches(document_name, beneficiary):
+                shown_name = ' '.join(normalize_name(document_name))
+                flags.append(f"{NAME_MISMATCH_FLAG}: document names '{shown_name}' but campaign beneficiary is '{beneficiary}'")
+        return flags
+
+    def _link_campaign_identifiers(self, campaign_id: str, identifiers: List[Tuple[str, str]]):
+        """Add a campaign's identifiers to the fraud ring graph"""
+        if self.fraud_ring_graph is not None and not self.read_only and campaign_id and campaign_id != 'unknown':
+            self.fraud_ring_graph.add_identifiers(str(campaign_id), identifiers)
+
+    def _record_campaign_owner(self, campaign_data: Dict) -> bool:
+        """Register a campaign with its owner in the feature store; returns True if it is counted there"""
+        campaign_id = campaign_data.get('id')
+        user_id = campaign_data.get('user_id')
+        if self.feature_store is None or self.read_only or not campaign_id or not user_id:
+            return False
+        
+        self.feature_store.record_campaign(str(campaign_id), str(user_id))
+        return True
+
+    def _record_verification_outcome(self, result: VerificationResult) -> VerificationResult:
+        """Feed verification rejections back into the fraud feature store"""
+        if (self.feature_store is not None and not self.read_only
+                and result.overall_status == VerificationStatus.REJECTED):
+            self.feature_store.record_rejection(result.campaign_id)
+        return result
+
+    def _log_verification_decision(self, trigger: str, campaign_data: Dict,
+                                   state: 'CampaignVerificationState', result: VerificationResult):
+        """Append a verification decision and the inputs it was based on to the decision log"""
+        if self.decision_log is None:
+            return
+        
+        campaign_id = result.campaign_id if result.campaign_id != 'unknown' else None
+        self.decision_log.append('verification', campaign_id, {
+            'trigger': trigger,
+            'ruleset_version': self.ruleset_version,
+            'input_sha256': input_hash(campaign_data),
+            # Document versions may carry the beneficiary name; only the content hash is logged
+            'document_sha256': [state.content_hash(key).split(':', 1)[0] for key in state.document_keys()],
+            'status': result.overall_status.value,
+            'trust_score': result.trust_score,
+            'flag_codes': [flag_code(flag) for analysis in result.document_analyses for flag in analysis.flags]
+        })
+
+    def _build_verification_result(self, campaign_id: str, state: 'CampaignVerificationState') -> VerificationResult:
+        """Derive trust score and overall status from the campaign's running aggregates"""
         
         # Calculate overall trust score
-        if document_analyses:
-            avg_authenticity = sum(doc.authenticity_score for doc in document_analyses) / len(document_analyses)
-            document_coverage = len(document_analyses) / 4  # Assume 4 ideal documents
+        document_count = state.document_count
+        if document_count:
+            avg_authenticity = state.authenticity_total / document_count
+            document_coverage = document_count / 4  # Assume 4 ideal documents
             trust_score = (avg_authenticity * 0.7) + (min(1.0, document_coverage) * 0.3)
         else:
             trust_score = 0.0
         
         # Determine overall status
-        verified_docs = sum(1 for doc in document_analyses if doc.verification_status == VerificationStatus.VERIFIED)
-        rejected_docs = sum(1 for doc in document_analyses if doc.verification_status == VerificationStatus.REJECTED)
+        verified_docs = state.verified_docs
+        rejected_docs = state.rejected_docs
         
         if verified_docs >= 2 and rejected_docs == 0 and trust_score >= 0.7:
             overall_status = VerificationStatus.VERIFIED
@@ -444,19 +716,19 @@ class VerificationAI:
             overall_status = VerificationStatus.PENDING
         
         # Generate next steps
-        next_steps = self._generate_next_steps(overall_status, document_analyses, trust_score)
+        next_steps = self._generate_next_steps(overall_status, state.document_types(), trust_score)
         
         return VerificationResult(
             campaign_id=campaign_id,
             overall_status=overall_status,
             trust_score=trust_score,
-            document_analyses=document_analyses,
+            document_analyses=state.analyses(),
             verification_timestamp=datetime.now(),
             reviewer_notes=f"Automated verification completed. Trust score: {trust_score:.2f}",
             next_steps=next_steps
         )
 
-    def _generate_next_steps(self, status: VerificationStatus, analyses: List[DocumentAnalysis], trust_score: float) -> List[str]:
+    def _generate_next_steps(self, status: VerificationStatus, document_types: Set[DocumentType], trust_score: float) -> List[str]:
         """Generate next steps based on verification results"""
         next_steps = []
         
@@ -482,9 +754,9 @@ class VerificationAI:
         
         # Add specific recommendations based on document analysis
         missing_docs = []
-        if not any(doc.document_type == DocumentType.MEDICAL_RECORD for doc in analyses):
+        if DocumentType.MEDICAL_RECORD not in document_types:
             missing_docs.append("medical records")
-        if not any(doc.document_type == DocumentType.IDENTITY_DOCUMENT for doc in analyses):
+        if DocumentType.IDENTITY_DOCUMENT not in document_types:
             missing_docs.append("identity verification")
         
         if missing_docs:
@@ -494,44 +766,175 @@ class VerificationAI:
 
     def detect_fraud_indicators(self, campaign_data: Dict, user_history: Dict = None) -> Dict[str, Any]:
         """Detect potential fraud indicators in campaign"""
+        return self.detect_fraud_indicators_batch([campaign_data], [user_history])[0]
+
+    def detect_fraud_indicators_batch(self, campaigns: List[Dict],
+                                      user_histories: Optional[List[Optional[Dict]]] = None) -> List[Dict[str, Any]]:
+        """Detect fraud indicators for many campaigns, computing content features across the batch"""
+        
+        if user_histories is None:
+            user_histories = [None] * len(campaigns)
+        
+        goals = [campaign.get('goal_amount', 0) for campaign in campaigns]
+        descriptions = [campaign.get('description', '').lower() for campaign in campaigns]
+        # One knowledge base and configuration version score the whole batch, even across a reload
+        knowledge = self.knowledge_base.snapshot
+        config = current_config(self.scoring_config)
+        medical_mentions = self._count_medical_mentions(descriptions, knowledge.medical_mention_matcher)
+        
+        results = [
+            self._score_fraud_indicators(campaign, history, goal, description, mentions, config.fraud)
+            for campaign, history, goal, description, mentions
+            in zip(campaigns, user_histories, goals, descriptions, medical_mentions)
+        ]
+        
+        if self.decision_log is not None:
+            for campaign, history, result in zip(campaigns, user_histories, results):
+                self.decision_log.append('fraud', campaign.get('id'), {
+                    'ruleset_version': self.ruleset_version,
+                    'knowledge_version': knowledge.version,
+                    'scoring_version': config.version,
+                    'input_sha256': input_hash({'campaign_data': campaign, 'user_history': history}),
+                    'fraud_score': result['fraud_score'],
+                    'risk_level': result['risk_level'],
+                    # Rendered indicators carry counts and identifier kinds, so only their codes are logged
+                    'indicator_codes': result['indicator_codes']
+                })
+        
+        return results
+
+    @staticmethod
+    def _count_medical_mentions(descriptions: List[str], matcher) -> List[int]:
+        """Count distinct medical keywords per description with one scan over the whole batch"""
+        
+        # Keywords never contain NUL, so no match can span two descriptions
+        offsets = []
+        position = 0
+        for description in descriptions:
+            offsets.append(position)
+            position += len(description) + 1
+        
+        found = [set() for _ in descriptions]
+        for start, keyword in matcher.finditer('\0'.join(descriptions)):
+            found[bisect.bisect_right(offsets, start) - 1].add(keyword)
+        
+        return [len(keywords) for keywords in found]
+
+    def _score_fraud_indicators(self, campaign_data: Dict, user_history: Optional[Dict], goal: float,
+                                description: str, medical_mentions: int,
+                                thresholds: FraudThresholds) -> Dict[str, Any]:
+        """Combine precomputed content features with per-campaign signals into a fraud assessment"""
         
         fraud_score = 0.0
         detected_indicators = []
+        # Stable codes for the rendered indicators, for the decision log
+        indicator_codes = []
+        
+        def indicate(code: str, indicator: str):
+            indicator_codes.append(code)
+            detected_indicators.append(indicator)
         
         # Check for suspicious goal amounts
-        goal = campaign_data.get('goal_amount', 0)
-        if goal > 500000:  # Very high goal
+        if goal > thresholds.high_goal:
             fraud_score += 0.3
-            detected_indicators.append("Unusually high funding goal")
-        elif goal < 1000:  # Very low goal
+            indicate('high_goal', "Unusually high funding goal")
+        elif goal < thresholds.low_goal:
             fraud_score += 0.2
-            detected_indicators.append("Unusually low funding goal")
+            indicate('low_goal', "Unusually low funding goal")
         
         # Check for vague medical details
-        description = campaign_data.get('description', '').lower()
-        medical_keywords = ['diagnosis', 'treatment', 'doctor', 'hospital', 'surgery', 'therapy']
-        medical_mentions = sum(1 for keyword in medical_keywords if keyword in description)
-        
-        if medical_mentions < 2:
+        if medical_mentions < thresholds.min_medical_mentions:
             fraud_score += 0.4
-            detected_indicators.append("Vague or insufficient medical details")
+            indicate('vague_medical_details', "Vague or insufficient medical details")
         
-        # Check for duplicate content (simplified)
-        if len(description) < 100:
+        # Check for very short descriptions
+        if len(description) < thresholds.min_description_length:
             fraud_score += 0.2
-            detected_indicators.append("Very short campaign description")
+            indicate('short_description', "Very short campaign description")
+        
+        # Check for near-duplicate descriptions of other campaigns
+        duplicate_matches = []
+        if self.duplicate_index is not None and description:
+            campaign_id = campaign_data.get('id')
+            signature = self.duplicate_index.signature(description)
+            if signature is not None:
+                duplicate_matches = [
+                    {'campaign_id': match_id, 'similarity': round(similarity, 3)}
+                    for match_id, similarity in self.duplicate_index.query(signature, exclude=campaign_id)
+                ]
+                if campaign_id:
+                    self.duplicate_index.add(campaign_id, signature)
+        
+        if duplicate_matches:
+            fraud_score += 0.4
+            indicate(
+                'near_duplicate_description',
+                f"Description nearly duplicates {len(duplicate_matches)} existing campaign(s)"
+            )
+        
+        # Check for bursts of activity from the same user, email domain or IP
+        if self.velocity_limiter is not None:
+            burst_sources = self.velocity_limiter.exceeded(self.velocity_limiter.keys_for(campaign_data))
+            if burst_sources:
+                fraud_score += 0.3
+                indicate(
+                    'activity_burst',
+                    f"Burst of recent activity from same {', '.join(source.replace('_', ' ') for source in burst_sources)}"
+                )
+        
+        # Check for clusters of campaigns sharing phone numbers, addresses, accounts or IDs
+        fraud_ring = None
+        campaign_id = campaign_data.get('id')
+        if self.fraud_ring_graph is not None and campaign_id:
+            self._link_campaign_identifiers(campaign_id, campaign_identifiers(campaign_data))
+            fraud_ring = self.fraud_ring_graph.cluster(str(campaign_id))
+            linked_campaigns = fraud_ring['cluster_size'] - 1
+            if linked_campaigns >= thresholds.large_ring_links:
+                fraud_score += 0.5
+            elif linked_campaigns >= 1:
+                fraud_score += 0.3
+            if linked_campaigns >= 1:
+                indicate(
+                    'shared_identifiers',
+                    f"Shares {', '.join(kind.replace('_', ' ') for kind in fraud_ring['linked_by'])} "
+                    f"with {linked_campaigns} other campaign(s)"
+                )
+        
+        # Server-maintained features take precedence over client-supplied history
+        user_id = campaign_data.get('user_id')
+        if self.feature_store is not None and user_id:
+            counted = self._record_campaign_owner(campaign_data)
+            features = self.feature_store.get_features(str(user_id))
+            user_history = {
+                'previous_campaigns': features['campaigns_created'] - (1 if counted else 0),
+                'rejections': features['rejections'],
+                'documents_reused': features['documents_reused'],
+                'campaigns_last_24h': features['campaigns_last_24h']
+            }
         
         # Check user history if available
         if user_history:
             previous_campaigns = user_history.get('previous_campaigns', 0)
-            if previous_campaigns > 3:
+            if previous_campaigns > thresholds.max_previous_campaigns:
                 fraud_score += 0.3
-                detected_indicators.append("Multiple previous campaigns from same user")
+                indicate('multiple_previous_campaigns', "Multiple previous campaigns from same user")
+            
+            if user_history.get('campaigns_last_24h', 0) > thresholds.max_campaigns_last_24h:
+                fraud_score += 0.3
+                indicate('campaign_burst_24h', "Many campaigns created by same user in the last 24 hours")
+            
+            if user_history.get('rejections', 0) > 0:
+                fraud_score += 0.3
+                indicate('previous_rejections', "Previous campaigns from same user were rejected")
+            
+            if user_history.get('documents_reused', 0) > 0:
+                fraud_score += 0.4
+                indicate('reused_documents', "Same user submitted documents reused across campaigns")
         
         # Determine risk level
-        if fraud_score >= 0.7:
+        if fraud_score >= thresholds.high_risk_score:
             risk_level = "HIGH"
-        elif fraud_score >= 0.4:
+        elif fraud_score >= thresholds.medium_risk_score:
             risk_level = "MEDIUM"
         else:
             risk_level = "LOW"
@@ -540,6 +943,9 @@ class VerificationAI:
             'fraud_score': fraud_score,
             'risk_level': risk_level,
             'detected_indicators': detected_indicators,
+            'indicator_codes': indicator_codes,
+            'duplicate_matches': duplicate_matches,
+            'fraud_ring': fraud_ring,
             'recommendation': self._get_fraud_recommendation(risk_level)
         }
 
@@ -0,0 +1,624 @@
+"""
+Verification Rule Engine for SaveLife.com
+
+This module evaluates document verification checks defined as data:
+- Rules per document type: a pattern or keyword list, an extracted field,
+  a confidence weight and an optional flag
+- Rules compiled into one evaluation plan per document type, with the
+  keywords of all rules deduplicated and looked up once per document
+- Per-rule evaluation counts, hit counts and cumulative time
+- Hot-swapping of rule sets without a restart
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Bump whenever rule evaluation semantics change so cached analyses are invalidated
+ENGINE_VERSION = "1"
+
+# Rules for document types without their own entry
+GENERIC_RULES_KEY = 'generic'
+
+# Characters of each chunk re-scanned with the next one when streaming
+DEFAULT_OVERLAP = 4096
+
+# Characters of context kept before the re-scanned overlap for lookbehind assertions
+LOOKBEHIND_CONTEXT = 64
+
+AMOUNT_PATTERN = r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
+
+# An ID, license or policy number: letters, digits and dashes with at least one digit
+IDENTIFIER_PATTERN = r'([a-z0-9\-]*\d[a-z0-9\-]*)'
+
+# A person's name on the rest of the line, unless the value is itself another label
+NAME_PATTERN = r"[ \t]*(?!(?:name|id)\b)([a-z][a-z .'\-]+)"
+
+DEFAULT_RULES: Dict[str, List[Dict[str, Any]]] = {
+    'medical_record': [
+        {'id': 'patient_name', 'type': 'regex', 'field': 'patient_name',
+         # "Patient: Jane Doe" and "Patient Name: Jane Doe", but not "Patient ID: 123"
+         'patterns': [rf'\bpatient(?:[ \t]+name)?[ \t]*:{NAME_PATTERN}']},
+        {'id': 'dates', 'type': 'regex_all', 'field': 'dates', 'source': 'raw', 'limit': 5,
+         # The lookbehind only skips starts inside a word, which leftmost matching never reports
+         'patterns': [r'\d{1,2}/\d{1,2}/\d{4}', r'\d{4}-\d{2}-\d{2}', r'(?<![a-zA-Z])[a-zA-Z]+ \d{1,2}, \d{4}']},
+        {'id': 'medical_condition', 'type': 'regex', 'field': 'medical_condition',
+         'patterns': [rf'{keyword}:?\s*([a-zA-Z\s,]+)'
+                      for keyword in ('diagnosis', 'condition', 'disease', 'disorder', 'syndrome')]},
+        {'id': 'medical_institution', 'type': 'keyword', 'field': 'medical_institution', 'weight': 0.2,
+         'keywords': ['mayo clinic', 'cleveland clinic', 'johns hopkins', 'md anderson',
+                      'memorial sloan kettering', 'massachusetts general', 'cedars-sinai',
+                      'ucla medical center', 'stanford hospital', "brigham and women's"]},
+        {'id': 'medical_specialty', 'type': 'keyword', 'field': 'medical_specialty', 'weight': 0.1,
+         'keywords': ['oncology', 'cardiology', 'neurology', 'orthopedics', 'pediatrics',
+                      'emergency medicine', 'internal medicine', 'surgery', 'radiology',
+                      'pathology', 'anesthesiology', 'psychiatry', 'dermatology']},
+        {'id': 'required_elements', 'type': 'keyword_count', 'min_count': 3, 'weight': 1.0, 'proportional': True,
+         'flag': 'Missing required medical record elements',
+         'keywords': ['patient', 'date', 'doctor', 'physician', 'md', 'diagnosis']},
+        {'id': 'unverified_copy', 'type': 'keyword', 'keywords': ['copy'], 'unless': ['original'],
+         'flag': 'Document appears to be a copy without original verification'}
+    ],
+    'insurance_document': [
+        {'id': 'insurance_provider', 'type': 'keyword', 'field': 'insurance_provider', 'weight': 0.3,
+         'keywords': ['aetna', 'anthem', 'blue cross', 'cigna', 'humana', 'kaiser',
+                      'united healthcare', 'medicare', 'medicaid', 'tricare']},
+        {'id': 'policy_number', 'type': 'regex', 'field': 'policy_number', 'weight': 0.2,
+         # Like ID numbers, so prose such as "your policy does not cover" is not read as one
+         'patterns': [rf'\bpolicy\s*(?:number|no\.?|#)\s*:?\s*{IDENTIFIER_PATTERN}']},
+        {'id': 'coverage', 'type': 'keyword', 'weight': 0.1,
+         'keywords': ['coverage', 'benefit', 'deductible', 'copay', 'coinsurance']},
+        {'id': 'claim_status', 'type': 'keyword', 'field': 'claim_status',
+         'keywords': ['denied', 'rejection', 'approved', 'covered'],
+         'values': {'denied': 'denied', 'rejection': 'denied', 'approved': 'approved', 'covered': 'approved'}},
+        {'id': 'required_elements', 'type': 'keyword_count', 'min_count': 2,
+         'flag': 'Missing required insurance document elements',
+         'keywords': ['policy', 'member', 'coverage', 'effective', 'provider']}
+    ],
+    'identity_document': [
+        {'id': 'name', 'type': 'regex', 'field': 'name', 'weight': 0.3,
+         'patterns': [rf'\b(?:full[ \t]+)?name[ \t]*:{NAME_PATTERN}']},
+        {'id': 'id_number', 'type': 'regex', 'field': 'id_number', 'weight': 0.2,
+         # Anchored labels and at least one digit, so words such as "valid until" are not read
+         # as an ID; the value links campaigns into fraud rings and checks them for reuse
+         'patterns': [rf'\bid\s*(?:(?:number|no\.?|#)\s*:?|:)\s*{IDENTIFIER_PATTERN}',
+                      rf'\blicense\s*(?:(?:number|no\.?|#)\s*:?|:)\s*{IDENTIFIER_PATTERN}',
+                      r'\bssn\s*:?\s*(\d{3}-?\d{2}-?\d{4})\b']},
+        {'id': 'address', 'type': 'regex', 'field': 'address', 'weight': 0.2,
+         'patterns': [r'address:?\s*([a-zA-Z0-9\s,]+)']},
+        {'id': 'government_issuer', 'type': 'keyword', 'weight': 0.2,
+         'keywords': ['department of motor vehicles', 'dmv', 'state of', 'government', 'official']}
+    ],
+    'medical_bill': [
+        {'id': 'amounts', 'type': 'regex_all', 'field': 'amounts', 'source': 'raw', 'limit': 5, 'weight': 0.3,
+         'patterns': [rf'\$\s*{AMOUNT_PATTERN}', rf'total:?\s*\$?\s*{AMOUNT_PATTERN}',
+                      rf'amount due:?\s*\$?\s*{AMOUNT_PATTERN}']},
+        {'id': 'procedure', 'type': 'keyword', 'weight': 0.1,
+         'keywords': ['procedure', 'treatment', 'service', 'consultation', 'surgery', 'therapy']},
+        {'id': 'service_date', 'type': 'regex', 'field': 'service_date', 'weight': 0.2,
+         'patterns': [r'date of service:?\s*(\d{1,2}/\d{1,2}/\d{4})']},
+        {'id': 'required_elements', 'type': 'keyword_count', 'min_count': 3,
+         'flag': 'Missing required medical billing elements',
+         'keywords': ['patient', 'provider', 'service', 'amount', 'insurance', 'balance']}
+    ],
+    'treatment_plan': [
+        {'id': 'treatment_details', 'type': 'keyword_count', 'min_count': 2, 'weight': 0.3,
+         'keywords': ['treatment', 'therapy', 'medication', 'surgery', 'procedure', 'plan']},
+        {'id': 'timeline', 'type': 'keyword', 'weight': 0.1,
+         'keywords': ['weeks', 'months', 'sessions', 'appointments', 'schedule']},
+        {'id': 'medical_professional', 'type': 'keyword', 'weight': 0.2,
+         'keywords': ['doctor', 'physician', 'md', 'specialist', 'oncologist', 'surgeon']}
+    ],
+    GENERIC_RULES_KEY: [
+        {'id': 'word_count', 'type': 'word_count', 'field': 'word_count', 'min_count': 51, 'weight': 0.2},
+        {'id': 'digits', 'type': 'regex', 'source': 'raw', 'weight': 0.1, 'patterns': [r'\d']},
+        {'id': 'date', 'type': 'regex', 'source': 'raw', 'weight': 0.1, 'patterns': [r'\d{1,2}/\d{1,2}/\d{4}']}
+    ]
+}
+
+
+class RuleOutcome:
+    """Findings accumulated while evaluating a plan against one document"""
+
+    __slots__ = ('extracted_data', 'confidence', 'flags')
+
+    def __init__(self):
+        self.extracted_data: Dict[str, Any] = {}
+        self.confidence = 0.0
+        self.flags: List[str] = []
+
+    def apply(self, rule: 'CompiledRule', value: Any = None):
+        if rule.field and value is not None:
+            self.extracted_data[rule.field] = value
+        self.confidence += rule.weight
+        if rule.flag:
+            self.flags.append(rule.flag)
+
+
+class TextWindow:
+    """
+    A window over a document being scanned in chunks.
+
+    The window is the unscanned chunk preceded by a carried tail of the previous
+    window, so matches spanning a chunk boundary are still found.
+    """
+
+    __slots__ = ('text', 'offset', 'new_from', 'final')
+
+    def __init__(self, text: str, offset: int, new_from: int, final: bool):
+        self.text = text
+        self.offset = offset      # Absolute position of text[0] in the document
+        self.new_from = new_from  # Start of the part not seen in an earlier window
+        self.final = final        # No more text follows
+
+
+class CompiledRule:
+    """A validated rule ready for evaluation"""
+
+    keywords: Tuple[str, ...] = ()
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.rule_id = spec['id']
+        self.field = spec.get('field')
+        self.weight = float(spec.get('weight', 0.0))
+        self.flag = spec.get('flag')
+        self.raw = spec.get('source', 'lower') == 'raw'
+
+    def new_state(self) -> Any:
+        """Per-document scan state"""
+        return None
+
+    def scan(self, state: Any, window: TextWindow, overlap: int) -> Any:
+        """Scan one window of the document; returns the updated state"""
+        return state
+
+    def merge(self, state: Any, following: Any) -> Any:
+        """Combine the state of a scanned part with that of the part following it"""
+        return state
+
+    def finish(self, state: Any, present: Set[str], outcome: RuleOutcome) -> bool:
+        """Apply the rule to the outcome; returns True if it matched"""
+        raise NotImplementedError
+
+
+class RegexRule(CompiledRule):
+    """First pattern, in declaration order, that matches anywhere in the text"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.patterns = _compile_patterns(spec['patterns'])
+
+    def new_state(self):
+        # Per pattern: [value of its first match or None, absolute position scanned up to]
+        return [[None, 0] for _ in self.patterns]
+
+    def scan(self, state, window, overlap):
+        for pattern, pattern_state in zip(self.patterns, state):
+            if pattern_state[0] is not None:
+                break  # Later patterns can no longer take precedence
+
+            match, pattern_state[1] = _search(pattern, window, pattern_state[1], overlap)
+            if match:
+                pattern_state[0] = _match_value(match).strip()
+        return state
+
+    def merge(self, state, following):
+        # Each pattern keeps its earliest match
+        return [
+            pattern_state if pattern_state[0] is not None else following_state
+            for pattern_state, following_state in zip(state, following)
+        ]
+
+    def finish(self, state, present, outcome):
+        for value, _ in state:
+            if value is not None:
+                outcome.apply(self, value)
+                return True
+        return False
+
+
+class RegexAllRule(CompiledRule):
+    """Every match of every pattern, in pattern order, up to a limit"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.patterns = _compile_patterns(spec['patterns'])
+        self.limit = int(spec.get('limit', 5))
+
+    def new_state(self):
+        # Per pattern: [values matched so far, absolute position scanned up to]
+        return [[[], 0] for _ in self.patterns]
+
+    def scan(self, state, window, overlap):
+        text = window.text
+        end = len(text)
+        for pattern, pattern_state in zip(self.patterns, state):
+            values = pattern_state[0]
+            if len(values) >= self.limit:
+                break  # Later patterns can no longer contribute
+
+            scanned = pattern_state[1]
+            deferred = False
+            for match in pattern.finditer(text, max(0, scanned - window.offset)):
+                if _may_change(match, window, overlap):
+                    scanned = window.offset + match.start()
+                    deferred = True
+                    break
+                values.append(_match_value(match))
+                scanned = window.offset + match.end()
+                if len(values) >= self.limit:
+                    break
+
+            if not deferred:
+                scanned = max(scanned, window.offset + _settled_end(window, overlap))
+            pattern_state[1] = scanned
+        return state
+
+    def merge(self, state, following):
+        return [
+            [(values + following_values)[:self.limit], scanned]
+            for (values, scanned), (following_values, _) in zip(state, following)
+        ]
+
+    def finish(self, state, present, outcome):
+        values = [value for pattern_values, _ in state for value in pattern_values][:self.limit]
+        if values:
+            outcome.apply(self, values)
+        return bool(values)
+
+
+class KeywordRule(CompiledRule):
+    """First keyword, in declaration order, present in the text and not excluded"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.candidates = tuple(spec['keywords'])
+        self.unless = tuple(spec.get('unless', ()))
+        self.values = spec.get('values', {})
+        self.keywords = self.candidates + self.unless
+
+    def finish(self, state, present, outcome):
+        if any(keyword in present for keyword in self.unless):
+            return False
+        for keyword in self.candidates:
+            if keyword in present:
+                outcome.apply(self, self.values.get(keyword, keyword))
+                return True
+        return False
+
+
+class KeywordCountRule(CompiledRule):
+    """Number of keywords present, compared with a minimum"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.keywords = tuple(spec['keywords'])
+        self.min_count = int(spec.get('min_count', 1))
+        # Proportional rules add weight * fraction present; the flag is raised below the minimum
+        self.proportional = bool(spec.get('proportional', False))
+
+    def finish(self, state, present, outcome):
+        count = sum(1 for keyword in self.keywords if keyword in present)
+        if self.proportional:
+            outcome.confidence += self.weight * count / len(self.keywords)
+
+        if count >= self.min_count:
+            if not self.proportional:
+                outcome.confidence += self.weight
+            return True
+
+        if self.flag:
+            outcome.flags.append(self.flag)
+        return False
+
+
+class WordCountRule(CompiledRule):
+    """Whitespace separated word count, compared with a minimum"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.min_count = int(spec.get('min_count', 1))
+        self.raw = True
+
+    def new_state(self):
+        # [words counted, whether the text seen so far ends inside a word]
+        return [0, False]
+
+    def scan(self, state, window, overlap):
+        new_text = window.text[window.new_from:]
+        if new_text:
+            state[0] += len(new_text.split())
+            # A word split across chunks was counted twice
+            if state[1] and not new_text[0].isspace():
+                state[0] -= 1
+            state[1] = not new_text[-1].isspace()
+        return state
+
+    def merge(self, state, following):
+        # Parts are separate pages or sections, so no word spans the boundary
+        return [state[0] + following[0], following[1]]
+
+    def finish(self, state, present, outcome):
+        count = state[0]
+        if self.field:
+            outcome.extracted_data[self.field] = count
+        if count >= self.min_count:
+            outcome.confidence += self.weight
+            return True
+        return False
+
+
+RULE_TYPES = {
+    'regex': RegexRule,
+    'regex_all': RegexAllRule,
+    'keyword': KeywordRule,
+    'keyword_count': KeywordCountRule,
+    'word_count': WordCountRule
+}
+
+
+class RulePlan:
+    """Compiled rules for one document type sharing one keyword lookup"""
+
+    # Timing key for the shared keyword pass
+    KEYWORD_SCAN = 'keyword_scan'
+
+    def __init__(self, document_type: str, specs: List[Dict[str, Any]], max_confidence: float = 1.0):
+        self.document_type = document_type
+        self.max_confidence = max_confidence
+        self.rules: List[CompiledRule] = []
+
+        seen = set()
+        for spec in specs:
+            rule_id = spec.get('id')
+            rule_class = RULE_TYPES.get(spec.get('type'))
+            if not rule_id or rule_id in seen:
+                raise ValueError(f"Rules for {document_type} need unique ids, got {rule_id!r}")
+            if rule_class is None:
+                raise ValueError(f"Unknown rule type {spec.get('type')!r} for {document_type}.{rule_id}")
+            try:
+                self.rules.append(rule_class(spec))
+            except (KeyError, TypeError, ValueError, re.error) as exc:
+                raise ValueError(f"Invalid rule {document_type}.{rule_id}: {exc}") from exc
+            seen.add(rule_id)
+
+        self.keywords = tuple(dict.fromkeys(keyword for rule in self.rules for keyword in rule.keywords))
+        self.max_keyword_length = max((len(keyword) for keyword in self.keywords), default=0)
+
+        # rule id -> [evaluations, hits, seconds]
+        self.stats: Dict[str, List[float]] = {rule.rule_id: [0, 0, 0.0] for rule in self.rules}
+        self.stats[self.KEYWORD_SCAN] = [0, 0, 0.0]
+
+
+class RuleScan:
+    """
+    Incremental evaluation of a plan over a document fed in chunks.
+
+    Only the current chunk and a bounded tail of the previous one are held, so
+    memory stays flat however large the document is. Matches longer than the
+    overlap that also cross a chunk boundary are cut at the boundary.
+
+    Parts of a document scanned separately, such as pages, can be merged in
+    document order; matches spanning two parts are not found.
+    """
+
+    def __init__(self, engine: 'VerificationRuleEngine', plan: RulePlan, overlap: int):
+        self.engine = engine
+        self.plan = plan
+        self.overlap = max(overlap, plan.max_keyword_length)
+        # Extra carried context so lookbehinds at the start of a window see real text
+        self._carry = self.overlap + LOOKBEHIND_CONTEXT
+
+        self._states = [rule.new_state() for rule in plan.rules]
+        self._seconds = [0.0] * len(plan.rules)
+        self._scan_seconds = 0.0
+        self._present: Set[str] = set()
+        self._raw_tail = ''
+        self._lower_tail = ''
+        self._raw_offset = 0
+        self._lower_offset = 0
+        self._finished = False
+
+    def feed(self, text: str, final: bool = False):
+        """Scan the next chunk of the document; final marks the last chunk"""
+        if self._finished:
+            raise ValueError("Scan already finished")
+
+        raw = self._raw_tail + text
+        lower = self._lower_tail + text.lower()
+        raw_window = TextWindow(raw, self._raw_offset, len(self._raw_tail), final)
+        lower_window = TextWindow(lower, self._lower_offset, len(self._lower_tail), final)
+
+        started = time.perf_counter()
+        missing = [keyword for keyword in self.plan.keywords if keyword not in self._present]
+        self._present.update(keyword for keyword in missing if keyword in lower)
+        self._scan_seconds += time.perf_counter() - started
+
+        for index, rule in enumerate(self.plan.rules):
+            started = time.perf_counter()
+            window = raw_window if rule.raw else lower_window
+            self._states[index] = rule.scan(self._states[index], window, self.overlap)
+            self._seconds[index] += time.perf_counter() - started
+
+        self._finished = final
+        if not final:
+            self._raw_tail, self._raw_offset = _carry_tail(raw, self._raw_offset, self._carry)
+            self._lower_tail, self._lower_offset = _carry_tail(lower, self._lower_offset, self._carry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Picklable state of a finished scan, for merging scans of separate parts"""
+        if not self._finished:
+            self.feed('', final=True)
+        return {
+            'states': self._states,
+            'present': sorted(self._present),
+            'seconds': self._seconds,
+            'scan_seconds': self._scan_seconds
+        }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Append a scanned part that follows everything scanned so far"""
+        if not self._finished:
+            self.feed('', final=True)
+
+        self._present.update(snapshot['present'])
+        self._scan_seconds += snapshot['scan_seconds']
+        for index, rule in enumerate(self.plan.rules):
+            self._states[index] = rule.merge(self._states[index], snapshot['states'][index])
+            self._seconds[index] += snapshot['seconds'][index]
+
+    def finish(self, record_stats: bool = True) -> RuleOutcome:
+        """Settle matches waiting on more text and apply every rule"""
+        if not self._finished:
+            self.feed('', final=True)
+
+        outcome = RuleOutcome()
+        timings = [(RulePlan.KEYWORD_SCAN, bool(self._present), self._scan_seconds)]
+        for index, rule in enumerate(self.plan.rules):
+            started = time.perf_counter()
+            hit = rule.finish(self._states[index], self._present, outcome)
+            timings.append((rule.rule_id, hit, self._seconds[index] + time.perf_counter() - started))
+
+        outcome.confidence = min(self.plan.max_confidence, outcome.confidence)
+        if record_stats:
+            self.engine.record_timings(self.plan, timings)
+        return outcome
+
+
+class VerificationRuleEngine:
+    """Hot-swappable compiled verification rules with per-rule statistics"""
+
+    def __init__(self, rules: Optional[Dict[str, List[Dict[str, Any]]]] = None, rules_path: Optional[str] = None):
+        self.rules_path = rules_path
+        self._lock = threading.Lock()
+
+        if rules is None and rules_path and os.path.exists(rules_path):
+            with open(rules_path, encoding='utf-8') as rules_file:
+                rules = json.load(rules_file)
+        self.load(rules if rules is not None else DEFAULT_RULES)
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    @property
+    def rules(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._rules
+
+    def load(self, rules: Dict[str, List[Dict[str, Any]]], persist: bool = False):
+        """Compile a rule set and swap it in; the running rules stay active if compilation fails"""
+        if not isinstance(rules, dict) or GENERIC_RULES_KEY not in rules:
+            raise ValueError(f"Rule set must be an object with a '{GENERIC_RULES_KEY}' entry")
+
+        plans = {document_type: RulePlan(document_type, specs) for document_type, specs in rules.items()}
+        serialized = json.dumps({'engine': ENGINE_VERSION, 'rules': rules}, sort_keys=True)
+        version = hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+        if persist and self.rules_path:
+            self._write_rules(rules)
+
+        # Plans are replaced by reference, so swapping them is atomic
+        with self._lock:
+            self._plans = plans
+            self._rules = rules
+            self._version = version
+            self.loaded_at = time.time()
+
+    def reload(self):
+        """Re-read the rules file, if one is configured"""
+        if not self.rules_path or not os.path.exists(self.rules_path):
+            raise ValueError("No rules file to reload from")
+        with open(self.rules_path, encoding='utf-8') as rules_file:
+            self.load(json.load(rules_file))
+
+    def evaluate(self, document_type: str, text: str, record_stats: bool = True) -> RuleOutcome:
+        """Evaluate the rules for a document type against text"""
+        scan = self.scan(document_type)
+        scan.feed(text, final=True)
+        return scan.finish(record_stats)
+
+    def scan(self, document_type: str, overlap: int = DEFAULT_OVERLAP) -> RuleScan:
+        """Start evaluating the rules for a document type against text fed in chunks"""
+        # Readers take one reference to the plans, so a scan never mixes two rule sets
+        plans = self._plans
+        return RuleScan(self, plans.get(document_type) or plans[GENERIC_RULES_KEY], overlap)
+
+    def record_timings(self, plan: RulePlan, timings: List[Tuple[str, bool, float]]):
+        with self._lock:
+            for rule_id, hit, seconds in timings:
+                counters = plan.stats[rule_id]
+                counters[0] += 1
+                counters[1] += hit
+                counters[2] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-rule evaluation counts, hits and time since the rules were loaded"""
+        with self._lock:
+            rules = [
+                {
+                    'document_type': plan.document_type,
+                    'rule_id': rule_id,
+                    'evaluations': int(evaluations),
+                    'hits': int(hits),
+                    'total_ms': round(seconds * 1000, 3),
+                    'avg_us': round(seconds / evaluations * 1e6, 2) if evaluations else 0.0
+                }
+                for plan in self._plans.values()
+                for rule_id, (evaluations, hits, seconds) in plan.stats.items()
+            ]
+
+        rules.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return {'version': self._version, 'loaded_at': self.loaded_at, 'rules': rules}
+
+    def _write_rules(self, rules: Dict[str, List[Dict[str, Any]]]):
+        directory = os.path.dirname(self.rules_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.rules_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as rules_file:
+            json.dump(rules, rules_file, indent=2)
+        os.replace(temp_path, self.rules_path)
+
+
+def _compile_patterns(patterns: List[str]) -> List['re.Pattern']:
+    compiled = [re.compile(pattern) for pattern in patterns]
+    for pattern in compiled:
+        # Empty matches would be reported again in every window
+        if pattern.fullmatch(''):
+            raise ValueError(f"Pattern {pattern.pattern!r} matches empty text")
+    return compiled
+
+
+def _match_value(match: 're.Match') -> str:
+    return match.group(1) if match.re.groups else match.group(0)
+
+
+def _settled_end(window: TextWindow, overlap: int) -> int:
+    """Window position before which no match can still be affected by later text"""
+    return len(window.text) if window.final else max(0, len(window.text) - overlap)
+
+
+def _may_change(match: 're.Match', window: TextWindow, overlap: int) -> bool:
+    """Whether a match starts close enough to the window end that later text could change it"""
+    return not window.final and match.start() >= len(window.text) - overlap
+
+
+def _search(pattern: 're.Pattern', window: TextWindow, scanned: int, overlap: int) -> Tuple[Optional['re.Match'], int]:
+    """Search a window from an absolute position; returns (settled match, new scanned position)"""
+    match = pattern.search(window.text, max(0, scanned - window.offset))
+    if match is None:
+        return None, max(scanned, window.offset + _settled_end(window, overlap))
+    if _may_change(match, window, overlap):
+        return None, window.offset + match.start()
+    return match, window.offset + match.end()
+
+
+def _carry_tail(text: str, offset: int, carry: int) -> Tuple[str, int]:
+    """Tail of a window kept for the next one, with its absolute offset"""
+    if len(text) <= carry:
+        return text, offset
+    return text[-carry:], offset + len(text) - carry
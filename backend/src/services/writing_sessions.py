@@ -0,0 +1,352 @@
+"""
+Writing Session Service for SaveLife.com
+
+This module keeps live-editing state on the server for writing assistance:
+- Session text held as sentence segments, split after . ! or ? and whitespace
+- Word, first-person 'I' and feedback keyword counts kept per segment and in total,
+  from the same TextStats used for stateless writing assistance
+- Text deltas re-tokenize only the segments around the edited region
+- Feedback subscribers wait for edits with debouncing, so bursts of keystrokes
+  are coalesced into one evaluation of the latest text
+- Session text and version kept in SQLite, so every worker process on the
+  host serves every session; each process re-parses a session only after
+  another process has edited it
+- Sessions expire after a period of inactivity and are bounded in number
+"""
+
+import os
+import re
+import time
+import bisect
+import uuid
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.campaign_ai import WRITING_KEYWORDS
+from src.services.text_stats import TextStats
+
+# A segment ends after sentence punctuation and the whitespace that follows it.
+# Keywords and words never contain whitespace, so none can span two segments.
+SEGMENT_BOUNDARY = re.compile(r'[.!?]\s+')
+
+# How often a waiting feedback subscriber looks in the store for edits made by other processes
+SYNC_SECONDS = 1.0
+
+
+class TextSegment:
+    """One sentence of session text with its counts"""
+
+    __slots__ = ('text', 'word_count', 'first_person_count', 'keywords', 'is_sentence')
+
+    def __init__(self, text: str):
+        stats = TextStats(text)
+        self.text = text
+        self.word_count = stats.word_count
+        self.first_person_count = stats.pronoun_counts['i']
+        self.keywords = frozenset(stats.keyword_hits(WRITING_KEYWORDS))
+        self.is_sentence = bool(self.word_count)
+
+
+def split_segments(text: str) -> List[TextSegment]:
+    boundaries = [0] + [match.end() for match in SEGMENT_BOUNDARY.finditer(text)]
+    if boundaries[-1] != len(text):
+        boundaries.append(len(text))
+    return [TextSegment(text[start:end]) for start, end in zip(boundaries, boundaries[1:])]
+
+
+class WritingSession:
+    """Text being edited, with running counts updated from deltas"""
+
+    def __init__(self, section: str, text: str = '', medical_condition: str = ''):
+        self.section = section
+        self.medical_condition = medical_condition
+        self.segments: List[TextSegment] = []
+        self._ends: List[int] = []  # end offset of each segment
+        self._cursor = 0  # segment of the last edit, where the next one usually lands
+        self.length = 0
+        self.word_count = 0
+        self.first_person_count = 0
+        self.sentence_count = 0
+        self.keyword_counts: Counter = Counter()  # keyword -> segments containing it
+        self.version = 0
+        self.edited_at = time.monotonic()
+        self.closed = False
+        self.lock = threading.Lock()
+        # Notified, with the lock held, after edits are applied and when the session closes
+        self.changed = threading.Condition(self.lock)
+        self._replace_segments(0, 0, split_segments(text or ''))
+
+    @property
+    def text(self) -> str:
+        return ''.join(segment.text for segment in self.segments)
+
+    @property
+    def keywords(self) -> set:
+        return {keyword for keyword, count in self.keyword_counts.items() if count}
+
+    def apply_edit(self, start: int, end: int, text: str):
+        """Replace characters [start, end) of the session text with text"""
+        if not (isinstance(start, int) and isinstance(end, int) and 0 <= start <= end <= self.length):
+            raise ValueError(f'Edit range [{start}, {end}) is outside the text (length {self.length})')
+        if not isinstance(text, str):
+            raise ValueError('Edit text must be a string')
+
+        # Re-split from the segment before the edit to the segment after it: their outer
+        # boundaries are unaffected by the edit, while the boundaries in between may move
+        first = max(self._locate(start) - 1, 0)
+        last = min(self._locate(end) + 1, len(self.segments) - 1)
+        first_offset = self._ends[first - 1] if first else 0
+
+        old_text = ''.join(segment.text for segment in self.segments[first:last + 1])
+        new_text = old_text[:start - first_offset] + text + old_text[end - first_offset:]
+        self._replace_segments(first, last + 1, split_segments(new_text))
+        self._cursor = first
+        self.version += 1
+        self.edited_at = time.monotonic()
+
+    def load(self, text: str, version: int):
+        """Replace the whole text with a version edited elsewhere; the caller holds the lock"""
+        self._replace_segments(0, len(self.segments), split_segments(text))
+        self._cursor = 0
+        self.version = version
+        self.edited_at = time.monotonic()
+
+    def wait_for_edits(self, seen_version: int, debounce: float, max_delay: float,
+                       timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Wait until the text moves past seen_version and then stays unedited for
+        debounce seconds, or max_delay seconds pass while edits keep arriving.
+
+        Returns the version to evaluate, or None on timeout or when the session closes.
+        Must be called without holding the lock.
+        """
+        with self.changed:
+            if not self.changed.wait_for(lambda: self.version != seen_version or self.closed, timeout):
+                return None
+            first_change = time.monotonic()
+            while not self.closed:
+                now = time.monotonic()
+                remaining = min(debounce - (now - self.edited_at), max_delay - (now - first_change))
+                if remaining <= 0:
+                    return self.version
+                self.changed.wait(remaining)
+            return None
+
+    def feedback_counts(self) -> Dict[str, Any]:
+        return {
+            'word_count': self.word_count,
+            'first_person_count': self.first_person_count,
+            'keywords': self.keywords
+        }
+
+    def _locate(self, position: int) -> int:
+        """Index of the segment containing position (the last one at the end of the text)"""
+        ends = self._ends
+        for index in (self._cursor, self._cursor + 1):
+            if index < len(ends) and (ends[index - 1] if index else 0) <= position < ends[index]:
+                return index
+        return min(bisect.bisect_right(ends, position), len(ends) - 1)
+
+    def _replace_segments(self, first: int, stop: int, new_segments: List[TextSegment]):
+        for sign, segments in ((-1, self.segments[first:stop]), (1, new_segments)):
+            for segment in segments:
+                self.length += sign * len(segment.text)
+                self.word_count += sign * segment.word_count
+                self.first_person_count += sign * segment.first_person_count
+                self.sentence_count += sign * segment.is_sentence
+                for keyword in segment.keywords:
+                    self.keyword_counts[keyword] += sign
+        # Only the end offsets from the edit onwards change, by the same amount after it
+        offset = self._ends[first - 1] if first else 0
+        old_end = self._ends[stop - 1] if stop > first else offset
+        new_ends = list(accumulate((len(segment.text) for segment in new_segments), initial=offset))[1:]
+        shift = (new_ends[-1] if new_ends else offset) - old_end
+        tail = self._ends[stop:]
+        self.segments[first:stop] = new_segments
+        self._ends[first:] = new_ends + ([end + shift for end in tail] if shift else tail)
+
+
+class EditRejected(ValueError):
+    """An edit that could not be applied; the edits before it stay applied"""
+
+    def __init__(self, message: str, version: int):
+        super().__init__(message)
+        self.version = version
+
+
+class WritingSessionStore:
+    """
+    Writing sessions by id, expiring after idle_seconds.
+
+    Without db_path the sessions only live in this process. With one, every
+    process using the same file shares them, which covers the worker processes
+    of one host; several hosts need sticky routing by session id.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_sessions: int = 10000, idle_seconds: float = 1800):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        # Parsed sessions this process has served, least recently used first
+        self._sessions: "OrderedDict[str, WritingSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS writing_sessions (
+                session_id TEXT PRIMARY KEY,
+                section TEXT NOT NULL,
+                medical_condition TEXT NOT NULL,
+                text TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                active_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_writing_sessions_active_at
+                ON writing_sessions (active_at);
+        """)
+        self._conn.commit()
+
+    def create(self, section: str, text: str = '', medical_condition: str = '') -> Tuple[str, WritingSession]:
+        session = WritingSession(section, text, medical_condition)
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute('DELETE FROM writing_sessions WHERE active_at <= ?', (now - self.idle_seconds,))
+            self._conn.execute(
+                'INSERT INTO writing_sessions (session_id, section, medical_condition, text, version, active_at) '
+                'VALUES (?, ?, ?, ?, 0, ?)',
+                (session_id, section, medical_condition, session.text, now)
+            )
+            self._conn.execute(
+                'DELETE FROM writing_sessions WHERE session_id IN ('
+                'SELECT session_id FROM writing_sessions ORDER BY active_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_sessions,)
+            )
+            self._conn.commit()
+            self._remember(session_id, session)
+        return session_id, session
+
+    def get(self, session_id: str, touch: bool = True) -> Optional[WritingSession]:
+        """
+        The session with any edits made by other processes applied, or None if
+        it is unknown, closed or expired. touch marks it as active.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._load_row(session_id, now)
+            if row is None:
+                self._conn.commit()
+                return None
+            if touch:
+                self._conn.execute('UPDATE writing_sessions SET active_at = ? WHERE session_id = ?', (now, session_id))
+            self._conn.commit()
+            return self._sync(session_id, row)
+
+    def apply_edits(self, session_id: str, edits: List[Dict[str, Any]]) -> Optional[WritingSession]:
+        """
+        Apply {"start", "end", "text"} edits in order and save the new text.
+
+        Returns None if the session is unknown. Raises EditRejected at the first
+        invalid edit, after saving the ones before it.
+        """
+        now = time.time()
+        rejected = None
+        with self._lock:
+            # Holding the write lock from the read to the save orders edits made by different processes
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._load_row(session_id, now)
+                if row is None:
+                    self._conn.commit()
+                    return None
+                session = self._sync(session_id, row)
+
+                with session.changed:
+                    try:
+                        for edit in edits:
+                            if not isinstance(edit, dict):
+                                raise ValueError('Each edit must be an object')
+                            session.apply_edit(edit.get('start'), edit.get('end'), edit.get('text', ''))
+                    except ValueError as e:
+                        rejected = EditRejected(str(e), session.version)
+                    finally:
+                        session.changed.notify_all()
+                    version, text = session.version, session.text
+
+                self._conn.execute(
+                    'UPDATE writing_sessions SET text = ?, version = ?, active_at = ? WHERE session_id = ?',
+                    (text, version, now, session_id)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        if rejected is not None:
+            raise rejected
+        return session
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM writing_sessions WHERE session_id = ?', (session_id,)).rowcount
+            self._conn.commit()
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._close(session)
+        return bool(deleted)
+
+    def _load_row(self, session_id: str, now: float) -> Optional[Tuple[str, str, str, int]]:
+        """(section, medical_condition, text, version) of a live session; deletes it once expired"""
+        row = self._conn.execute(
+            'SELECT section, medical_condition, text, version, active_at FROM writing_sessions WHERE session_id = ?',
+            (session_id,)
+        ).fetchone()
+        if row is not None and now - row[4] < self.idle_seconds:
+            return row[:4]
+
+        if row is not None:
+            self._conn.execute('DELETE FROM writing_sessions WHERE session_id = ?', (session_id,))
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._close(session)
+        return None
+
+    def _sync(self, session_id: str, row: Tuple[str, str, str, int]) -> WritingSession:
+        """This process's parsed session, re-parsed if another process saved a newer version"""
+        section, medical_condition, text, version = row
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = WritingSession(section, text, medical_condition)
+            session.version = version
+            self._remember(session_id, session)
+            return session
+
+        self._sessions.move_to_end(session_id)
+        if session.version != version:
+            with session.changed:
+                session.load(text, version)
+                session.changed.notify_all()
+        return session
+
+    def _remember(self, session_id: str, session: WritingSession):
+        # Dropping a parsed session does not end it; it is parsed again from the store when needed
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    @staticmethod
+    def _close(session: WritingSession):
+        """Mark a session closed and wake its feedback subscribers"""
+        with session.changed:
+            session.closed = True
+            session.changed.notify_all()
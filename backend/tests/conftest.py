@@ -0,0 +1,14 @@
+"""Shared test configuration for the SaveLife.com backend"""
+
+import os
+import shutil
+import tempfile
+
+# The AI services open their databases when src.main is first imported, so point them
+# at a scratch directory before any test module imports it; nothing is left in src/
+DATA_DIR = tempfile.mkdtemp(prefix='savelife-test-data-')
+os.environ['SAVELIFE_DATA_DIR'] = DATA_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
@@ -6,6 +6,8 @@ verification services, and donor matching functionality. Tests cover both
 successful operations and error handling scenarios.
 """
 
+import io
+import time
 import pytest
 import json
 from datetime import datetime
@@ -16,15 +18,34 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.main import app
+from src.routes.ai_services import verification_ai
+from src.models.user import db
+from src.models.campaign import Campaign, CampaignDocument
 from src.services.campaign_ai import CampaignAI, CampaignSuggestions, StoryAnalysis
 from src.services.verification_ai import VerificationAI, DocumentType, VerificationStatus, DocumentAnalysis
 from src.services.donor_matching_ai import DonorMatchingAI, DonorSegment, MatchingStrategy
+from src.services.decision_log import DecisionLog
+from src.services.near_duplicate import NearDuplicateIndex
+from src.services.document_fingerprints import DocumentFingerprintIndex
+from src.services.fraud_features import FraudFeatureStore
+from src.services.fraud_rings import FraudRingGraph
+from src.services.blocklist import FraudBlocklist
+from src.services.velocity import VelocityLimiter
+from src.services.verification_rules import VerificationRuleEngine
+from src.services.reverification import init_worker, verify_chunk
+from src.services import document_extraction
+from src.services.document_extraction import _extract_pdf_page
+from src.services.writing_sessions import WritingSessionStore
+from src.services.response_cache import ResponseCache
+from src.services.analysis_cache import DocumentAnalysisCache
 
 
 @pytest.fixture
-def client():
+def client(monkeypatch):
     """Create test client for Flask application"""
     app.config['TESTING'] = True
+    # Every test client shares one address, so give each test its own verification velocity budget
+    monkeypatch.setattr(verification_ai, 'velocity_limiter', VelocityLimiter())
     with app.test_client() as client:
         yield client
 
@@ -168,6 +189,39 @@ class TestCampaignAIEndpoints:
             assert isinstance(suggestion, str)
             assert len(suggestion) > 5  # Reasonable minimum length
 
+    def test_title_suggestions_cached(self, client):
+        """Test identical payloads are served from the response cache"""
+        title_data = {'name': 'Cache Test', 'condition': 'leukemia'}
+
+        first = client.post('/api/ai/campaign/title-suggestions', json=title_data)
+        second = client.post('/api/ai/campaign/title-suggestions', json=dict(reversed(list(title_data.items()))))
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        
+        # The cached body is served with the time of the request, not the one that computed it
+        first_data, second_data = first.get_json(), second.get_json()
+        assert second_data['timestamp'] >= first_data['timestamp']
+        assert {**second_data, 'timestamp': None} == {**first_data, 'timestamp': None}
+
+        stats = client.get('/api/ai/cache/stats').get_json()
+        assert stats['endpoints']['/api/ai/campaign/title-suggestions']['hits'] >= 1
+        assert 0 < stats['hit_rate'] <= 1
+
+    def test_response_cache_memory_only_entries(self, tmp_path):
+        """Test that responses kept off disk are not shared with other processes"""
+        first = ResponseCache(db_path=str(tmp_path / 'response_cache.db'))
+        second = ResponseCache(db_path=str(tmp_path / 'response_cache.db'))
+        
+        first.put('shared', 200, b'{}')
+        first.put('private', 200, b'{"patient_name": "jane doe"}', disk=False)
+        
+        assert first.get('/test', 'private', disk=False) == (200, b'{"patient_name": "jane doe"}')
+        assert second.get('/test', 'shared') == (200, b'{}')
+        assert second.get('/test', 'private') is None
+
     def test_goal_recommendation_success(self, client):
         """Test successful goal recommendation"""
         goal_data = {
@@ -196,6 +250,28 @@ class TestCampaignAIEndpoints:
         assert data['recommended_amount'] > 0
         assert 0 <= data['confidence'] <= 1
 
+    def test_record_campaign_outcomes(self, client):
+        """Test recording closed campaigns for goal recommendations"""
+        response = client.post('/api/ai/campaign/outcomes',
+                             json={'outcomes': [{
+                                 'medical_condition': 'Breast cancer requiring chemotherapy',
+                                 'treatment_details': 'Chemotherapy and surgery',
+                                 'insurance_coverage': 'Limited coverage',
+                                 'goal_amount': 80000,
+                                 'raised_amount': 64000
+                             }]},
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['recorded'] == 1
+        assert data['cells'] == [{'condition': 'cancer', 'complexity': 'chemotherapy', 'insurance': 'limited'}]
+        
+        response = client.post('/api/ai/campaign/outcomes',
+                             json={'outcomes': [{'medical_condition': 'cancer', 'goal_amount': -1, 'raised_amount': 0}]},
+                             content_type='application/json')
+        assert response.status_code == 400
+
     def test_story_optimization_success(self, client):
         """Test successful story optimization"""
         story_data = {
@@ -241,6 +317,109 @@ class TestCampaignAIEndpoints:
         assert isinstance(data['assistance'], dict)
 
 
+    def test_campaign_suggestions_batch(self, client, sample_campaign_data):
+        """Test streamed batch campaign suggestions"""
+        records = [
+            dict(sample_campaign_data, id='import_1'),
+            {'id': 'import_2', 'name': 'Tom'},
+            dict(sample_campaign_data, id='import_3', medical_condition='Urgent emergency surgery')
+        ]
+        
+        response = client.post('/api/ai/campaign/suggestions/batch',
+                             json=records,
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        assert [line.get('index') for line in lines[:3]] == [0, 1, 2]
+        assert lines[0]['campaign_id'] == 'import_1'
+        assert lines[0]['title'] == lines[0]['title_suggestions'][0]
+        assert lines[0]['goal_amount'] == lines[0]['goal_recommendation']['recommended_amount']
+        assert lines[1]['error'] == 'Missing required field: medical_condition'
+        assert lines[2]['condition_analysis']['primary_condition'] == 'emergency'
+        assert lines[3]['summary']['processed'] == 2
+
+    def test_writing_session_edits(self, client):
+        """Test incremental writing assistance from text deltas"""
+        response = client.post('/api/ai/campaign/writing-sessions',
+                             json={'text': 'My son needs surgery.', 'section': 'story'},
+                             content_type='application/json')
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        session_id = data['session_id']
+        assert data['word_count'] == 4
+        assert 'Express gratitude to potential donors' in data['assistance']['suggestions']
+        
+        response = client.post(f'/api/ai/campaign/writing-sessions/{session_id}/edits',
+                             json={'edits': [{'start': 21, 'end': 21, 'text': ' Thank you for your help.'}]},
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['version'] == 1
+        assert data['word_count'] == 9
+        assert data['sentence_count'] == 2
+        assert 'Express gratitude to potential donors' not in data['assistance']['suggestions']
+        
+        # Edits outside the text are rejected
+        response = client.post(f'/api/ai/campaign/writing-sessions/{session_id}/edits',
+                             json={'start': 500, 'end': 600, 'text': 'x'},
+                             content_type='application/json')
+        assert response.status_code == 400
+        
+        assert client.delete(f'/api/ai/campaign/writing-sessions/{session_id}').status_code == 200
+        response = client.post(f'/api/ai/campaign/writing-sessions/{session_id}/edits',
+                             json={'start': 0, 'end': 0, 'text': 'x'},
+                             content_type='application/json')
+        assert response.status_code == 404
+
+    def test_writing_session_events(self, client):
+        """Test streaming writing assistance as server-sent events"""
+        response = client.post('/api/ai/campaign/writing-sessions',
+                             json={'text': 'We are grateful for your help.', 'section': 'story'},
+                             content_type='application/json')
+        session_id = response.get_json()['session_id']
+        
+        response = client.get(f'/api/ai/campaign/writing-sessions/{session_id}/events')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        chunks = response.iter_encoded()
+        assert next(chunks).startswith(b'retry:')
+        event = next(chunks).decode('utf-8')
+        assert event.startswith('id: 0\nevent: feedback\n')
+        data = json.loads(event.split('data: ', 1)[1])
+        assert data['word_count'] == 6
+        assert 'story_analysis' in data
+        response.close()
+        
+        # Edits for stream subscribers skip inline feedback
+        response = client.post(f'/api/ai/campaign/writing-sessions/{session_id}/edits',
+                             json={'edits': [{'start': 0, 'end': 2, 'text': 'They'}], 'feedback': False},
+                             content_type='application/json')
+        assert response.status_code == 200
+        assert response.get_json() == {'session_id': session_id, 'version': 1}
+
+    def test_writing_sessions_shared_between_processes(self, tmp_path):
+        """Test editing one writing session through stores of two worker processes"""
+        first = WritingSessionStore(str(tmp_path / 'writing_sessions.db'))
+        second = WritingSessionStore(str(tmp_path / 'writing_sessions.db'))
+        
+        session_id, _ = first.create('story', 'My son needs surgery.')
+        session = second.apply_edits(session_id, [{'start': 21, 'end': 21, 'text': ' Thank you.'}])
+        assert session.version == 1
+        
+        session = first.apply_edits(session_id, [{'start': 0, 'end': 2, 'text': 'Our'}])
+        assert session.text == 'Our son needs surgery. Thank you.'
+        assert session.version == 2
+        assert session.word_count == 6
+        
+        assert second.get(session_id).text == session.text
+        assert second.close(session_id)
+        assert first.get(session_id) is None
+
 class TestVerificationAIEndpoints:
     """Test suite for Verification AI service endpoints"""
 
@@ -285,6 +464,79 @@ class TestVerificationAIEndpoints:
         assert 'error' in data
         assert 'Invalid document type' in data['error']
 
+    def test_document_analysis_id_number(self, client):
+        """Test that ID numbers are only read from labelled values containing a digit"""
+        response = client.post('/api/ai/verification/analyze-document',
+                             json={
+                                 'document_text': 'State identification card\nValid until 2031\nAddress: 12 Elm Street',
+                                 'document_type': 'identity_document'
+                             },
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert 'id_number' not in response.get_json()['extracted_data']
+
+        response = client.post('/api/ai/verification/analyze-document',
+                             json={
+                                 'document_text': 'State identification card\nID Number: AB-12345\nValid until 2031',
+                                 'document_type': 'identity_document'
+                             },
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response.get_json()['extracted_data']['id_number'] == 'ab-12345'
+
+    def test_document_analysis_policy_number(self, client):
+        """Test that policy prose is not read as a policy number or matched across campaigns"""
+        response = client.post('/api/ai/verification/analyze-document',
+                             json={
+                                 'document_text': 'Aetna member benefits\nPolicy Number: XK-2041-77\nEffective 01/01/2024',
+                                 'document_type': 'insurance_document'
+                             },
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response.get_json()['extracted_data']['policy_number'] == 'xk-2041-77'
+
+        for campaign_id, text in (('camp_policy_a', 'Your policy does not cover experimental treatment. '
+                                                     'Member coverage is limited to approved providers.'),
+                                  ('camp_policy_b', 'The policy does not include out of network care. '
+                                                     'Coverage is effective from the first of the month.')):
+            response = client.post('/api/ai/verification/verify-campaign',
+                                 json={
+                                     'campaign_data': {'id': campaign_id},
+                                     'documents': [{'type': 'insurance_document', 'text': text}]
+                                 },
+                                 content_type='application/json')
+
+            assert response.status_code == 200
+            analysis = response.get_json()['document_analyses'][0]
+            assert 'policy_number' not in analysis['extracted_data']
+            assert not any('already submitted' in flag for flag in analysis['flags'])
+
+    def test_document_analysis_patient_name(self, client):
+        """Test reading the patient name from labelled lines only"""
+        response = client.post('/api/ai/verification/analyze-document',
+                             json={
+                                 'document_text': 'MEDICAL RECORD\nPatient Name: Jane Doe\nDate: 03/15/2024',
+                                 'document_type': 'medical_record'
+                             },
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response.get_json()['extracted_data']['patient_name'] == 'jane doe'
+
+        # An ID label is not a name, and the match never runs onto the next line
+        response = client.post('/api/ai/verification/analyze-document',
+                             json={
+                                 'document_text': 'MEDICAL RECORD\nPatient ID: 123\nDiagnosis: Asthma',
+                                 'document_type': 'medical_record'
+                             },
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert 'patient_name' not in response.get_json()['extracted_data']
+
     def test_campaign_verification_success(self, client, sample_document_data):
         """Test successful campaign verification"""
         verification_data = {
@@ -316,6 +568,386 @@ class TestVerificationAIEndpoints:
         assert isinstance(data['document_analyses'], list)
         assert 0 <= data['trust_score'] <= 100
 
+    def test_document_analysis_stream(self, client, sample_document_data):
+        """Test analyzing a document streamed as the raw request body"""
+        response = client.post('/api/ai/verification/analyze-document/stream?document_type=medical_record',
+                             data=sample_document_data['document_text'].encode('utf-8'),
+                             content_type='text/plain')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['extracted_data']['patient_name'].startswith('sarah johnson')
+        assert len(data['text_sha256']) == 64
+        
+        # Streaming and whole-text analysis agree
+        response = client.post('/api/ai/verification/analyze-document',
+                             json=sample_document_data,
+                             content_type='application/json')
+        assert response.get_json()['extracted_data'] == data['extracted_data']
+
+    def test_document_analysis_upload(self, client, sample_document_data):
+        """Test analyzing an uploaded plain-text document page by page"""
+        pages = sample_document_data['document_text'] + '\f' + 'Page two: Mayo Clinic oncology follow-up'
+        
+        response = client.post('/api/ai/verification/analyze-document/upload',
+                             data={
+                                 'document': (io.BytesIO(pages.encode('utf-8')), 'record.txt'),
+                                 'document_type': 'medical_record'
+                             },
+                             content_type='multipart/form-data')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [page['page'] for page in data['pages']] == [1, 2]
+        assert all('latency_ms' in page for page in data['pages'])
+        assert data['extracted_data']['medical_institution'] == 'mayo clinic'
+        
+        # Binary files other than PDFs are rejected
+        response = client.post('/api/ai/verification/analyze-document/upload',
+                             data={'document': (io.BytesIO(b'\x00\x01\x02'), 'image.bin')},
+                             content_type='multipart/form-data')
+        assert response.status_code == 415
+
+    def test_document_analysis_upload_limits(self, client):
+        """Test that oversized uploads and documents with too many pages are rejected"""
+        with patch('src.routes.ai_services.MAX_UPLOAD_BYTES', 1024):
+            response = client.post('/api/ai/verification/analyze-document/upload',
+                                 data={'document': (io.BytesIO(b'x' * 4096), 'record.txt')},
+                                 content_type='multipart/form-data')
+            assert response.status_code == 413
+        
+        response = client.post('/api/ai/verification/analyze-document/upload',
+                             data={'document': (io.BytesIO(b'page\f' * 250), 'record.txt')},
+                             content_type='multipart/form-data')
+        assert response.status_code == 413
+        assert 'at most 200 pages' in response.get_json()['error']
+
+    def test_pdf_reader_cache_keyed_by_file(self):
+        """Test that a reused upload path with new content never reads the previous file's pages"""
+        def open_pdf(path):
+            reader = MagicMock()
+            reader.pages = [MagicMock(**{'extract_text.return_value': f'{path} v{len(opened)}'})]
+            reader.pages *= 2
+            opened.append(path)
+            return reader
+        
+        opened = []
+        with patch('src.services.document_extraction._open_pdf', side_effect=open_pdf):
+            assert _extract_pdf_page(('/tmp/upload.pdf', 1, 100), 0, 2) == '/tmp/upload.pdf v0'
+            # Same path, different file: the cached reader is not reused
+            assert _extract_pdf_page(('/tmp/upload.pdf', 2, 120), 0, 2) == '/tmp/upload.pdf v1'
+            assert _extract_pdf_page(('/tmp/upload.pdf', 2, 120), 1, 2) == '/tmp/upload.pdf v1'
+        
+        # The reader is released once the last page has been extracted
+        assert len(opened) == 2
+        assert document_extraction._worker_reader == (None, None)
+
+    def test_verification_rule_stats(self, client, sample_document_data):
+        """Test per-rule statistics and rejecting invalid rule sets"""
+        client.post('/api/ai/verification/analyze-document',
+                   json=sample_document_data,
+                   content_type='application/json')
+        
+        response = client.get('/api/ai/verification/rules/stats')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'version' in data
+        rule_ids = {(rule['document_type'], rule['rule_id']) for rule in data['rules']}
+        assert ('medical_record', 'patient_name') in rule_ids
+        
+        # Invalid rules are rejected and the active rules stay in place
+        response = client.post('/api/ai/verification/rules/reload',
+                             json={'rules': {'generic': [{'id': 'bad', 'type': 'unknown'}]}},
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        assert client.get('/api/ai/verification/rules/stats').get_json()['version'] == data['version']
+
+    def test_verify_campaign_name_mismatch(self, client, sample_document_data):
+        """Test flagging documents that name someone other than the beneficiary"""
+        document = {
+            'type': 'medical_record',
+            'text': sample_document_data['document_text']
+        }
+        
+        response = client.post('/api/ai/verification/verify-campaign',
+                             json={
+                                 'campaign_data': {'id': 'camp_names', 'beneficiary_name': 'Michael Brown'},
+                                 'documents': [document]
+                             },
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        flags = response.get_json()['document_analyses'][0]['flags']
+        assert any(flag.startswith('Mismatched names') for flag in flags)
+        
+        # Small spelling differences still match
+        response = client.post('/api/ai/verification/verify-campaign',
+                             json={
+                                 'campaign_data': {'id': 'camp_names', 'beneficiary_name': 'Sara Jonson'},
+                                 'documents': [document]
+                             },
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        flags = response.get_json()['document_analyses'][0]['flags']
+        assert not any(flag.startswith('Mismatched names') for flag in flags)
+
+    def test_verification_decision_log(self, client, sample_document_data):
+        """Test looking up the logged decisions for a campaign"""
+        client.post('/api/ai/verification/verify-campaign',
+                   json={
+                       'campaign_data': {'id': 'camp_audit', 'goal_amount': 50000},
+                       'documents': [{'type': 'medical_record', 'text': sample_document_data['document_text']}]
+                   },
+                   content_type='application/json')
+        client.post('/api/ai/verification/fraud-detection',
+                   json={'campaign_data': {'id': 'camp_audit', 'goal_amount': 50000, 'description': 'Short'}},
+                   content_type='application/json')
+        
+        response = client.get('/api/ai/verification/decisions/camp_audit')
+        
+        assert response.status_code == 200
+        decisions = response.get_json()['decisions']
+        assert [decision['kind'] for decision in decisions[-2:]] == ['verification', 'fraud']
+        for decision in decisions:
+            assert decision['campaign_id'] == 'camp_audit'
+            assert 'ruleset_version' in decision
+            assert len(decision['input_sha256']) == 64
+        # Rendered flags can name the beneficiary, so verification decisions only keep codes
+        assert all(code == code.lower() and ' ' not in code for code in decisions[-2]['flag_codes'])
+        assert 'flags' not in decisions[-2]
+        # Fraud decisions likewise keep indicator codes, not the rendered indicators
+        assert 'short_description' in decisions[-1]['indicator_codes']
+        assert 'flags' not in decisions[-1] and 'detected_indicators' not in decisions[-1]
+        
+        response = client.get('/api/ai/verification/decisions/camp_audit?limit=1')
+        assert response.get_json()['decisions'] == decisions[-1:]
+
+    def test_analysis_cache_keeps_every_ruleset_version(self, tmp_path):
+        """Test workers on two ruleset versions keep each other's results, and unused ones age out"""
+        first = DocumentAnalysisCache(str(tmp_path / 'analysis_cache.db'), evict_interval=1)
+        second = DocumentAnalysisCache(str(tmp_path / 'analysis_cache.db'), evict_interval=1)
+        
+        first.put('medical_bill', 'abc', 'rules-1', {'version': 1})
+        second.put('medical_bill', 'abc', 'rules-2', {'version': 2})
+        assert first.get('medical_bill', 'abc', 'rules-1') == {'version': 1}
+        assert second.get('medical_bill', 'abc', 'rules-2') == {'version': 2}
+        
+        # Once rules-1 goes unused past the retention period, the next eviction drops it
+        first.flush()
+        second.retention_seconds = 0
+        with patch('src.services.analysis_cache.time.time', return_value=time.time() + 1):
+            second.put('medical_bill', 'def', 'rules-2', {'version': 2})
+        assert first.get('medical_bill', 'abc', 'rules-1') is None
+        assert second.get('medical_bill', 'def', 'rules-2') == {'version': 2}
+
+    def test_decision_log_shared_between_processes(self, tmp_path):
+        """Test two decision logs on one directory, as in separate workers, index each other's records"""
+        first = DecisionLog(str(tmp_path), segment_bytes=512)
+        second = DecisionLog(str(tmp_path), segment_bytes=512)
+        try:
+            for number in range(20):
+                first.append('verification', 'camp_a', {'number': number})
+                first.flush()
+                second.append('verification', 'camp_b', {'number': number})
+                second.flush()
+            
+            for log in (first, second):
+                for campaign_id in ('camp_a', 'camp_b'):
+                    decisions = log.lookup(campaign_id)
+                    assert [decision['number'] for decision in decisions] == list(range(20))
+                    assert all(decision['campaign_id'] == campaign_id for decision in decisions)
+        finally:
+            first.close()
+            second.close()
+        
+        reopened = DecisionLog(str(tmp_path), segment_bytes=512)
+        try:
+            assert len(reopened.lookup('camp_b')) == 20
+        finally:
+            reopened.close()
+
+    def test_incremental_document_verification(self, client, sample_document_data):
+        """Test adding and removing a single campaign document"""
+        document = {
+            'type': 'medical_record',
+            'text': sample_document_data['document_text']
+        }
+        
+        response = client.put('/api/ai/verification/campaigns/camp_incr/documents/doc_1',
+                            json=document,
+                            content_type='application/json')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['campaign_id'] == 'camp_incr'
+        assert len(data['document_analyses']) == 1
+        with app.app_context():
+            saved = CampaignDocument.query.filter_by(campaign_id='camp_incr', document_key='doc_1').one()
+            assert saved.text == document['text']
+        
+        response = client.delete('/api/ai/verification/campaigns/camp_incr/documents/doc_1')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['document_analyses'] == []
+        assert data['trust_score'] == 0.0
+        with app.app_context():
+            assert CampaignDocument.query.filter_by(campaign_id='camp_incr').count() == 0
+        
+        # Removing an unknown document reports not found
+        response = client.delete('/api/ai/verification/campaigns/camp_incr/documents/doc_1')
+        assert response.status_code == 404
+
+    def test_verified_campaigns_are_saved(self, client, sample_document_data):
+        """Test that verify-campaign saves the campaign, its documents and its result"""
+        payload = {
+            'campaign_data': {'id': 'camp_saved', 'beneficiary_name': 'Sarah Johnson', 'goal_amount': 25000},
+            'documents': [{'type': 'medical_record', 'text': sample_document_data['document_text']}]
+        }
+        for _ in range(2):
+            response = client.post('/api/ai/verification/verify-campaign', json=payload)
+            assert response.status_code == 200
+        
+        with app.app_context():
+            campaign = Campaign.query.get('camp_saved')
+            assert campaign.beneficiary_name == 'Sarah Johnson'
+            assert campaign.verification_status == response.get_json()['overall_status']
+            # Re-submitting a document without an id does not save it twice
+            assert len(campaign.documents) == 1
+            document_key = campaign.documents[0].key
+        
+        # Saved documents can then be changed through the document routes
+        response = client.delete(f'/api/ai/verification/campaigns/camp_saved/documents/{document_key}')
+        assert response.status_code == 200
+        assert response.get_json()['document_analyses'] == []
+
+    def test_incremental_verification_counts_documents_saved_elsewhere(self, client, sample_document_data):
+        """Test that single-document updates count documents saved through other worker processes"""
+        campaign_id = 'camp_shared'
+        document = {'type': 'medical_record', 'text': sample_document_data['document_text']}
+        
+        response = client.put(f'/api/ai/verification/campaigns/{campaign_id}/documents/doc_1', json=document)
+        assert len(response.get_json()['document_analyses']) == 1
+        
+        # Another worker saves a second document; this process has not seen it
+        with app.app_context():
+            db.session.add(CampaignDocument(campaign_id=campaign_id, document_key='doc_2', document_type='insurance_document',
+                                            text='Insurance coverage statement\nPolicy Number: AB-1234'))
+            db.session.commit()
+        
+        response = client.put(f'/api/ai/verification/campaigns/{campaign_id}/documents/doc_3',
+                            json=dict(document, text=document['text'] + '\nFollow-up visit scheduled'))
+        assert len(response.get_json()['document_analyses']) == 3
+        
+        response = client.delete(f'/api/ai/verification/campaigns/{campaign_id}/documents/doc_2')
+        assert response.status_code == 200
+        assert len(response.get_json()['document_analyses']) == 2
+
+    def test_incremental_verification_of_stored_campaign(self, client, sample_document_data):
+        """Test that single-document updates check stored campaigns like a full verification"""
+        campaign_id = 'camp_stored'
+        with app.app_context():
+            db.session.add(Campaign(id=campaign_id, user_id=f'user_{campaign_id}', beneficiary_name='Sarah Johnson'))
+            db.session.add(CampaignDocument(campaign_id=campaign_id, document_type='medical_record',
+                                            text=sample_document_data['document_text']))
+            db.session.commit()
+        
+        try:
+            # The saved document is verified along with the new one, against the stored beneficiary
+            response = client.put(f'/api/ai/verification/campaigns/{campaign_id}/documents/doc_new',
+                                json={
+                                    'type': 'medical_record',
+                                    'text': sample_document_data['document_text'].replace('Sarah Johnson', 'Michael Brown')
+                                },
+                                content_type='application/json')
+            
+            assert response.status_code == 200
+            analyses = response.get_json()['document_analyses']
+            assert len(analyses) == 2
+            assert not any(flag.startswith('Mismatched names') for flag in analyses[0]['flags'])
+            assert any(flag.startswith('Mismatched names') for flag in analyses[1]['flags'])
+            
+            response = client.delete(f'/api/ai/verification/campaigns/{campaign_id}/documents/doc_new')
+            assert response.status_code == 200
+            assert len(response.get_json()['document_analyses']) == 1
+        finally:
+            with app.app_context():
+                db.session.delete(Campaign.query.get(campaign_id))
+                db.session.commit()
+
+    def test_velocity_limits_shared_between_processes(self, tmp_path):
+        """Test that verification attempts counted by one process count against another"""
+        first = VelocityLimiter(str(tmp_path / 'velocity.db'), limits={'ip': 2})
+        second = VelocityLimiter(str(tmp_path / 'velocity.db'), limits={'ip': 2})
+        keys = first.keys_for({}, '203.0.113.7')
+        
+        assert first.admit(keys, now=1000) == (True, 0.0)
+        assert second.admit(keys, now=1010) == (True, 0.0)
+        assert first.admit(keys, now=1020) == (False, 580)
+        assert second.counts(keys, now=1020) == {'ip': 2}
+
+    def test_velocity_limits_use_forwarded_client_address(self, client):
+        """Test that clients behind the load balancer are limited by their own address"""
+        campaign = {'campaign_data': {'id': 'camp_forwarded'}, 'documents': []}
+        forwarded_for = '198.51.100.7'
+        
+        statuses = [
+            client.post('/api/ai/verification/verify-campaign', json=campaign,
+                        headers={'X-Forwarded-For': forwarded_for}).status_code
+            for _ in range(11)
+        ]
+        assert statuses[:10] == [200] * 10
+        assert statuses[10] == 429
+        
+        # Only the entry added by the trusted proxy counts, so another client is unaffected
+        # even when it puts the limited address in front
+        other_client = '2001:db8::7'
+        response = client.post('/api/ai/verification/verify-campaign', json=campaign,
+                               headers={'X-Forwarded-For': f'{forwarded_for}, {other_client}'})
+        assert response.status_code == 200
+
+    def test_reverification_skips_poison_records(self, sample_document_data):
+        """Test that a campaign failing to verify does not fail the rest of its chunk"""
+        init_worker(VerificationRuleEngine().rules)
+        document = {'id': 1, 'type': 'medical_record', 'text': sample_document_data['document_text']}
+        
+        results = verify_chunk([
+            ({'id': 'camp_good_1'}, [document]),
+            ({'id': 'camp_poison'}, [None]),
+            ({'id': 'camp_good_2'}, [document])
+        ])
+        
+        assert [result['id'] for result in results] == ['camp_good_1', 'camp_poison', 'camp_good_2']
+        assert results[1]['error'].startswith('Verification failed')
+        assert 'verification_status' not in results[1]
+        assert results[0]['verification_status'] == results[2]['verification_status']
+
+    def test_reverification_keeps_document_reuse_rejections(self, tmp_path, sample_document_data):
+        """Test that re-verification checks reused documents read-only, as online verification did"""
+        fingerprint_db_path = str(tmp_path / 'document_fingerprints.db')
+        online = VerificationAI(fingerprint_index=DocumentFingerprintIndex(fingerprint_db_path))
+        document = {'id': 1, 'type': 'medical_record', 'text': sample_document_data['document_text']}
+
+        online.verify_campaign({'id': 'camp_original'}, [document])
+        copy = online.verify_campaign({'id': 'camp_copy'}, [document])
+        indexed = len(online.fingerprint_index.text_index)
+
+        init_worker(VerificationRuleEngine().rules, fingerprint_db_path=fingerprint_db_path)
+        results = verify_chunk([({'id': 'camp_original'}, [document]), ({'id': 'camp_copy'}, [document])])
+
+        # The copy keeps its penalty, while the campaign that submitted the document first is not flagged for it
+        assert results[1]['verification_status'] == copy.overall_status.value
+        assert results[1]['trust_score'] == copy.trust_score
+        assert 'possible_fake_documents' in results[1]['decision']['flag_codes']
+        assert 'possible_fake_documents' not in results[0]['decision']['flag_codes']
+        assert results[0]['decision']['trigger'] == 'reverify'
+
+        # Nothing was registered by the re-verification
+        assert len(online.fingerprint_index.text_index) == indexed
+
     def test_fraud_detection_success(self, client):
         """Test successful fraud detection"""
         fraud_data = {
@@ -346,6 +978,148 @@ class TestVerificationAIEndpoints:
         assert data['risk_level'] in ['low', 'medium', 'high']
         assert isinstance(data['detected_indicators'], list)
 
+    def test_fraud_detection_checks_campaign_owner(self, client):
+        """Test that a user_id naming someone other than the stored campaign owner is rejected"""
+        campaign_id = 'camp_owned'
+        with app.app_context():
+            db.session.add(Campaign(id=campaign_id, user_id='owner_1'))
+            db.session.commit()
+        
+        for path in ('/api/ai/verification/fraud-detection', '/api/ai/verification/verify-campaign'):
+            response = client.post(path, json={
+                'campaign_data': {'id': campaign_id, 'user_id': 'someone_else', 'goal_amount': 5000},
+                'documents': []
+            })
+            assert response.status_code == 403
+        
+        response = client.post('/api/ai/verification/fraud-detection', json={
+            'campaign_data': {'id': campaign_id, 'user_id': 'owner_1', 'goal_amount': 5000}
+        })
+        assert response.status_code == 200
+
+    def test_fraud_features_count_reused_documents_once(self, tmp_path):
+        """Test that re-analyzing a reused document does not count it again"""
+        store = FraudFeatureStore(str(tmp_path / 'fraud_features.db'))
+        store.record_campaign('camp_1', 'user_1')
+        
+        store.record_document_reuse('camp_1', 'doc_1')
+        store.record_document_reuse('camp_1', 'doc_1')
+        store.record_document_reuse('camp_1', 'doc_2')
+        
+        assert store.get_features('user_1')['documents_reused'] == 2
+
+    def test_fraud_detection_batch_ndjson(self, client):
+        """Test streamed batch fraud scoring from NDJSON input"""
+        records = [
+            {'campaign_data': {'id': 'batch_1', 'goal_amount': 50000,
+                               'description': 'Diagnosis confirmed by her doctor, surgery scheduled at the hospital'}},
+            {'id': 'batch_2', 'goal_amount': 900000, 'description': 'Please help'}
+        ]
+        body = '\n'.join(json.dumps(record) for record in records) + '\nnot json\n'
+        
+        response = client.post('/api/ai/verification/fraud-detection/batch',
+                             data=body,
+                             content_type='application/x-ndjson')
+        
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        # One line per record in input order, then the summary
+        assert [line.get('index') for line in lines[:3]] == [0, 1, 2]
+        assert lines[0]['campaign_id'] == 'batch_1'
+        assert 'Unusually high funding goal' in lines[1]['detected_indicators']
+        assert 'error' in lines[2]
+        assert lines[3]['summary']['processed'] == 2
+        assert lines[3]['summary']['errors'] == 1
+
+    def test_near_duplicate_index_shared_between_processes(self, tmp_path):
+        """Test that campaign descriptions indexed by one process are found by another"""
+        first = NearDuplicateIndex(str(tmp_path / 'near_duplicates.db'))
+        second = NearDuplicateIndex(str(tmp_path / 'near_duplicates.db'))
+        description = ('My daughter was diagnosed with leukemia and needs chemotherapy at the '
+                       'children\'s hospital, and we are asking for help with her medical bills')
+        
+        first.add('camp_original', first.signature(description))
+        matches = second.query(second.signature(description + ' Thank you.'))
+        assert [match[0] for match in matches] == ['camp_original']
+        
+        assert second.remove('camp_original')
+        assert first.query(first.signature(description)) == []
+        assert len(first) == 0
+
+    def test_document_fingerprints_shared_between_processes(self, tmp_path):
+        """Test that documents registered by one process are recognized by another until removed"""
+        first = DocumentFingerprintIndex(str(tmp_path / 'document_fingerprints.db'))
+        second = DocumentFingerprintIndex(str(tmp_path / 'document_fingerprints.db'))
+        
+        assert first.check_and_register('camp_first', 'hash_1', 'State ID', {'id_number': 'AB-12345'}) == []
+        flags = second.check_and_register('camp_second', 'hash_2', 'Driver license', {'id_number': 'ab12345'})
+        assert flags == ['Possible identity mismatch: ID number already submitted by campaign(s) camp_first']
+        
+        assert first.remove_campaign('camp_first') == 2
+        assert second.check_and_register('camp_third', 'hash_3', 'State ID', {'id_number': 'AB-12345'}) == [
+            'Possible identity mismatch: ID number already submitted by campaign(s) camp_second'
+        ]
+
+    def test_fraud_ring_graph_shared_between_processes(self, tmp_path):
+        """Test that campaigns linked through different processes form one cluster until removed"""
+        first = FraudRingGraph(str(tmp_path / 'fraud_rings.db'))
+        second = FraudRingGraph(str(tmp_path / 'fraud_rings.db'))
+        
+        first.add_identifiers('camp_a', [('phone', '5551234567'), ('address', '12 elm street')])
+        second.add_identifiers('camp_b', [('phone', '5551234567')])
+        first.add_identifiers('camp_c', [('address', '12 elm street')])
+        
+        cluster = second.cluster('camp_c')
+        assert cluster['cluster_size'] == 3
+        assert cluster['linked_by'] == ['address', 'phone']
+        
+        # Removing the campaign holding the cluster together splits it in every process
+        assert second.remove_campaign('camp_a') == 2
+        assert first.cluster('camp_b')['cluster_size'] == 1
+
+    def test_fraud_ring_links_expire_on_schedule(self, tmp_path):
+        """Test that expired links age out at each process's scheduled rebuild without a new generation"""
+        path = str(tmp_path / 'fraud_rings.db')
+        with patch('src.services.fraud_rings.time.time', return_value=1000.0):
+            first = FraudRingGraph(path, retention_seconds=100, rebuild_seconds=50)
+            second = FraudRingGraph(path, retention_seconds=100, rebuild_seconds=50)
+            first.add_identifiers('camp_a', [('phone', '5551234567')])
+            second.add_identifiers('camp_b', [('phone', '5551234567')])
+            assert first.cluster('camp_b')['cluster_size'] == 2
+            assert second.cluster('camp_a')['cluster_size'] == 2
+        
+        with patch('src.services.fraud_rings.time.time', return_value=1120.0):
+            first.add_identifiers('camp_c', [('phone', '5551234567')])
+            assert first.cluster('camp_c')['cluster_size'] == 1
+            assert second.cluster('camp_a')['cluster_size'] == 1
+        
+        assert first._generation == second._generation == 0
+
+    def test_blocklist_shared_between_processes(self, tmp_path):
+        """Test that an entry added by one process blocks documents in another right away"""
+        first = FraudBlocklist(str(tmp_path / 'fraud_blocklist.txt'))
+        second = FraudBlocklist(str(tmp_path / 'fraud_blocklist.txt'))
+        generation = second.generation
+        
+        first.add('id_number', 'AB-12345')
+        
+        assert second.contains('id_number', 'ab12345')
+        assert second.blocked_identifiers({'id_number': 'AB 12345'}) == ['id_number']
+        # Cached results keyed by the generation are invalidated in both processes alike
+        assert second.generation != generation
+        assert second.generation == first.generation
+        assert len(second) == 1
+
+    def test_forget_campaign(self, client):
+        """Test removing a deleted campaign from the cross-campaign indexes"""
+        response = client.delete('/api/ai/verification/campaigns/camp_deleted')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['campaign_id'] == 'camp_deleted'
+        assert set(data['removed']) == {'near_duplicates', 'document_fingerprints', 'fraud_ring_links'}
+
 
 class TestDonorMatchingEndpoints:
     """Test suite for Donor Matching AI service endpoints"""
@@ -471,6 +1245,7 @@ class TestHealthAndErrorHandling:
 
     def test_health_check_success(self, client):
         """Test health check endpoint"""
+        rule_stats = client.get('/api/ai/verification/rules/stats').get_json()
         response = client.get('/api/ai/health')
         
         assert response.status_code == 200
@@ -490,6 +1265,33 @@ class TestHealthAndErrorHandling:
         # Verify all services are operational
         for service, status in data['services'].items():
             assert status == 'operational'
+        
+        # Checking health leaves no trace in the rule statistics
+        assert client.get('/api/ai/verification/rules/stats').get_json() == rule_stats
+
+    def test_medical_knowledge_reload(self, client):
+        """Test the shared medical knowledge base can be reloaded in place"""
+        response = client.get('/api/ai/knowledge')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'cancer' in data['conditions']
+        assert 'chronic_illness' in data['donor_categories']
+
+        response = client.post('/api/ai/knowledge/reload')
+
+        assert response.status_code == 200
+        assert response.get_json()['knowledge_version'] == data['version']
+
+    def test_scoring_config(self, client):
+        """Test the active scoring configuration is reported"""
+        response = client.get('/api/ai/scoring-config')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['version']
+        assert set(data['strategy_weights']) == {'content', 'collaborative', 'geographic', 'demographic'}
+        assert data['fraud']['high_risk_score'] > data['fraud']['medium_risk_score']
 
     def test_404_error_handling(self, client):
         """Test 404 error handling"""